@@ -8,9 +8,8 @@ import sys
 sys.path.insert(0, os.path.dirname(__file__))
 
 import database
-from routes import auth, resume, analysis
-from models.nlp_processor import get_nlp_model
-from models.embeddings import model          # ← new name
+from routes import admin, auth, resume, analysis, health
+from utils import job_queue, metrics, pdf_parser, warmup
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for local frontend
@@ -22,18 +21,25 @@ UPLOAD_FOLDER = 'uploads'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5 MB limit
 
+# Fast startup: serve immediately and load models on a background thread
+# (watch /api/health/ready); otherwise block until they are loaded.
+FAST_STARTUP = os.environ.get('JOBFIT_FAST_STARTUP', '').lower() in ('1', 'true', 'yes')
+
 # Ensure upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 # ------------------------------------------------------------------
 # One-time initialisation
 # ------------------------------------------------------------------
-database.init_db()
+database.init_app(app)          # request-scoped pooled connections
+metrics.init_app(app)           # Server-Timing headers, GET /metrics
 
-print("Loading NLP models...")
-nlp         = get_nlp_model()   # spaCy
-embed_model = model             # Sentence-BERT
-print("Models loaded successfully!")
+# PDF worker processes re-import the entry script: they need none of this
+if not pdf_parser.is_pool_worker():
+    database.init_db()
+    job_queue.fail_interrupted()    # async uploads cut off by the last shutdown
+    print("Loading NLP models...")
+    warmup.start(background=FAST_STARTUP)
 
 # ------------------------------------------------------------------
 # Register API blueprints
@@ -41,6 +47,8 @@ print("Models loaded successfully!")
 app.register_blueprint(auth.bp,   url_prefix='/api')
 app.register_blueprint(resume.bp, url_prefix='/api')
 app.register_blueprint(analysis.bp, url_prefix='/api')
+app.register_blueprint(health.bp, url_prefix='/api')
+app.register_blueprint(admin.bp,  url_prefix='/api')
 
 from routes import auth, resume, analysis, settings   # ← new
 
@@ -0,0 +1,260 @@
+# backend/asgi.py
+"""
+ASGI entry point: the same /api surface as app.py, served from an
+asyncio event loop.
+
+    uvicorn asgi:application --port 5000      # if uvicorn is installed
+    python asgi.py [--host localhost] [--port 5000]
+
+Request bodies are received on the event loop, so a slow upload holds
+no thread until it has fully arrived (in memory up to BODY_SPOOL_BYTES,
+in a temporary file beyond that). The Flask view then runs on a
+per-lane thread pool (uploads, analysis, auth, everything else), and a
+burst of uploads or logins can fill only its own lane: /api/job-roles
+and the other light calls keep their threads. The CPU-heavy stages run
+on their own executors: PDF extraction in a process pool
+(JOBFIT_PDF_OFFLOAD, on by default here), encoding on the micro-batcher
+thread or the sidecar, bcrypt on utils.security's pool. SQLite work runs
+only on lane threads, never on the loop, with one pooled connection per
+lane thread.
+
+The OS schedules those PDF processes alongside the server's threads. On
+a small machine, JOBFIT_PDF_WORKERS (default min(4, cores)) sets how much
+CPU uploads get against light requests. See benchmarks/bench_asgi.py.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+# lane → (path prefixes, threads)
+LANES = {
+    'upload':   (('/api/upload-resume',), int(os.environ.get('JOBFIT_ASGI_UPLOAD_THREADS', 4))),
+    'analysis': (('/api/analyze-', '/api/rank-'), int(os.environ.get('JOBFIT_ASGI_ANALYSIS_THREADS', 8))),
+    'auth':     (('/api/login', '/api/register'), int(os.environ.get('JOBFIT_ASGI_AUTH_THREADS', 4))),
+    'default':  ((), int(os.environ.get('JOBFIT_ASGI_THREADS', 16))),
+}
+# request bodies larger than this are spooled to a temporary file
+BODY_SPOOL_BYTES = int(os.environ.get('JOBFIT_ASGI_BODY_SPOOL_BYTES', 1024 * 1024))
+
+os.environ.setdefault('JOBFIT_PDF_OFFLOAD', '1')
+os.environ.setdefault('JOBFIT_DB_POOL_SIZE', str(sum(threads for _, threads in LANES.values())))
+
+from utils import pdf_parser
+if pdf_parser.PDF_OFFLOAD and not pdf_parser.is_pool_worker():
+    pdf_parser.start_offload_pool()      # start the PDF workers (from a forkserver) up front
+
+import app as flask_app
+from utils import role_import
+
+wsgi_app = flask_app.app.wsgi_app
+MAX_BODY = flask_app.app.config['MAX_CONTENT_LENGTH']
+LARGE_BODY_PATHS = {'/api/admin/job-roles/import': role_import.IMPORT_MAX_BYTES}
+
+_executors = {lane: ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f'asgi-{lane}')
+              for lane, (_, threads) in LANES.items()}
+
+
+def lane_for(path: str) -> str:
+    for lane, (prefixes, _) in LANES.items():
+        if prefixes and path.startswith(prefixes):
+            return lane
+    return 'default'
+
+
+# ---------------------------------------------------------
+# ASGI → WSGI
+# ---------------------------------------------------------
+def _environ(scope, body, length: int) -> dict:
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(length),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name, value = raw_name.decode('latin-1').upper().replace('-', '_'), raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _call_wsgi(environ: dict):
+    """Run the Flask app to completion on a lane thread → (status, headers, body)."""
+    response = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        response['status'], response['headers'] = int(status.split(' ', 1)[0]), headers
+        return chunks.append
+
+    result = wsgi_app(environ, start_response)
+    try:
+        chunks.extend(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], b''.join(chunks)
+
+
+async def _simple(send, status: int, body: bytes) -> None:
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    limit = LARGE_BODY_PATHS.get(scope['path'], MAX_BODY)
+    declared = dict(scope.get('headers', [])).get(b'content-length')
+    if declared is not None:
+        try:
+            declared = int(declared)
+        except ValueError:
+            declared = -1
+        if declared < 0:
+            return await _simple(send, 400, b'{"error": "Invalid Content-Length"}')
+        if declared > limit:
+            return await _simple(send, 413, b'{"error": "Request too large"}')
+
+    # large bodies (role imports) go to disk, so memory stays flat whatever their size
+    body = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_BYTES)
+    try:
+        length = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunk = message.get('body', b'')
+            length += len(chunk)
+            if length > limit:
+                return await _simple(send, 413, b'{"error": "Request too large"}')
+            body.write(chunk)
+            if not message.get('more_body'):
+                break
+        body.seek(0)
+
+        loop = asyncio.get_running_loop()
+        status, headers, payload = await loop.run_in_executor(
+            _executors[lane_for(scope['path'])], _call_wsgi, _environ(scope, body, length))
+    finally:
+        body.close()
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+# ---------------------------------------------------------
+# Minimal HTTP/1.1 server (used when uvicorn is not installed):
+# Content-Length bodies only, one request per connection
+# ---------------------------------------------------------
+_REASONS = {200: 'OK', 201: 'Created', 202: 'Accepted', 400: 'Bad Request', 401: 'Unauthorized',
+            403: 'Forbidden', 404: 'Not Found', 409: 'Conflict', 413: 'Payload Too Large',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+async def _handle(reader, writer, host: str, port: int) -> None:
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        method, target, version = request_line.split(' ', 2)
+        headers = [tuple(part.strip() for part in line.split(':', 1))
+                   for line in header_lines if ':' in line]
+        try:
+            length = int(dict((k.lower(), v) for k, v in headers).get('content-length', 0))
+        except ValueError:
+            length = 0                     # application() answers 400
+        path, _, query = target.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': version.split('/')[-1],
+            'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode('latin-1'),
+            'query_string': query.encode('latin-1'), 'root_path': '',
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+            'client': writer.get_extra_info('peername'), 'server': (host, port),
+        }
+        remaining = length
+
+        async def receive():
+            nonlocal remaining
+            if remaining <= 0:
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            chunk = await reader.read(min(remaining, 64 * 1024))
+            if not chunk:
+                return {'type': 'http.disconnect'}
+            remaining -= len(chunk)
+            return {'type': 'http.request', 'body': chunk, 'more_body': remaining > 0}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+                lines += [f"{k.decode('latin-1')}: {v.decode('latin-1')}" for k, v in message['headers']
+                          if k.lower() != b'connection']
+                lines.append('connection: close')
+                writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+            elif message['type'] == 'http.response.body':
+                writer.write(message.get('body', b''))
+                await writer.drain()
+
+        await application(scope, receive, send)
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve_builtin(host: str, port: int) -> None:
+    server = await asyncio.start_server(lambda r, w: _handle(r, w, host, port), host, port,
+                                        backlog=1024)
+    print(f"ASGI server (built-in) on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        asyncio.run(_serve_builtin(args.host, args.port))
+    else:
+        uvicorn.run(application, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
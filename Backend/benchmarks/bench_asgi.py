@@ -0,0 +1,188 @@
+# backend/benchmarks/bench_asgi.py
+"""
+Light-call latency while uploads are running: threaded Flask server vs.
+the ASGI entry point.
+
+    python benchmarks/bench_asgi.py [--servers flask asgi] [--seconds 20]
+                                    [--uploaders 8] [--pages 10] [--readers 4]
+
+Each server runs as a subprocess on a temporary database. `uploaders`
+threads keep posting generated `pages`-page PDFs to /api/upload-resume
+(unique bytes, so the dedupe cache never answers) while `readers`
+threads loop on /api/job-roles. Prints both request rates and the
+job-roles latency percentiles.
+
+Read the upload rates together with roles/s. The readers are closed
+loops, so the faster the server answers them, the more CPU they take.
+On one core, ASGI answers about 30x more of them than threaded Flask,
+which leaves uploads less CPU. PDF parsing also runs in JOBFIT_PDF_WORKERS
+offload processes (min(4, cores), so 1 here) competing with the server's
+threads, where threaded Flask parsed in every upload thread. Raise
+JOBFIT_PDF_WORKERS to give uploads a larger share.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_pipeline import make_pdf, resume_pages
+
+SERVERS = {
+    'flask': ['-c', "import sys; sys.path.insert(0, sys.argv[1]); import app; "
+                    "from werkzeug.serving import run_simple; "
+                    "run_simple('127.0.0.1', int(sys.argv[2]), app.app, threaded=True)"],
+    'asgi': [os.path.join(BACKEND_DIR, 'asgi.py'), '--host', '127.0.0.1', '--port'],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _request(port, method, path, body=None, headers=None, timeout=120):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def _multipart(fields: dict, file_name: str, data: bytes):
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode()
+             for k, v in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+                 f'filename="{file_name}"\r\nContent-Type: application/pdf\r\n\r\n'.encode()
+                 + data + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def _wait_ready(port, process, timeout=180):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            if _request(port, 'GET', '/api/health/ready', timeout=5)[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server not ready in time")
+
+
+def run(server: str, args) -> dict:
+    import random
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, JOBFIT_DB_PATH=os.path.join(tmp, 'bench.db'),
+                   JOBFIT_EMBED_STORE_DIR=os.path.join(tmp, 'embeddings'),
+                   JOBFIT_SECRET_KEY='bench', JOBFIT_BCRYPT_ROUNDS='4')
+        argv = [sys.executable, *SERVERS[server]]
+        argv += [BACKEND_DIR, str(port)] if server == 'flask' else [str(port)]
+        process = subprocess.Popen(argv, cwd=tmp, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_ready(port, process)
+            return _load(port, args, random.Random(0))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def _load(port, args, rng) -> dict:
+    login = {'email': 'bench@example.com', 'password': 'bench-password'}
+    _request(port, 'POST', '/api/register', json.dumps({'name': 'Bench', **login}),
+             {'Content-Type': 'application/json'})
+    user = json.loads(_request(port, 'POST', '/api/login', json.dumps(login),
+                               {'Content-Type': 'application/json'})[1])
+    auth = {'Authorization': f"Bearer {user['token']}"}
+    pdf = make_pdf(resume_pages(rng, args.pages))
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    uploads, upload_errors, reads = [], [0], []
+
+    def uploader(index):
+        n = 0
+        while not stop.is_set():
+            n += 1
+            body, content_type = _multipart({'user_id': user['user_id']}, f'u{index}_{n}.pdf',
+                                            pdf + f'\n% {index}-{n}\n'.encode())
+            t0 = time.perf_counter()
+            status, _ = _request(port, 'POST', '/api/upload-resume', body,
+                                 {**auth, 'Content-Type': content_type})
+            with lock:
+                if status == 201:
+                    uploads.append(time.perf_counter() - t0)
+                else:
+                    upload_errors[0] += 1
+
+    def reader():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            status, _ = _request(port, 'GET', '/api/job-roles')
+            if status == 200:
+                with lock:
+                    reads.append((time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=uploader, args=(i,)) for i in range(args.uploaders)]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    reads.sort()
+    pct = lambda q: reads[min(len(reads) - 1, int(len(reads) * q))] if reads else float('nan')
+    return {
+        "uploads_per_s": len(uploads) / args.seconds,
+        "upload_p50_s": statistics.median(uploads) if uploads else float('nan'),
+        "upload_errors": upload_errors[0],
+        "reads_per_s": len(reads) / args.seconds,
+        "read_p50_ms": pct(0.5), "read_p95_ms": pct(0.95), "read_p99_ms": pct(0.99),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=['flask', 'asgi'])
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--uploaders', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    print(f"{'server':<7} {'uploads/s':>9} {'upload p50 s':>12} {'errors':>6} "
+          f"{'roles/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for server in args.servers:
+        try:
+            r = run(server, args)
+        except RuntimeError as e:
+            print(f"{server:<7} failed: {e}")
+            continue
+        print(f"{server:<7} {r['uploads_per_s']:9.2f} {r['upload_p50_s']:12.2f} {r['upload_errors']:>6} "
+              f"{r['reads_per_s']:8.1f} {r['read_p50_ms']:8.2f} {r['read_p95_ms']:8.2f} "
+              f"{r['read_p99_ms']:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
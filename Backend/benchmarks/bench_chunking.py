@@ -0,0 +1,88 @@
+# backend/benchmarks/bench_chunking.py
+"""
+Single-vector vs. chunked resume embeddings: encode throughput and how
+much the job-match scores move.
+
+    python benchmarks/bench_chunking.py [pdf ...] [--long 3] [--repeat 3]
+
+Resumes are the PDFs in ../uploads (or the given ones) plus "long"
+variants made by concatenating `--long` of them, which is where the 256
+word-piece truncation of the single vector bites. Scores are against the
+seeded job roles. Reports resumes/s and chunks per resume for both paths,
+then for 'max' and 'topk_mean' the mean / max absolute score shift (points
+out of 100) and how often the best-matching role stays the same.
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('JOBFIT_DB_PATH', os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+import database
+from models import embeddings
+from models.embeddings import encode_batch, encode_with_chunks, aggregate_similarities
+from utils.pdf_parser import extract_text_from_pdf
+
+DEFAULT_PDFS = os.path.join(os.path.dirname(__file__), '..', '..', 'uploads', '*.pdf')
+
+
+def _rate(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(texts)
+    return len(texts) * repeat / (time.perf_counter() - start), out
+
+
+def _normalise(m):
+    return m / np.linalg.norm(m, axis=-1, keepdims=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pdfs', nargs='*')
+    parser.add_argument('--long', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    texts = [extract_text_from_pdf(p) for p in (args.pdfs or sorted(glob.glob(DEFAULT_PDFS)))]
+    texts = [t for t in texts if t]
+    if not texts:
+        sys.exit("no PDF text to benchmark")
+    texts += ['\n'.join(np.roll(texts, -i)[:args.long]) for i in range(len(texts))]
+
+    database.init_db()
+    database.warm_role_embeddings()
+    conn = database.get_db_connection()
+    roles = _normalise(np.stack([embeddings.get_embedding_from_bytes(r['jd_embedding'])
+                                 for r in conn.execute('SELECT jd_embedding FROM job_roles')]))
+    conn.close()
+
+    embeddings.get_model()
+    single_rate, single = _rate(encode_batch, texts, args.repeat)
+    chunked_rate, (_, chunk_matrices) = _rate(encode_with_chunks, texts, args.repeat)
+    n_chunks = [len(m) for m in chunk_matrices]
+
+    print(f"{len(texts)} resumes ({len(texts) // 2} concatenated x{args.long}), "
+          f"{len(roles)} roles, window {embeddings.CHUNK_TOKENS}/{embeddings.CHUNK_OVERLAP}")
+    print(f"  single   {single_rate:8.1f} resumes/s   1 vector each")
+    print(f"  chunked  {chunked_rate:8.1f} resumes/s   {np.mean(n_chunks):.1f} chunks each "
+          f"(max {max(n_chunks)})")
+
+    base = _normalise(single) @ roles.T * 100                    # (resumes, roles)
+    print(f"  {'mode':<10} {'mean |d|':>9} {'max |d|':>8} {'same top role':>14}")
+    for mode in ('max', 'topk_mean'):
+        shifted = np.stack([aggregate_similarities(roles @ _normalise(m).T, mode) * 100
+                            for m in chunk_matrices])
+        delta = np.abs(shifted - base)
+        same = np.mean(shifted.argmax(axis=1) == base.argmax(axis=1))
+        print(f"  {mode:<10} {delta.mean():9.2f} {delta.max():8.2f} {same:14.0%}")
+
+
+if __name__ == '__main__':
+    main()
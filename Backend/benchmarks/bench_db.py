@@ -0,0 +1,112 @@
+# backend/benchmarks/bench_db.py
+"""
+Concurrent SQLite access: connect-per-request (old) vs. the pooled WAL layer.
+
+    python benchmarks/bench_db.py [--threads 16] [--ops 300] [--write-ratio 0.2]
+
+Each thread mixes analysis_history inserts with "latest analysis" reads
+against a fresh temporary database. Prints ops/s, p95 latency and the
+number of "database is locked" errors for both setups.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database
+
+SCHEMA = '''
+    CREATE TABLE analysis_history (
+        analysis_id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        job_match_score REAL NOT NULL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_analysis_history_user_id ON analysis_history(user_id);
+'''
+
+
+def legacy_connect(path):
+    """The original get_db_connection: new connection, default settings."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _worker(get_conn, write, users, ops, write_ratio, seed, latencies, errors):
+    rng = random.Random(seed)
+    for _ in range(ops):
+        user = rng.choice(users)
+        start = time.perf_counter()
+        conn = get_conn()
+        try:
+            if rng.random() < write_ratio:
+                write(conn, lambda c: c.execute(
+                    'INSERT INTO analysis_history (analysis_id, user_id, job_match_score) '
+                    'VALUES (?, ?, ?)', (uuid.uuid4().hex, user, rng.random() * 100)))
+            else:
+                conn.execute('SELECT * FROM analysis_history WHERE user_id = ? '
+                             'ORDER BY timestamp DESC LIMIT 1', (user,)).fetchone()
+        except sqlite3.OperationalError:
+            errors.append(1)
+        finally:
+            conn.close()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def _legacy_write(conn, fn):
+    fn(conn)
+    conn.commit()
+
+
+def run(name, get_conn, write, args):
+    users = [uuid.uuid4().hex for _ in range(50)]
+    latencies, errors = [], []
+    threads = [threading.Thread(target=_worker,
+                                args=(get_conn, write, users, args.ops, args.write_ratio,
+                                      seed, latencies, errors))
+               for seed in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(f"  {name:<8} {len(latencies) / elapsed:9.0f} {p95:8.2f} {len(errors):7d}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--ops', type=int, default=300)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        pooled_path = os.path.join(tmp, 'pooled.db')
+        for path in (legacy_path, pooled_path):
+            with sqlite3.connect(path) as conn:
+                conn.executescript(SCHEMA)
+
+        print(f"{args.threads} threads x {args.ops} ops, {args.write_ratio:.0%} writes")
+        print(f"  {'setup':<8} {'ops/s':>9} {'p95 ms':>8} {'locked':>7}")
+        run('legacy', lambda: legacy_connect(legacy_path), _legacy_write, args)
+
+        database.DB_PATH = pooled_path
+        run('pooled', database.get_db_connection, database.run_write, args)
+        while not database._pool.empty():
+            database._pool.get_nowait().close_for_real()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# backend/benchmarks/bench_embed_backends.py
+"""
+Embedding backends on CPU: PyTorch vs. ONNX Runtime vs. ONNX int8.
+
+    python benchmarks/bench_embed_backends.py [--threads 1 4] [--batch 32] [--texts 256]
+
+Each backend/thread-count runs in a fresh subprocess so load time and
+peak RSS are its own. Reports load seconds, median single-text latency,
+batched throughput and peak RSS. Backends that cannot load are skipped
+(run export_onnx_model.py first for the ONNX rows).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+SAMPLE = ("Experienced software engineer skilled in Python, SQL, Docker and AWS. "
+          "Built data pipelines, REST APIs and dashboards; mentored junior developers. ")
+
+
+def worker(batch: int, n_texts: int) -> dict:
+    import resource
+    sys.path.insert(0, BACKEND_DIR)
+    from models import embeddings
+
+    started = time.perf_counter()
+    model = embeddings.get_model()
+    load_s = time.perf_counter() - started
+
+    texts = [f"{i}: " + SAMPLE * (1 + i % 4) for i in range(n_texts)]
+    model.encode(texts[:batch], batch_size=batch)                  # warm-up
+
+    single = []
+    for text in texts[:50]:
+        t0 = time.perf_counter()
+        model.encode([text], batch_size=1)
+        single.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    model.encode(texts, batch_size=batch)
+    throughput = n_texts / (time.perf_counter() - t0)
+
+    return {
+        "load_s": load_s,
+        "p50_ms": statistics.median(single),
+        "texts_per_s": throughput,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--batch', type=int, default=32)
+    parser.add_argument('--texts', type=int, default=256)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(worker(args.batch, args.texts)))
+        return
+
+    print(f"{'backend':<10} {'threads':>7} {'load s':>7} {'p50 ms':>8} {'texts/s':>9} {'RSS MB':>8}")
+    for backend in args.backends:
+        for threads in args.threads:
+            env = dict(os.environ, JOBFIT_EMBED_BACKEND=backend, JOBFIT_EMBED_THREADS=str(threads))
+            out = subprocess.run(
+                [sys.executable, __file__, '--worker', '--batch', str(args.batch),
+                 '--texts', str(args.texts)],
+                env=env, capture_output=True, text=True
+            )
+            if out.returncode != 0:
+                reason = (out.stderr.strip().splitlines() or ['failed'])[-1]
+                print(f"{backend:<10} {threads:>7}  skipped: {reason}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{backend:<10} {threads:>7} {r['load_s']:7.2f} {r['p50_ms']:8.2f} "
+                  f"{r['texts_per_s']:9.1f} {r['peak_rss_mb']:8.0f}")
+
+
+if __name__ == '__main__':
+    main()
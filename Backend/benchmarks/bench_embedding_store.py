@@ -0,0 +1,87 @@
+# backend/benchmarks/bench_embedding_store.py
+"""
+Bulk resume scoring: per-row BLOB decode from SQLite vs. the memory-mapped
+embedding store in each dtype.
+
+    python benchmarks/bench_embedding_store.py [--rows 200000] [--queries 5]
+
+Synthetic unit vectors go into a temporary database and stores. Prints
+on-disk size, mean time per full scan and top-10 recall against float32.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models.embeddings import get_embedding_from_bytes
+from models.embedding_store import EmbeddingStore, DTYPES
+
+DIM = 384
+
+
+def sqlite_scan(path, query):
+    """The old route: decode every resume_embedding BLOB, then score."""
+    conn = sqlite3.connect(path)
+    ids, scores = [], []
+    for resume_id, blob in conn.execute('SELECT resume_id, resume_embedding FROM resumes'):
+        vec = get_embedding_from_bytes(blob)
+        ids.append(resume_id)
+        scores.append(float(vec @ query / np.linalg.norm(vec)))
+    conn.close()
+    top = np.argsort(scores)[::-1][:10]
+    return [ids[i] for i in top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    ids = [str(uuid.uuid4()) for _ in range(args.rows)]
+    queries = rng.normal(size=(args.queries, DIM)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('CREATE TABLE resumes (resume_id TEXT PRIMARY KEY, resume_embedding BLOB)')
+        stores = {dt: EmbeddingStore(os.path.join(tmp, dt), dt) for dt in DTYPES}
+        for start in range(0, args.rows, 10000):
+            chunk = rng.normal(size=(min(10000, args.rows - start), DIM)).astype(np.float32)
+            chunk_ids = ids[start:start + len(chunk)]
+            conn.executemany('INSERT INTO resumes VALUES (?, ?)',
+                             zip(chunk_ids, (v.tobytes() for v in chunk)))
+            for store in stores.values():
+                store.add_many(chunk_ids, chunk)
+        conn.commit()
+        conn.close()
+
+        print(f"{args.rows} resumes x {DIM}-d, mean of {args.queries} queries")
+        print(f"  {'backend':<8} {'MB':>8} {'scan ms':>9} {'recall@10':>10}")
+
+        truth = [[r for r, _ in stores['float32'].top_k(q, 10)] for q in queries]
+        start = time.perf_counter()
+        legacy = [sqlite_scan(db_path, q) for q in queries]
+        ms = (time.perf_counter() - start) / len(queries) * 1000
+        recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(legacy, truth)])
+        print(f"  {'sqlite':<8} {os.path.getsize(db_path) / 2**20:8.1f} {ms:9.1f} {recall:10.3f}")
+
+        for dt, store in stores.items():
+            start = time.perf_counter()
+            found = [[r for r, _ in store.top_k(q, 10)] for q in queries]
+            ms = (time.perf_counter() - start) / len(queries) * 1000
+            recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(found, truth)])
+            print(f"  {dt:<8} {store.stats()['bytes'] / 2**20:8.1f} {ms:9.1f} {recall:10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# backend/benchmarks/bench_extraction.py
+"""
+Upload NLP-stage latency: old behaviour vs. the two extraction modes.
+
+    python benchmarks/bench_extraction.py [pdf ...] [--repeat 20]
+
+  legacy  – full en_core_web_sm pipeline run twice (the old
+            extract_education / extract_experience), result unused
+  rules   – JOBFIT_NLP_MODE=rules, no spaCy at all
+  spacy   – JOBFIT_NLP_MODE=spacy, one parse with tok2vec + ner only
+
+Defaults to the PDFs in ../uploads. The spaCy rows need en_core_web_sm.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import nlp_processor
+from models.nlp_processor import extract_skills, extract_education, extract_experience
+from utils.pdf_parser import extract_text_from_pdf
+
+DEFAULT_PDFS = os.path.join(os.path.dirname(__file__), '..', '..', 'uploads', '*.pdf')
+
+
+def _median_ms(fn, texts, repeat):
+    samples = []
+    for _ in range(repeat):
+        for t in texts:
+            start = time.perf_counter()
+            fn(t)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pdfs', nargs='*')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    texts = [extract_text_from_pdf(p) for p in (args.pdfs or sorted(glob.glob(DEFAULT_PDFS)))]
+    texts = [t for t in texts if t]
+    if not texts:
+        sys.exit("no PDF text to benchmark")
+
+    def rules(text):
+        nlp_processor.NLP_MODE = 'rules'
+        nlp_processor.extract_profile(text)
+
+    results = {'rules': _median_ms(rules, texts, args.repeat)}
+
+    try:
+        import spacy
+        full = spacy.load('en_core_web_sm')
+    except (ImportError, OSError) as e:
+        print(f"spaCy rows skipped: {e}")
+    else:
+        def legacy(text):
+            full(text)
+            full(text)
+            extract_skills(text, None)
+            extract_education(text)
+            extract_experience(text)
+
+        def spacy_once(text):
+            nlp_processor.NLP_MODE = 'spacy'
+            nlp_processor.extract_profile(text)
+
+        nlp_processor.get_nlp_model()
+        results['legacy'] = _median_ms(legacy, texts, args.repeat)
+        results['spacy'] = _median_ms(spacy_once, texts, args.repeat)
+
+    print(f"{len(texts)} resumes, median ms per upload (NLP stage):")
+    for name in ('legacy', 'spacy', 'rules'):
+        if name in results:
+            print(f"  {name:<7} {results[name]:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+# backend/benchmarks/bench_login.py
+"""
+Login throughput under concurrency: inline bcrypt vs. the bounded
+hashing executor.
+
+    python benchmarks/bench_login.py [--workers 0 2 4] [--concurrency 32]
+                                     [--logins 256] [--rounds 12]
+
+--workers 0 is the old behaviour (bcrypt on the request thread). Each
+setting runs in a fresh subprocess against a temporary database. While
+the burst runs a probe thread requests a trivial endpoint every 5 ms;
+its latency shows what the burst costs everything else. Also prints
+the cost of checking a session token vs. a users-table lookup.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+PASSWORD = 'bench-password'
+
+
+def _pct(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] if samples else float('nan')
+
+
+def worker(concurrency: int, logins: int, users: int) -> dict:
+    sys.path.insert(0, BACKEND_DIR)
+    from flask import Flask
+    import database
+    from routes import auth
+    from utils import security
+
+    database.init_db()
+    app = Flask(__name__)
+    database.init_app(app)
+    app.register_blueprint(auth.bp, url_prefix='/api')
+    app.add_url_rule('/ping', 'ping', lambda: 'ok')
+
+    password_hash = security.hash_password(PASSWORD)
+    conn = database.get_db_connection()
+    database.run_write(conn, lambda c: c.executemany(
+        'INSERT INTO users (user_id, name, email, password_hash) VALUES (?, ?, ?, ?)',
+        [(database.generate_id(), f'user {i}', f'user{i}@bench', password_hash) for i in range(users)]))
+    conn.close()
+
+    login_ms, statuses, ping_ms = [], [], []
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def login_loop(index):
+        client = app.test_client()
+        for n in range(index, logins, concurrency):
+            t0 = time.perf_counter()
+            response = client.post('/api/login', json={'email': f'user{n % users}@bench',
+                                                      'password': PASSWORD})
+            with lock:
+                login_ms.append((time.perf_counter() - t0) * 1000)
+                statuses.append(response.status_code)
+
+    def probe():
+        client = app.test_client()
+        while not done.is_set():
+            t0 = time.perf_counter()
+            client.get('/ping')
+            ping_ms.append((time.perf_counter() - t0) * 1000)
+            time.sleep(0.005)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    threads = [threading.Thread(target=login_loop, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    prober.join()
+
+    token = security.issue_token('bench-user')
+    t0 = time.perf_counter()
+    for _ in range(10000):
+        security.verify_token(token)
+    verify_us = (time.perf_counter() - t0) / 10000 * 1e6
+    conn = database.get_db_connection()
+    t0 = time.perf_counter()
+    for i in range(2000):
+        conn.execute('SELECT * FROM users WHERE email = ?', (f'user{i % users}@bench',)).fetchone()
+    lookup_us = (time.perf_counter() - t0) / 2000 * 1e6
+    conn.close()
+
+    ok = statuses.count(200)
+    return {
+        "logins_per_s": ok / elapsed,
+        "login_p50_ms": statistics.median(login_ms),
+        "login_p95_ms": _pct(login_ms, 0.95),
+        "rejected_503": statuses.count(503),
+        "ping_p50_ms": statistics.median(ping_ms) if ping_ms else float('nan'),
+        "ping_p95_ms": _pct(ping_ms, 0.95),
+        "verify_token_us": verify_us,
+        "user_lookup_us": lookup_us,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2, os.cpu_count() or 1])
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--logins', type=int, default=256)
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--queue', type=int, default=64, help='JOBFIT_HASH_QUEUE_MAX')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(worker(args.concurrency, args.logins, args.users)))
+        return
+
+    print(f"{'hash workers':>12} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'503s':>5} "
+          f"{'ping p50':>9} {'ping p95':>9} {'token us':>9} {'db us':>7}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ,
+                       JOBFIT_DB_PATH=os.path.join(tmp, 'bench.db'),
+                       JOBFIT_SECRET_KEY='bench',
+                       JOBFIT_BCRYPT_ROUNDS=str(args.rounds),
+                       JOBFIT_HASH_WORKERS=str(workers),
+                       JOBFIT_HASH_QUEUE_MAX=str(args.queue))
+            out = subprocess.run(
+                [sys.executable, __file__, '--worker', '--concurrency', str(args.concurrency),
+                 '--logins', str(args.logins), '--users', str(args.users)],
+                env=env, capture_output=True, text=True
+            )
+        if out.returncode != 0:
+            reason = (out.stderr.strip().splitlines() or ['failed'])[-1]
+            print(f"{workers or 'inline':>12}  failed: {reason}")
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{workers or 'inline':>12} {r['logins_per_s']:9.1f} {r['login_p50_ms']:8.1f} "
+              f"{r['login_p95_ms']:8.1f} {r['rejected_503']:>5} {r['ping_p50_ms']:9.2f} "
+              f"{r['ping_p95_ms']:9.2f} {r['verify_token_us']:9.2f} {r['user_lookup_us']:7.1f}")
+
+
+if __name__ == '__main__':
+    main()
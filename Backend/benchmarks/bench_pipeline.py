@@ -0,0 +1,277 @@
+# backend/benchmarks/bench_pipeline.py
+"""
+Per-stage benchmark suite for the analysis pipeline, fully offline.
+
+    python benchmarks/bench_pipeline.py [--only pdf skills] [--repeat 20]
+                                        [--save base.json] [--compare base.json]
+                                        [--threshold 0.15]
+
+  pdf/pages=N         extract_text_from_pdf on generated N-page resumes
+  skills/taxonomy=N   extract_skills with a synthetic N-skill taxonomy
+  education, experience
+  embed/single        generate_embedding, one text
+  embed/batch=N       encode_batch of 64 texts at batch size N
+  api/analyze-role, api/analyze-role-force, api/analyze-text
+                      end to end through the Flask test client
+                      (temporary database and upload dir); plain
+                      analyze-role is served from the stored result
+
+--save writes the results as a JSON baseline. --compare reruns and
+reports each case against a baseline: a median more than --threshold
+slower (and at least --floor-ms slower) is a REGRESSION, and the exit
+status is 1 if there are any. Baselines are only comparable on the same
+machine and embedding backend.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_skill_matcher import synthetic_taxonomy, synthetic_resume
+
+EMBED_TEXTS = 64
+
+
+# ---------------------------------------------------------
+# Offline inputs
+# ---------------------------------------------------------
+def _pdf_escape(line: str) -> str:
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages: list) -> bytes:
+    """Minimal text-only PDF (Helvetica, one string per line), one page per list entry."""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for lines in pages:
+        body = 'BT /F1 10 Tf 12 TL 50 790 Td ' + ' '.join(
+            f"({_pdf_escape(line)}) '" for line in lines) + ' ET'
+        stream = body.encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % len(objects))
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+
+    out, offsets = bytearray(b'%PDF-1.4\n'), []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, obj)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % o for o in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def resume_text(rng: random.Random, words: int = 500) -> str:
+    from models.nlp_processor import SKILL_PATTERNS
+    return '\n'.join([
+        'EDUCATION',
+        'Bachelor of Science in Computer Science, State University, 2015 - 2019',
+        'Master of Engineering in Software Systems, Tech Institute, 2019 - 2021',
+        'EXPERIENCE',
+        'Senior Software Engineer, Acme Corp, Jan 2021 - Present',
+        'Software Developer, Initech, 2019 - 2021',
+        synthetic_resume(SKILL_PATTERNS, rng, words),
+    ])
+
+
+def resume_pages(rng: random.Random, count: int) -> list:
+    pages = []
+    for _ in range(count):
+        words = resume_text(rng, 450).split()
+        pages.append([' '.join(words[i:i + 12]) for i in range(0, len(words), 12)][:60])
+    return pages
+
+
+# ---------------------------------------------------------
+# Timing
+# ---------------------------------------------------------
+def measure(fn, repeat: int, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "runs": repeat,
+    }
+
+
+# ---------------------------------------------------------
+# Cases: each yields (name, zero-argument callable)
+# ---------------------------------------------------------
+def pdf_cases(workdir, rng):
+    from utils.pdf_parser import extract_text_from_pdf
+    for pages in (1, 5, 20):
+        path = os.path.join(workdir, f'resume_{pages}p.pdf')
+        with open(path, 'wb') as f:
+            f.write(make_pdf(resume_pages(rng, pages)))
+        assert extract_text_from_pdf(path), f"no text extracted from {path}"
+        yield f'pdf/pages={pages}', lambda path=path: extract_text_from_pdf(path)
+
+
+def skills_cases(workdir, rng):
+    from models import nlp_processor
+    text = resume_text(rng, 800)
+    original = nlp_processor.SKILL_PATTERNS
+    for size in (40, 500, 2000, 5000):
+        patterns = synthetic_taxonomy(size, random.Random(size))
+        # (case, setup, teardown): the taxonomy is swapped once around the timed runs
+        yield f'skills/taxonomy={size}', (
+            lambda: nlp_processor.extract_skills(text, None),
+            lambda p=patterns: nlp_processor.load_skill_taxonomy(p),
+            lambda: nlp_processor.load_skill_taxonomy(original))
+
+
+def profile_cases(workdir, rng):
+    from models.nlp_processor import extract_education, extract_experience
+    text = resume_text(rng, 800)
+    yield 'education', lambda: extract_education(text)
+    yield 'experience', lambda: extract_experience(text)
+
+
+def embed_cases(workdir, rng):
+    from models import embeddings
+    embeddings.ensure_ready()
+    texts = [resume_text(rng, 150) for _ in range(EMBED_TEXTS)]
+    yield 'embed/single', lambda: embeddings.generate_embedding(texts[0])
+    for batch_size in (1, 8, 32, 64):
+        yield f'embed/batch={batch_size}', \
+            lambda bs=batch_size: embeddings.encode_batch(texts, batch_size=bs)
+
+
+def api_cases(workdir, rng):
+    import app as appmod
+    client = appmod.app.test_client()
+    client.post('/api/register', json={'name': 'Bench', 'email': 'bench@example.com',
+                                       'password': 'bench-password'})
+    user = client.post('/api/login', json={'email': 'bench@example.com',
+                                           'password': 'bench-password'}).get_json()
+    headers = {'Authorization': f"Bearer {user['token']}"} if user.get('token') else {}
+    pdf = make_pdf(resume_pages(rng, 2))
+    uploaded = client.post('/api/upload-resume', headers=headers,
+                           data={'user_id': user['user_id'], 'file': (io.BytesIO(pdf), 'bench.pdf')},
+                           content_type='multipart/form-data').get_json()
+    roles = client.get('/api/job-roles').get_json()['roles']
+    role_body = {'user_id': user['user_id'], 'resume_id': uploaded['resume_id'],
+                 'role_id': roles[0]['role_id']}
+    text_body = {'user_id': user['user_id'], 'resume_id': uploaded['resume_id'],
+                 'job_description': 'Backend engineer: Python, Flask, SQL, Docker, AWS, CI/CD.'}
+
+    def post(path, body):
+        response = client.post(path, json=body, headers=headers)
+        assert response.status_code == 200, response.get_json()
+
+    yield 'api/analyze-role', lambda: post('/api/analyze-role', role_body)
+    yield 'api/analyze-role-force', lambda: post('/api/analyze-role', {**role_body, 'force': True})
+    yield 'api/analyze-text', lambda: post('/api/analyze-text', text_body)
+
+
+GROUPS = {'pdf': pdf_cases, 'skills': skills_cases, 'profile': profile_cases,
+          'embed': embed_cases, 'api': api_cases}
+
+
+def run_suite(groups: list, repeat: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix='jobfit-bench-')
+    # the app reads these at import time; keep benchmark data out of data/
+    os.environ.setdefault('JOBFIT_DB_PATH', os.path.join(workdir, 'bench.db'))
+    os.environ.setdefault('JOBFIT_EMBED_STORE_DIR', os.path.join(workdir, 'embeddings'))
+    os.makedirs(os.path.join(workdir, 'uploads'))
+    os.chdir(workdir)
+
+    results = {}
+    for group in groups:
+        for name, fn in GROUPS[group](workdir, random.Random(0)):
+            setup = teardown = None
+            if isinstance(fn, tuple):
+                fn, setup, teardown = fn
+            if setup:
+                setup()
+            try:
+                results[name] = measure(fn, repeat)
+            finally:
+                if teardown:
+                    teardown()
+            print(f"{name:<24} median {results[name]['median_ms']:>10.3f} ms   "
+                  f"p95 {results[name]['p95_ms']:>10.3f} ms")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, floor_ms: float) -> int:
+    """Print a comparison table; returns the number of regressions."""
+    regressions = 0
+    print(f"\n{'case':<24} {'base ms':>10} {'now ms':>10} {'change':>8}")
+    for name, now in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            print(f"{name:<24} {'-':>10} {now['median_ms']:>10.3f} {'new':>8}")
+            continue
+        before, after = base['median_ms'], now['median_ms']
+        change = (after - before) / before if before else 0.0
+        verdict = ''
+        if change > threshold and after - before > floor_ms:
+            verdict, regressions = 'REGRESSION', regressions + 1
+        elif change < -threshold and before - after > floor_ms:
+            verdict = 'faster'
+        print(f"{name:<24} {before:>10.3f} {after:>10.3f} {change:>+7.1%}  {verdict}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--only', nargs='+', choices=sorted(GROUPS), default=list(GROUPS))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.15)
+    parser.add_argument('--floor-ms', type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    save = os.path.abspath(args.save) if args.save else None
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run_suite(args.only, args.repeat)
+    from models import embeddings
+    report = {
+        "meta": {
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "embed_backend": embeddings.EMBED_BACKEND,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if save:
+        with open(save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nbaseline written to {save}")
+    if baseline is not None:
+        if compare(results, baseline, args.threshold, args.floor_ms):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# backend/benchmarks/bench_skill_matcher.py
+"""
+Legacy per-skill regex loop vs. the precompiled SkillMatcher.
+
+    python benchmarks/bench_skill_matcher.py [--sizes 40 500 5000] [--repeat 20]
+
+Checks both return identical lists on every generated resume, then
+prints mean time per resume for each taxonomy size.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models.nlp_processor import SKILL_PATTERNS
+from models.skill_matcher import SkillMatcher
+
+
+def legacy_extract_skills(text: str, patterns: dict) -> list:
+    """The original extract_skills body, kept verbatim for comparison."""
+    skills_found = []
+    text_lower = text.lower()
+    for category, skill_list in patterns.items():
+        for skill in skill_list:
+            if skill.lower() in text_lower:
+                if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower):
+                    skills_found.append(skill)
+    seen = set()
+    return [x for x in skills_found if not (x in seen or seen.add(x))]
+
+
+def synthetic_taxonomy(size: int, rng: random.Random) -> dict:
+    patterns = {k: list(v) for k, v in SKILL_PATTERNS.items()}
+    have = sum(len(v) for v in patterns.values())
+    syllables = ['data', 'cloud', 'net', 'soft', 'ware', 'ops', 'dev', 'sec', 'flow', 'graph',
+                 'ml', 'api', 'stack', 'core', 'edge', 'hub', 'lab', 'kit', 'js', 'db']
+    extra = []
+    while have + len(extra) < size:
+        parts = rng.sample(syllables, rng.randint(1, 3))
+        name = rng.choice([''.join, ' '.join, '-'.join, '.'.join])(parts)
+        extra.append(name.title() if rng.random() < 0.5 else name.upper())
+    patterns['Synthetic'] = extra
+    return patterns
+
+
+def synthetic_resume(patterns: dict, rng: random.Random, words: int = 800) -> str:
+    vocab = [s for v in patterns.values() for s in v]
+    filler = ['led', 'built', 'the', 'team', 'with', 'and', 'for', 'using', 'experience',
+              'years', 'project', 'delivered', '2019-2023', 'present', '(', ')', ',', '.', '\n']
+    out = []
+    for _ in range(words):
+        out.append(rng.choice(vocab) if rng.random() < 0.08 else rng.choice(filler))
+    return ' '.join(out)
+
+
+def _time(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[40, 500, 2000, 5000])
+    parser.add_argument('--resumes', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    print(f"{'skills':>8} {'build ms':>9} {'legacy ms':>10} {'matcher ms':>11} {'speed-up':>9}")
+    for size in args.sizes:
+        patterns = synthetic_taxonomy(size, rng)
+        texts = [synthetic_resume(patterns, rng) for _ in range(args.resumes)]
+
+        t0 = time.perf_counter()
+        matcher = SkillMatcher.from_patterns(patterns)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        for t in texts:
+            assert matcher.find(t) == legacy_extract_skills(t, patterns), "results differ"
+
+        legacy = _time(lambda t: legacy_extract_skills(t, patterns), texts, args.repeat)
+        new = _time(matcher.find, texts, args.repeat)
+        print(f"{sum(len(v) for v in patterns.values()):>8} {build_ms:>9.2f} "
+              f"{legacy:>10.3f} {new:>11.3f} {legacy / new:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,16 +2,120 @@
 import sqlite3
 import os
 import json
+import hashlib
+import itertools
+import queue
+import random
+import threading
+import time
 from datetime import datetime
 import uuid
 
-DB_PATH = os.path.join(os.path.dirname(__file__), 'data', 'job_fit_analyzer.db')
+DB_PATH = os.environ.get('JOBFIT_DB_PATH',
+                         os.path.join(os.path.dirname(__file__), 'data', 'job_fit_analyzer.db'))
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+DB_POOL_SIZE         = int(os.environ.get('JOBFIT_DB_POOL_SIZE', 8))
+DB_BUSY_TIMEOUT_MS   = int(os.environ.get('JOBFIT_DB_BUSY_TIMEOUT_MS', 5000))
+DB_MMAP_SIZE         = int(os.environ.get('JOBFIT_DB_MMAP_SIZE', 256 * 1024 * 1024))
+DB_CACHED_STATEMENTS = int(os.environ.get('JOBFIT_DB_CACHED_STATEMENTS', 256))
+DB_WRITE_RETRIES     = int(os.environ.get('JOBFIT_DB_WRITE_RETRIES', 5))
+
+# analysis_trends.moving_avg is an exponential moving average with
+# alpha = 2 / (TREND_WINDOW + 1), i.e. weighted towards the last ~5 runs
+TREND_WINDOW = 5
+
+# ------------------------------------------------------------------
+#  Connection pool
+# ------------------------------------------------------------------
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to the pool."""
+
+    checkout = 0                      # id of the current checkout, 0 = idle
+
+    def close(self):
+        _release(self)
+
+    def close_for_real(self):
+        super().close()
+
+
+_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+_checkout_lock = threading.Lock()
+_checkout_ids = itertools.count(1)
+
+
+def _connect() -> PooledConnection:
+    conn = sqlite3.connect(DB_PATH, factory=PooledConnection, check_same_thread=False,
+                           timeout=DB_BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=DB_CACHED_STATEMENTS)
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute(f'PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+    conn.execute('PRAGMA foreign_keys = ON')
+    return conn
+
+
+def get_db_connection():
+    """Check a tuned connection out of the pool; close() returns it."""
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    with _checkout_lock:
+        conn.checkout = next(_checkout_ids)
     return conn
 
+
+def _release(conn: PooledConnection, checkout: int = None) -> None:
+    with _checkout_lock:
+        if conn.checkout == 0 or (checkout is not None and conn.checkout != checkout):
+            return                        # already back in the pool
+        conn.checkout = 0
+    if conn.in_transaction:
+        conn.rollback()                   # never pool a half-done write
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close_for_real()
+
+
+def get_db():
+    """The connection bound to the current Flask app context."""
+    from flask import g              # here, so the CLIs never import Flask
+    if 'db' not in g:
+        g.db = get_db_connection()
+        g.db_checkout = g.db.checkout
+    return g.db
+
+
+def close_db(exc=None):
+    from flask import g
+    conn = g.pop('db', None)
+    if conn is not None:
+        _release(conn, g.pop('db_checkout', None))
+
+
+def init_app(app):
+    app.teardown_appcontext(close_db)
+
+
+def run_write(conn, fn, retries: int = DB_WRITE_RETRIES):
+    """
+    Run `fn(conn)` in a transaction, retrying with jittered backoff when
+    SQLite reports the database as locked/busy. Returns fn's result.
+    """
+    for attempt in range(retries + 1):
+        try:
+            with conn:                    # commit, or roll back on error
+                return fn(conn)
+        except sqlite3.OperationalError as e:
+            message = str(e).lower()
+            if attempt == retries or ('locked' not in message and 'busy' not in message):
+                raise
+            time.sleep(min(0.5, 0.01 * 2 ** attempt) * (0.5 + random.random()))
+
 def init_db():
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     conn = get_db_connection()
@@ -71,10 +175,143 @@ def init_db():
         )
     ''')
 
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS processing_jobs (
+            job_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            resume_id TEXT,
+            result TEXT,
+            error TEXT,
+            stage_timings TEXT,
+            created_at REAL,
+            started_at REAL,
+            finished_at REAL
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jd_cache (
+            text_hash TEXT PRIMARY KEY,
+            model_name TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            skills TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            last_used REAL NOT NULL DEFAULT (julianday('now'))
+        )
+    ''')
+
+    # one row per imported job-role file (keyed by content hash): resume point + progress
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS role_imports (
+            import_id TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            format TEXT NOT NULL,
+            status TEXT NOT NULL,
+            byte_offset INTEGER NOT NULL DEFAULT 0,
+            size_bytes INTEGER NOT NULL,
+            rows_read INTEGER NOT NULL DEFAULT 0,
+            imported INTEGER NOT NULL DEFAULT 0,
+            unchanged INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            errors TEXT,
+            error TEXT,
+            started_at REAL,
+            updated_at REAL,
+            finished_at REAL
+        )
+    ''')
+
+    # checkpoint of the background re-embedding job (utils.reembed), per model and table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS reembed_progress (
+            model TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            last_rowid INTEGER NOT NULL DEFAULT 0,
+            rows_done INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            updated_at REAL,
+            PRIMARY KEY (model, table_name)
+        )
+    ''')
+
+    # ----------  columns added after the first release  ----------
+    _ensure_column(conn, 'job_roles', 'jd_hash', 'TEXT')
+    _ensure_column(conn, 'job_roles', 'jd_model', 'TEXT')
+    _ensure_column(conn, 'resumes', 'content_hash', 'TEXT')
+    _ensure_column(conn, 'resumes', 'chunk_embeddings', 'BLOB')
+    if _ensure_column(conn, 'resumes', 'embedding_model', 'TEXT'):
+        # vectors stored before the tag existed all came from the original model
+        from models.embeddings import LEGACY_MODEL_NAME
+        conn.execute('UPDATE resumes SET embedding_model = ? WHERE resume_embedding IS NOT NULL',
+                     (LEGACY_MODEL_NAME,))
+    _ensure_column(conn, 'analysis_history', 'jd_hash', 'TEXT')
+    _ensure_column(conn, 'analysis_history', 'model_version', 'TEXT')
+
     # ----------  indexes  ----------
     conn.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
     conn.execute('CREATE INDEX IF NOT EXISTS idx_resumes_user_id ON resumes(user_id)')
-    conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_history_user_id ON analysis_history(user_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes(content_hash)')
+    # newest-first history pages read only this index (covering)
+    conn.execute('DROP INDEX IF EXISTS idx_analysis_history_user_id')     # prefix of the next one
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_history_user_time '
+                 'ON analysis_history(user_id, timestamp, role_id, job_match_score, analysis_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_history_memo '
+                 'ON analysis_history(resume_id, role_id, jd_hash, model_version)')
+
+    # ----------  change counters (bumped by triggers)  ----------
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('job_roles', 0)")
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_job_roles_{event.lower()}_version
+            AFTER {event} ON job_roles
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE table_name = 'job_roles';
+            END
+        ''')
+
+    # ----------  per-user / per-role score rollup  ----------
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_trends (
+            user_id TEXT NOT NULL,
+            role_id TEXT NOT NULL,
+            analyses INTEGER NOT NULL,
+            best_score REAL NOT NULL,
+            latest_score REAL NOT NULL,
+            latest_at TIMESTAMP,
+            moving_avg REAL NOT NULL,
+            PRIMARY KEY (user_id, role_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            FOREIGN KEY (role_id) REFERENCES job_roles(role_id) ON DELETE CASCADE
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_analysis_trends_insert
+        AFTER INSERT ON analysis_history
+        BEGIN
+            INSERT INTO analysis_trends (user_id, role_id, analyses, best_score,
+                                         latest_score, latest_at, moving_avg)
+            VALUES (NEW.user_id, NEW.role_id, 1, NEW.job_match_score,
+                    NEW.job_match_score, NEW.timestamp, NEW.job_match_score)
+            ON CONFLICT (user_id, role_id) DO UPDATE SET
+                analyses     = analyses + 1,
+                best_score   = MAX(best_score, excluded.best_score),
+                latest_score = excluded.latest_score,
+                latest_at    = excluded.latest_at,
+                moving_avg   = moving_avg + {2 / (TREND_WINDOW + 1)!r} * (excluded.latest_score - moving_avg);
+        END
+    ''')
+    if (conn.execute('SELECT 1 FROM analysis_trends LIMIT 1').fetchone() is None
+            and conn.execute('SELECT 1 FROM analysis_history LIMIT 1').fetchone() is not None):
+        rebuild_analysis_trends(conn)            # history from before the rollup existed
 
     # ----------  16-role seed  ----------
     cursor = conn.execute('SELECT COUNT(*) as count FROM job_roles')
@@ -194,15 +431,98 @@ def init_db():
             }
         ]
 
-        for role in default_roles:
-            conn.execute('''
-                INSERT INTO job_roles (role_id, role_name, job_description, required_skills, industry)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (role['role_id'], role['role_name'], role['job_description'],
-                  role['required_skills'], role['industry']))
+        conn.executemany('''
+            INSERT INTO job_roles (role_id, role_name, job_description, required_skills, industry)
+            VALUES (:role_id, :role_name, :job_description, :required_skills, :industry)
+        ''', default_roles)
 
     conn.commit()
     conn.close()
 
+def _ensure_column(conn, table: str, column: str, decl: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN unless `column` already exists. True if added."""
+    existing = {r['name'] for r in conn.execute(f'PRAGMA table_info({table})')}
+    if column not in existing:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+        return True
+    return False
+
+def content_hash(text: str) -> str:
+    """Stable SHA-256 hex digest of `text` (used to detect edits)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def warm_role_embeddings(conn=None, batch_size=None) -> int:
+    """
+    Encode every job description whose embedding is missing or was built
+    from different text by the current model – in one batched call – and
+    write the vectors back with executemany. Returns rows updated.
+    Vectors from another model are left to the background re-embedding
+    job (utils.reembed).
+    """
+    from models.embeddings import encode_batch, MODEL_NAME, EMBED_BATCH_SIZE
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+
+    rows = conn.execute(
+        'SELECT role_id, job_description, jd_embedding, jd_hash, jd_model FROM job_roles'
+    ).fetchall()
+    stale = []
+    for r in rows:
+        digest = content_hash(r['job_description'])
+        if r['jd_embedding'] is None or (r['jd_model'] == MODEL_NAME and r['jd_hash'] != digest):
+            stale.append((r['role_id'], r['job_description'], digest))
+
+    if stale:
+        vectors = encode_batch([s[1] for s in stale], batch_size or EMBED_BATCH_SIZE)
+        conn.executemany(
+            'UPDATE job_roles SET jd_embedding = ?, jd_hash = ?, jd_model = ? WHERE role_id = ?',
+            [(vec.tobytes(), digest, MODEL_NAME, role_id)
+             for (role_id, _, digest), vec in zip(stale, vectors)]
+        )
+        conn.commit()
+
+    if own_conn:
+        conn.close()
+    return len(stale)
+
+def rebuild_analysis_trends(conn) -> int:
+    """
+    Recompute analysis_trends from analysis_history, replaying each
+    user/role series in order (the trigger keeps it current afterwards).
+    Returns the number of rollup rows. The caller commits.
+    """
+    alpha = 2 / (TREND_WINDOW + 1)
+    trends = {}
+    # rows left behind by deletes made before foreign keys were enforced are skipped
+    for r in conn.execute('SELECT user_id, role_id, job_match_score, timestamp FROM analysis_history '
+                          'WHERE user_id IN (SELECT user_id FROM users) '
+                          'AND role_id IN (SELECT role_id FROM job_roles) '
+                          'ORDER BY user_id, role_id, timestamp, rowid'):
+        key, score = (r['user_id'], r['role_id']), r['job_match_score']
+        t = trends.get(key)
+        if t is None:
+            trends[key] = [1, score, score, r['timestamp'], score]
+        else:
+            t[0] += 1
+            t[1] = max(t[1], score)
+            t[2], t[3] = score, r['timestamp']
+            t[4] += alpha * (score - t[4])
+    conn.execute('DELETE FROM analysis_trends')
+    conn.executemany('''
+        INSERT INTO analysis_trends (user_id, role_id, analyses, best_score,
+                                     latest_score, latest_at, moving_avg)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(*key, *t) for key, t in trends.items()])
+    return len(trends)
+
+def get_table_version(conn, table_name: str) -> int:
+    """Return the change counter the triggers keep for `table_name`."""
+    row = conn.execute(
+        'SELECT version FROM table_versions WHERE table_name = ?', (table_name,)
+    ).fetchone()
+    return row['version'] if row else 0
+
 def generate_id():
     return str(uuid.uuid4())
\ No newline at end of file
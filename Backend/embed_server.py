@@ -0,0 +1,29 @@
+# backend/embed_server.py
+"""
+Run the shared embedding sidecar.
+
+    python embed_server.py [--socket /tmp/jobfit-embed.sock]
+
+Start it before the web workers and give them the same path in
+JOBFIT_EMBED_SOCKET; they then encode through it instead of each
+loading the model (and fall back to loading it if the socket goes away).
+JOBFIT_EMBED_BACKEND / JOBFIT_EMBED_THREADS / JOBFIT_BATCH_* apply here.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from models.embed_service import serve, EMBED_SOCKET
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--socket', default=EMBED_SOCKET or '/tmp/jobfit-embed.sock')
+    args = parser.parse_args(argv)
+    serve(args.socket)
+
+
+if __name__ == '__main__':
+    main()
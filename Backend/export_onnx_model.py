@@ -0,0 +1,29 @@
+# backend/export_onnx_model.py
+"""
+Export all-MiniLM-L6-v2 for the ONNX Runtime embedding backend.
+
+    python export_onnx_model.py [--out data/onnx/all-MiniLM-L6-v2] [--no-int8]
+
+Writes model.onnx, model_int8.onnx (dynamic int8 weights) and the
+tokenizer. Run once per deployment, then start the server with
+JOBFIT_EMBED_BACKEND=onnx or onnx-int8 (which no longer loads torch).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from models.embeddings import export_onnx, ONNX_DIR
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--out', default=ONNX_DIR)
+    parser.add_argument('--no-int8', action='store_true')
+    args = parser.parse_args(argv)
+    export_onnx(args.out, quantize=not args.no_int8)
+
+
+if __name__ == '__main__':
+    main()
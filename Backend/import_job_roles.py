@@ -0,0 +1,66 @@
+# backend/import_job_roles.py
+"""
+Bulk import of job roles from CSV or JSONL posting feeds.
+
+    python import_job_roles.py roles.csv more_roles.jsonl [--chunk-size 256]
+                               [--format csv|jsonl] [--restart]
+
+Columns/keys: role_name (or title), job_description (or description),
+optional required_skills (JSON list or ;-separated) and industry.
+Roles are upserted by name. Progress goes to stderr after every chunk;
+one JSON summary per file goes to stdout. Re-running an interrupted
+import resumes it; --restart starts the file over.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import database
+from utils.role_import import import_roles, IMPORT_CHUNK_ROWS, FORMATS
+
+
+def _progress(started: float, size: int):
+    def report(state):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        print(json.dumps({
+            "rows_read": state['rows_read'],
+            "imported": state['imported'],
+            "unchanged": state['unchanged'],
+            "failed": state['failed'],
+            "percent": round(100 * state['byte_offset'] / size, 1) if size else 100.0,
+            "elapsed_s": round(elapsed, 1)
+        }), file=sys.stderr, flush=True)
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Import job roles from CSV/JSONL files.')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--format', choices=FORMATS, help='default: from the file extension')
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_ROWS)
+    parser.add_argument('--restart', action='store_true', help='ignore saved checkpoints')
+    args = parser.parse_args(argv)
+
+    database.init_db()
+    for path in args.paths:
+        started = time.perf_counter()
+        try:
+            state = import_roles(path, args.format, chunk_rows=args.chunk_size, restart=args.restart,
+                                 progress=_progress(started, os.path.getsize(path)))
+        except KeyboardInterrupt:
+            print(f"Interrupted: run again to resume {path}", file=sys.stderr)
+            return 130
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+        print(json.dumps({"source": path, **{k: state[k] for k in (
+            'import_id', 'status', 'rows_read', 'imported', 'unchanged', 'failed', 'errors')}}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# backend/ingest_resumes.py
+"""
+Offline bulk resume import.
+
+    python ingest_resumes.py --user-id <id> resumes/*.pdf some_folder/
+
+PDFs are copied into uploads/ (as the upload endpoint does), parsed in a
+process pool, encoded in batches and inserted in one transaction.
+Prints one JSON line per file.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import database
+from utils import pdf_parser
+from utils.resume_ingest import ingest_resumes, INGEST_WORKERS
+
+UPLOAD_FOLDER = 'uploads'
+
+
+def _collect_pdfs(paths: list) -> list:
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith('.pdf'):
+                    found.append(os.path.join(path, name))
+        else:
+            found.append(path)
+    return found
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Bulk-import resume PDFs for one user.')
+    parser.add_argument('--user-id', required=True)
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS)
+    parser.add_argument('paths', nargs='+', help='PDF files or folders containing PDFs')
+    args = parser.parse_args(argv)
+
+    database.init_db()
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+    files = []
+    for src in _collect_pdfs(args.paths):
+        filename = f"{args.user_id}_{os.path.basename(src)}"
+        dest = os.path.join(UPLOAD_FOLDER, f"{args.user_id}_{database.generate_id()}_{os.path.basename(src)}")
+        shutil.copyfile(src, dest)
+        files.append((filename, dest))
+
+    pdf_parser.PDF_WORKERS = args.workers            # size of the shared pool, set before first use
+    results = ingest_resumes(args.user_id, files, workers=args.workers)
+    for (_, dest), result in zip(files, results):
+        if result["status"] == "error":
+            os.remove(dest)
+        print(json.dumps(result))
+
+    failed = sum(1 for r in results if r["status"] == "error")
+    print(f"{len(results) - failed} imported, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
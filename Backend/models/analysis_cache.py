@@ -0,0 +1,106 @@
+# backend/models/analysis_cache.py
+import json
+import os
+import threading
+from collections import OrderedDict
+from models import embeddings
+from utils import metrics
+
+ANALYSIS_CACHE_MAX_ITEMS = int(os.environ.get('JOBFIT_ANALYSIS_CACHE_ITEMS', 2048))
+
+
+def model_version() -> str:
+    """What a stored score depends on besides its inputs: model, backend and scoring mode."""
+    version = embeddings.MODEL_NAME
+    if embeddings.EMBED_BACKEND != 'torch':                 # onnx scores differ slightly
+        version += f"+{embeddings.EMBED_BACKEND}"
+    if embeddings.CHUNK_MODE != 'off':
+        version += f"+chunks:{embeddings.CHUNK_MODE}"
+    return version
+
+
+class AnalysisCache:
+    """
+    Memoised /analyze-role results, keyed by
+    (user_id, resume_id, role_id, role content hash, model version).
+
+      tier 1 – in-process LRU, at most `max_items` entries
+      tier 2 – the newest matching `analysis_history` row
+
+    Entries are the stored analysis: analysis_id, job_match_score,
+    missing_skills, recommendations.
+    """
+
+    def __init__(self, max_items: int = ANALYSIS_CACHE_MAX_ITEMS):
+        self.max_items = max_items
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get(self, conn, key: tuple):
+        """Stored analysis for `key`, or None (counted as a miss)."""
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        row = conn.execute('''
+            SELECT analysis_id, job_match_score, missing_skills, recommendations
+            FROM analysis_history
+            WHERE user_id = ? AND resume_id = ? AND role_id = ? AND jd_hash = ? AND model_version = ?
+            ORDER BY timestamp DESC, rowid DESC LIMIT 1
+        ''', key).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        entry = {
+            "analysis_id": row['analysis_id'],
+            "job_match_score": row['job_match_score'],
+            "missing_skills": json.loads(row['missing_skills']),
+            "recommendations": json.loads(row['recommendations'])
+        }
+        with self._lock:
+            self.db_hits += 1
+        self.put(key, entry)
+        return entry
+
+    def put(self, key: tuple, entry: dict) -> None:
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+
+    def forget_user(self, user_id: str) -> None:
+        """Drop a user's entries once their history rows are deleted."""
+        with self._lock:
+            for key in [k for k in self._lru if k[0] == user_id]:
+                del self._lru[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._lru),
+                "memory_max_entries": self.max_items
+            }
+
+
+analysis_cache = AnalysisCache()
+
+metrics.gauge('jobfit_analysis_cache_lookups_total', 'Memoised analyze-role lookups by result.',
+              lambda: [({"result": "memory_hit"}, analysis_cache.memory_hits),
+                       ({"result": "db_hit"}, analysis_cache.db_hits),
+                       ({"result": "miss"}, analysis_cache.misses)], 'counter')
+metrics.gauge('jobfit_analysis_cache_hit_ratio', 'Share of analyze-role requests served from stored results.',
+              lambda: analysis_cache.stats()["hit_rate"])
@@ -0,0 +1,257 @@
+# backend/models/embed_service.py
+"""
+Shared embedding sidecar: one process holds the model and serves encode
+requests from every Flask worker over a Unix domain socket.
+
+    python embed_server.py                       # JOBFIT_EMBED_SOCKET or --socket
+    JOBFIT_EMBED_SOCKET=/tmp/jobfit-embed.sock   # in the workers' environment
+
+Framing (little-endian):
+
+    request   op:u8  n:u32  then n x (len:u32, utf-8 bytes)
+    response  status:u8, then
+                ok + ENCODE   rows:u32  dim:u32  rows*dim float32
+                ok + INFO     len:u32  JSON {model, backend, dim}
+                error         len:u32  utf-8 message
+
+Requests of up to JOBFIT_BATCH_MAX_SIZE texts go through the server's
+micro-batcher, so concurrent requests from different workers share a
+forward pass; bigger ones are encoded directly in batches.
+"""
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+import numpy as np
+
+EMBED_SOCKET         = os.environ.get('JOBFIT_EMBED_SOCKET', '')       # '' = in-process only
+EMBED_SOCKET_TIMEOUT_S = float(os.environ.get('JOBFIT_EMBED_SOCKET_TIMEOUT_S', 30))
+EMBED_SOCKET_RETRY_S   = float(os.environ.get('JOBFIT_EMBED_SOCKET_RETRY_S', 30))
+
+OP_ENCODE, OP_INFO = 1, 2
+STATUS_OK, STATUS_ERROR = 0, 1
+MAX_TEXTS = 4096
+MAX_TEXT_BYTES = 1024 * 1024
+
+_U8, _U32 = struct.Struct('<B'), struct.Struct('<I')
+_HEAD = struct.Struct('<BI')                   # op / status + count or length
+_MATRIX = struct.Struct('<BII')                # status, rows, dim
+
+
+class ServiceError(Exception):
+    """The sidecar answered with an error frame: it is up, this request failed."""
+
+
+# ---------------------------------------------------------
+# Framing
+# ---------------------------------------------------------
+def _recv_exact(sock, n: int) -> bytes:
+    buf = bytearray(n)
+    view, got = memoryview(buf), 0
+    while got < n:
+        read = sock.recv_into(view[got:])
+        if not read:
+            raise ConnectionError("socket closed mid-frame")
+        got += read
+    return bytes(buf)
+
+
+def pack_request(op: int, texts=()) -> bytes:
+    parts = [_HEAD.pack(op, len(texts))]
+    for text in texts:
+        # the model truncates far below MAX_TEXT_BYTES (256 tokens), so clipping
+        # here changes no vector, it only keeps the server from rejecting the text
+        data = text.encode('utf-8', 'replace')[:MAX_TEXT_BYTES]
+        parts += [_U32.pack(len(data)), data]
+    return b''.join(parts)
+
+
+def read_request(sock):
+    op, n = _HEAD.unpack(_recv_exact(sock, _HEAD.size))
+    if n > MAX_TEXTS:
+        raise ValueError(f"too many texts ({n} > {MAX_TEXTS})")
+    texts = []
+    for _ in range(n):
+        (size,) = _U32.unpack(_recv_exact(sock, _U32.size))
+        if size > MAX_TEXT_BYTES:
+            raise ValueError(f"text too long ({size} bytes)")
+        texts.append(_recv_exact(sock, size).decode('utf-8', 'replace'))
+    return op, texts
+
+
+def pack_matrix(matrix: np.ndarray) -> bytes:
+    matrix = np.ascontiguousarray(matrix, dtype='<f4')
+    return _MATRIX.pack(STATUS_OK, *matrix.shape) + matrix.tobytes()
+
+
+def pack_blob(status: int, data: bytes) -> bytes:
+    return _HEAD.pack(status, len(data)) + data
+
+
+def _read_response(sock, op: int):
+    (status,) = _U8.unpack(_recv_exact(sock, _U8.size))
+    if status != STATUS_OK or op == OP_INFO:
+        (size,) = _U32.unpack(_recv_exact(sock, _U32.size))
+        data = _recv_exact(sock, size)
+        if status != STATUS_OK:
+            raise ServiceError(data.decode('utf-8', 'replace'))
+        return json.loads(data)
+    rows, dim = struct.unpack('<II', _recv_exact(sock, 8))
+    return np.frombuffer(_recv_exact(sock, rows * dim * 4), dtype='<f4').reshape(rows, dim)
+
+
+# ---------------------------------------------------------
+# Client (used by models.embeddings)
+# ---------------------------------------------------------
+class EmbedClient:
+    """
+    One persistent connection per thread. A transport failure marks the
+    sidecar down for `retry_s`, during which encode() returns None and
+    callers fall back to the in-process model. An error reply fails only
+    that request.
+    """
+
+    def __init__(self, path: str, model_name: str, timeout: float = EMBED_SOCKET_TIMEOUT_S,
+                 retry_s: float = EMBED_SOCKET_RETRY_S):
+        self.path = path
+        self.model_name = model_name
+        self.timeout = timeout
+        self.retry_s = retry_s
+        self.info = None
+        self._local = threading.local()
+        self._down_until = 0.0
+        self.requests = 0
+        self.fallbacks = 0
+
+    def _sock(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _call(self, op: int, texts=()):
+        sock = self._sock()
+        try:
+            sock.sendall(pack_request(op, texts))
+            return _read_response(sock, op)
+        except Exception:
+            self._drop()
+            raise
+
+    def _drop(self) -> None:
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _down(self, reason) -> None:
+        if self._down_until <= time.monotonic():
+            print(f"Embedding sidecar unavailable ({reason}); using the in-process model")
+        self._down_until = time.monotonic() + self.retry_s
+
+    def available(self) -> bool:
+        if time.monotonic() < self._down_until:
+            return False
+        if self.info is None:
+            try:
+                info = self._call(OP_INFO)
+            except (OSError, ConnectionError, ServiceError, ValueError) as e:
+                self._down(e)
+                return False
+            if info.get('model') != self.model_name:
+                self._down(f"serves {info.get('model')!r}, expected {self.model_name!r}")
+                return False
+            self.info = info
+        return True
+
+    def encode(self, texts: list):
+        """
+        (n, dim) float32 matrix, or None if the in-process path must be used.
+        Raises ServiceError when the sidecar rejects or fails this request.
+        """
+        if not self.available():
+            self.fallbacks += 1
+            return None
+        try:
+            matrix = self._call(OP_ENCODE, texts)
+        except (OSError, ConnectionError, struct.error) as e:
+            self._down(e)
+            self.info = None
+            self.fallbacks += 1
+            return None
+        self.requests += 1
+        return matrix
+
+    def stats(self) -> dict:
+        return {"socket": self.path, "connected": self.info is not None,
+                "requests": self.requests, "fallbacks": self.fallbacks, "server": self.info}
+
+
+# ---------------------------------------------------------
+# Server
+# ---------------------------------------------------------
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        from models import embeddings
+        sock = self.request
+        while True:
+            try:
+                op, texts = read_request(sock)
+            except (ConnectionError, OSError):
+                return                                    # client went away
+            except (ValueError, struct.error) as e:
+                sock.sendall(pack_blob(STATUS_ERROR, str(e).encode()))
+                return                                    # framing lost; drop the connection
+            try:
+                if op == OP_INFO:
+                    info = {"model": embeddings.MODEL_NAME, "backend": embeddings.EMBED_BACKEND,
+                            "dim": embeddings.get_model().get_sentence_embedding_dimension()}
+                    reply = pack_blob(STATUS_OK, json.dumps(info).encode())
+                elif op == OP_ENCODE:
+                    if len(texts) <= embeddings.batcher.max_batch:
+                        futures = [embeddings.batcher.submit(t) for t in texts]
+                        reply = pack_matrix(np.stack([f.result() for f in futures]) if futures
+                                            else embeddings.encode_batch([]))
+                    else:
+                        reply = pack_matrix(embeddings.encode_batch(texts))
+                else:
+                    reply = pack_blob(STATUS_ERROR, f"unknown op {op}".encode())
+            except Exception as e:
+                reply = pack_blob(STATUS_ERROR, f"{type(e).__name__}: {e}".encode())
+            sock.sendall(reply)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128                      # every worker thread connects once
+
+
+def serve(path: str = EMBED_SOCKET) -> None:
+    """Load the model once and serve encode requests on `path` until killed."""
+    from models import embeddings
+    if not path:
+        raise SystemExit("no socket path (set JOBFIT_EMBED_SOCKET or pass --socket)")
+    embeddings.sidecar = None                     # the server must encode in-process
+    embeddings.get_model()
+    if os.path.exists(path):
+        os.unlink(path)                           # stale socket from a previous run
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))   # still unlink the socket
+    with _Server(path, _Handler) as server:
+        os.chmod(path, 0o660)
+        print(f"Embedding sidecar listening on {path}")
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
@@ -0,0 +1,417 @@
+# backend/models/embedding_store.py
+"""
+Resume embeddings as one append-only, memory-mapped matrix kept beside the
+SQLite database, so bulk scoring never has to pull BLOBs through SQLite.
+
+    <dir>/vectors.npy   (n, dim) float32 | float16 | int8, L2-normalised rows
+    <dir>/scales.npy    (n,) float32 per-row scale (int8 only)
+    <dir>/ids.txt       resume_id of row i on line i
+    <dir>/deleted.txt   tombstoned row numbers
+    <dir>/model.txt     embedding model of every row (absent: the legacy model)
+
+The .npy files carry a fixed-size header that is rewritten after every
+append, so `np.load(path, mmap_mode='r')` works on them directly. Rows are
+only ever appended; deleting or re-adding a resume tombstones its old row
+and rebuild() compacts. The `resumes` table stays the source of truth:
+sync() repairs any drift (e.g. a crash between the DB insert and the
+store append). Only vectors from the current embedding model are kept;
+a store built by another model is rebuilt on sync().
+"""
+import os
+import shutil
+import struct
+import threading
+import numpy as np
+import database
+from models.embeddings import get_embedding_from_bytes, MODEL_NAME, LEGACY_MODEL_NAME
+
+try:
+    import fcntl                       # cross-process append lock (POSIX)
+except ImportError:
+    fcntl = None
+
+EMBED_STORE_DIR = os.environ.get(
+    'JOBFIT_EMBED_STORE_DIR', os.path.join(os.path.dirname(database.DB_PATH), 'embeddings'))
+EMBED_STORE_DTYPE = os.environ.get('JOBFIT_EMBED_STORE_DTYPE', 'int8')  # float32|float16|int8
+SCAN_BLOCK_ROWS   = int(os.environ.get('JOBFIT_EMBED_SCAN_BLOCK_ROWS', 4096))
+
+DTYPES = ('float32', 'float16', 'int8')
+_HEADER_BYTES = 128                    # fixed, so the shape can be rewritten in place
+_MAGIC = b'\x93NUMPY\x01\x00'
+
+
+# ---------------------------------------------------------
+# .npy header / quantisation helpers
+# ---------------------------------------------------------
+def _write_header(f, dtype: np.dtype, shape: tuple) -> None:
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (dtype.str, shape)
+    header = header.ljust(_HEADER_BYTES - len(_MAGIC) - 3) + '\n'
+    f.seek(0)
+    f.write(_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1'))
+
+
+def _read_header(path: str):
+    with open(path, 'rb') as f:
+        np.lib.format.read_magic(f)
+        shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+    return np.dtype(dtype), shape
+
+
+def _append_rows(path: str, rows: np.ndarray, offset: int) -> None:
+    """Write `rows` starting at row `offset`, then record the new length."""
+    with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+        f.seek(_HEADER_BYTES + offset * rows[:1].nbytes)
+        f.write(np.ascontiguousarray(rows).tobytes())
+        f.truncate()
+        f.flush()
+        _write_header(f, rows.dtype, (offset + len(rows),) + rows.shape[1:])
+
+
+def normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def quantize(matrix: np.ndarray, dtype: str):
+    """float32 rows → (stored rows, per-row scales or None)."""
+    if dtype == 'int8':
+        scales = np.abs(matrix).max(axis=1) / 127
+        scales[scales == 0] = 1
+        return np.rint(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+    return matrix.astype(dtype), None
+
+
+# ---------------------------------------------------------
+# Store
+# ---------------------------------------------------------
+class EmbeddingStore:
+    def __init__(self, directory: str = EMBED_STORE_DIR, dtype: str = EMBED_STORE_DTYPE):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}")
+        self.directory = directory
+        self.dtype = np.dtype(dtype)    # an existing store keeps its own dtype
+        self.version = 0                # bumped on every change
+        self._lock = threading.RLock()
+        self._stamp = ()                # file stamp of the state loaded
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ---------- loading ----------
+    def _file_stamp(self):
+        stamp = []
+        for name in ('vectors.npy', 'deleted.txt'):
+            try:
+                st = os.stat(self._path(name))
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _load(self) -> None:
+        """(Re)read the index when the files changed, e.g. in another process."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+
+        vec_path = self._path('vectors.npy')
+        count, dim = 0, None
+        if stamp[0]:
+            self.dtype, (count, dim) = _read_header(vec_path)
+        ids = []
+        if os.path.exists(self._path('ids.txt')):
+            with open(self._path('ids.txt')) as f:
+                ids = f.read().split()
+        if len(ids) > count:            # crash after ids, before the header
+            ids = ids[:count]
+            self._write_lines('ids.txt', ids, mode='w')
+        count = len(ids)
+
+        rows, dead = {}, set()
+        for i, resume_id in enumerate(ids):
+            if resume_id in rows:
+                dead.add(rows[resume_id])
+            rows[resume_id] = i
+        if os.path.exists(self._path('deleted.txt')):
+            with open(self._path('deleted.txt')) as f:
+                for row in map(int, f.read().split()):
+                    if row < count:
+                        dead.add(row)
+                        if rows.get(ids[row]) == row:
+                            del rows[ids[row]]
+
+        self._ids, self._rows, self._dead, self._dim = ids, rows, dead, dim
+        self._map(stamp)
+
+    def _map(self, stamp) -> None:
+        count = len(self._ids)
+        self._matrix = self._scales = None
+        if count:
+            self._matrix = np.memmap(self._path('vectors.npy'), self.dtype, 'r',
+                                     offset=_HEADER_BYTES, shape=(count, self._dim))
+            if self.dtype == np.int8:
+                self._scales = np.memmap(self._path('scales.npy'), np.float32, 'r',
+                                         offset=_HEADER_BYTES, shape=(count,))
+        self._live = None
+        self._stamp = stamp
+        self.version += 1
+
+    def _write_lines(self, name: str, items, mode: str = 'a') -> None:
+        with open(self._path(name), mode) as f:
+            f.write(''.join(f'{item}\n' for item in items))
+
+    def stored_model(self):
+        """Model the stored vectors came from (None while the store is empty)."""
+        try:
+            with open(self._path('model.txt')) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return LEGACY_MODEL_NAME if os.path.exists(self._path('vectors.npy')) else None
+
+    def _file_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        return _FileLock(self._path('store.lock'))
+
+    # ---------- writes ----------
+    def add_many(self, resume_ids: list, vectors) -> None:
+        """Append embeddings; an id already present is replaced."""
+        if not len(resume_ids):
+            return
+        vectors = normalise(np.asarray(vectors, dtype=np.float32).reshape(len(resume_ids), -1))
+        with self._lock, self._file_lock():
+            self._load()
+            data, scales = quantize(vectors, self.dtype.name)
+            if self._dim is not None and data.shape[1] != self._dim:
+                raise ValueError(f"expected {self._dim}-d vectors, got {data.shape[1]}")
+            replaced = [self._rows[r] for r in resume_ids if r in self._rows]
+            start = len(self._ids)
+            if start == 0:
+                self._write_lines('model.txt', [MODEL_NAME], mode='w')
+            if scales is not None:
+                _append_rows(self._path('scales.npy'), scales, start)
+            self._write_lines('ids.txt', resume_ids)
+            if replaced:
+                self._write_lines('deleted.txt', replaced)
+            _append_rows(self._path('vectors.npy'), data, start)   # commits the rows
+
+            # update the index incrementally instead of re-reading ids.txt;
+            # new lists so earlier snapshots stay consistent
+            self._ids = self._ids + list(resume_ids)
+            self._dead.update(replaced)
+            for i, resume_id in enumerate(resume_ids, start):
+                if resume_id in self._rows:
+                    self._dead.add(self._rows[resume_id])
+                self._rows[resume_id] = i
+            self._dim = data.shape[1]
+            self._map(self._file_stamp())
+
+    def add(self, resume_id: str, vector) -> None:
+        self.add_many([resume_id], np.asarray(vector)[None, :])
+
+    def delete(self, resume_ids: list) -> int:
+        """Tombstone the given resumes; returns how many were present."""
+        with self._lock, self._file_lock():
+            self._load()
+            rows = [self._rows[r] for r in resume_ids if r in self._rows]
+            if rows:
+                self._write_lines('deleted.txt', rows)
+                for resume_id in resume_ids:
+                    self._rows.pop(resume_id, None)
+                self._dead = self._dead | set(rows)
+                self._live = None
+                self._stamp = self._file_stamp()
+                self.version += 1
+            return len(rows)
+
+    # ---------- reads ----------
+    def snapshot(self):
+        """
+        (ids, matrix, scales, live) as of now: `matrix` is a read-only
+        memmap (None when empty), `live` a boolean mask of non-tombstoned
+        rows. Safe to use after later appends.
+        """
+        with self._lock:
+            self._load()
+            if self._live is None:
+                live = np.ones(len(self._ids), dtype=bool)
+                live[list(self._dead)] = False
+                self._live = live
+            return self._ids, self._matrix, self._scales, self._live
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._rows)
+
+    def __contains__(self, resume_id: str) -> bool:
+        with self._lock:
+            self._load()
+            return resume_id in self._rows
+
+    def rows_of(self, resume_ids) -> np.ndarray:
+        """Sorted live row numbers of the given resumes (unknown ids skipped)."""
+        with self._lock:
+            self._load()
+            return np.sort(np.fromiter((self._rows[r] for r in resume_ids if r in self._rows),
+                                       dtype=np.int64))
+
+    def get(self, resume_id: str):
+        """Dequantised (unit-length) float32 embedding, or None."""
+        with self._lock:
+            self._load()
+            row = self._rows.get(resume_id)
+            if row is None:
+                return None
+            vec = np.asarray(self._matrix[row], dtype=np.float32)
+            return vec * self._scales[row] if self._scales is not None else vec
+
+    def scores(self, query, block_rows: int = SCAN_BLOCK_ROWS):
+        """
+        Cosine similarity of `query` with every row, scanned block by block
+        so only one block is ever converted to float32. Tombstoned rows
+        score -inf. Returns (ids, scores).
+        """
+        ids, matrix, scales, live = self.snapshot()
+        out = np.full(len(ids), -np.inf, dtype=np.float32)
+        if matrix is None:
+            return ids, out
+        q = normalise(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        for start in range(0, len(ids), block_rows):
+            block = np.asarray(matrix[start:start + block_rows], dtype=np.float32) @ q
+            if scales is not None:
+                block *= scales[start:start + block_rows]
+            out[start:start + block_rows] = block
+        out[~live] = -np.inf
+        return ids, out
+
+    def top_k(self, query, k: int = 10) -> list:
+        """[(resume_id, cosine), ...] best first, exact."""
+        ids, scores = self.scores(query)
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    # ---------- consistency with the DB ----------
+    def sync(self, conn=None, batch_size: int = 500) -> dict:
+        """
+        Add resumes missing from the store, drop ones no longer in the DB
+        or not (yet) re-embedded with the current model. A store built by
+        another model is rebuilt instead.
+        """
+        if self.stored_model() not in (None, MODEL_NAME):
+            return {"rebuilt": self.rebuild(conn)}
+        own = conn is None
+        conn = conn or database.get_db_connection()
+        try:
+            db_ids = {r[0] for r in conn.execute(
+                'SELECT resume_id FROM resumes WHERE resume_embedding IS NOT NULL '
+                'AND embedding_model = ?', (MODEL_NAME,))}
+            with self._lock:
+                self._load()
+                missing = [r for r in db_ids if r not in self._rows]
+                extra = [r for r in self._rows if r not in db_ids]
+            for i in range(0, len(missing), batch_size):
+                chunk = missing[i:i + batch_size]
+                rows = conn.execute(
+                    'SELECT resume_id, resume_embedding FROM resumes WHERE resume_id IN '
+                    f'({",".join("?" * len(chunk))})', chunk).fetchall()
+                if rows:
+                    self.add_many([r['resume_id'] for r in rows],
+                                  np.stack([get_embedding_from_bytes(r['resume_embedding'])
+                                            for r in rows]))
+        finally:
+            if own:
+                conn.close()
+        self.delete(extra)
+        return {"added": len(missing), "removed": len(extra)}
+
+    def rebuild(self, conn=None, dtype: str = None, batch_size: int = 1024) -> int:
+        """
+        Re-create the store from `resumes` (compacting tombstones, applying
+        `dtype`, by default the store's own) in a side directory, then swap
+        it in. Returns the row count.
+        """
+        tmp = EmbeddingStore(self.directory + '.rebuild', dtype or self.dtype.name)
+        shutil.rmtree(tmp.directory, ignore_errors=True)
+        own = conn is None
+        conn = conn or database.get_db_connection()
+        try:
+            cursor = conn.execute('SELECT resume_id, resume_embedding FROM resumes '
+                                  'WHERE resume_embedding IS NOT NULL AND embedding_model = ? '
+                                  'ORDER BY created_at', (MODEL_NAME,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                tmp.add_many([r['resume_id'] for r in rows],
+                             np.stack([get_embedding_from_bytes(r['resume_embedding'])
+                                       for r in rows]))
+            with self._lock:
+                old = self.directory + '.old'
+                shutil.rmtree(old, ignore_errors=True)
+                if os.path.exists(self.directory):
+                    os.replace(self.directory, old)
+                os.makedirs(tmp.directory, exist_ok=True)
+                os.replace(tmp.directory, self.directory)
+                shutil.rmtree(old, ignore_errors=True)
+                self.dtype = tmp.dtype  # an empty rebuild has no header to read it from
+                self._stamp = ()
+                self._load()
+            self.sync(conn)             # uploads that landed during the copy
+        finally:
+            if own:
+                conn.close()
+        return len(self)
+
+    def stats(self) -> dict:
+        ids, matrix, scales, live = self.snapshot()
+        return {
+            "directory": self.directory,
+            "dtype": self.dtype.name,
+            "dim": self._dim,
+            "model": self.stored_model(),
+            "rows": len(ids),
+            "live": int(live.sum()),
+            "bytes": (matrix.nbytes if matrix is not None else 0)
+                     + (scales.nbytes if scales is not None else 0),
+            "version": self.version,
+        }
+
+
+class _FileLock:
+    """Exclusive flock on `path` where available (no-op elsewhere)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self):
+        self._f = open(self.path, 'a')
+        if fcntl:
+            fcntl.flock(self._f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+        self._f.close()
+
+
+embedding_store = EmbeddingStore()
+
+
+def store_resumes(resume_ids: list, vectors) -> None:
+    """Best-effort store append after a DB insert; sync() repairs failures."""
+    try:
+        embedding_store.add_many(resume_ids, vectors)
+    except (OSError, ValueError) as e:
+        print(f"Embedding store append failed ({e}); will resync")
+
+
+def forget_resumes(resume_ids: list) -> None:
+    try:
+        embedding_store.delete(resume_ids)
+    except OSError as e:
+        print(f"Embedding store delete failed ({e}); will resync")
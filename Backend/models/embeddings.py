@@ -1,26 +1,247 @@
 # backend/models/embeddings.py
-from sentence_transformers import SentenceTransformer
+from concurrent.futures import Future
 import numpy as np
+import os
+import queue
+import re
+import threading
+import time
+from models.embed_service import EmbedClient, EMBED_SOCKET, MAX_TEXTS
+from utils import metrics
 
-MODEL_NAME = 'all-MiniLM-L6-v2'
+# Every stored vector is tagged with the model that produced it; rows
+# tagged with another model are re-encoded by utils.reembed.
+LEGACY_MODEL_NAME = 'all-MiniLM-L6-v2'           # produced all untagged vectors
+MODEL_NAME = os.environ.get('JOBFIT_EMBED_MODEL', LEGACY_MODEL_NAME)
+EMBED_BATCH_SIZE = int(os.environ.get('JOBFIT_EMBED_BATCH_SIZE', 32))
+BATCH_MAX_SIZE   = int(os.environ.get('JOBFIT_BATCH_MAX_SIZE', 32))
+BATCH_MAX_WAIT_MS = float(os.environ.get('JOBFIT_BATCH_MAX_WAIT_MS', 5))
+
+# Chunked resume embeddings: 'off' (one vector per resume), or score a
+# resume by the 'max' / 'topk_mean' of its chunk-vs-JD similarities
+CHUNK_MODE    = os.environ.get('JOBFIT_CHUNK_MODE', 'off')
+CHUNK_TOKENS  = int(os.environ.get('JOBFIT_CHUNK_TOKENS', 200))   # model max is 256
+CHUNK_OVERLAP = int(os.environ.get('JOBFIT_CHUNK_OVERLAP', 50))
+CHUNK_TOP_K   = int(os.environ.get('JOBFIT_CHUNK_TOP_K', 3))
+MAX_CHUNKS    = int(os.environ.get('JOBFIT_MAX_CHUNKS', 32))
+
+# Inference backend: 'torch' (SentenceTransformer), 'onnx' or 'onnx-int8'
+# (onnxruntime CPU, the latter with dynamically int8-quantised weights).
+# 0 threads = the library default.
+EMBED_BACKEND = os.environ.get('JOBFIT_EMBED_BACKEND', 'torch')
+EMBED_THREADS = int(os.environ.get('JOBFIT_EMBED_THREADS', 0))
+ONNX_DIR      = os.environ.get('JOBFIT_ONNX_DIR', os.path.join(
+    os.path.dirname(__file__), '..', 'data', 'onnx', MODEL_NAME))
+ONNX_MAX_SEQ  = 256                              # all-MiniLM-L6-v2's max_seq_length
 
 # ---------------------------------------------------------
-# 1.  Load model **once** at import  (fails fast if missing)
+# 1.  Load model **once**, on first use (sentence_transformers /
+#     onnxruntime are only imported then, keeping app import fast)
 # ---------------------------------------------------------
-print("Loading Sentence-BERT model …")
-model = SentenceTransformer(MODEL_NAME)
-print("Embedding model loaded:", MODEL_NAME)
+_model = None
+_model_lock = threading.Lock()
+model_load_seconds = None
+
+
+def get_model():
+    global _model, model_load_seconds
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                started = time.perf_counter()
+                print(f"Loading Sentence-BERT model ({EMBED_BACKEND}) …")
+                if EMBED_BACKEND in ('onnx', 'onnx-int8'):
+                    loaded = OnnxEncoder.load(quantized=EMBED_BACKEND == 'onnx-int8')
+                else:
+                    if EMBED_THREADS:
+                        import torch
+                        torch.set_num_threads(EMBED_THREADS)
+                    from sentence_transformers import SentenceTransformer
+                    loaded = SentenceTransformer(MODEL_NAME)
+                model_load_seconds = time.perf_counter() - started
+                print("Embedding model loaded:", MODEL_NAME)
+                _model = loaded
+    return _model
+
+
+def __getattr__(name):
+    # keeps `from models.embeddings import model` working (loads on access)
+    if name == 'model':
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ---------------------------------------------------------
+# 2.  Micro-batcher: concurrent single-text requests → one forward pass
+# ---------------------------------------------------------
+class MicroBatcher:
+    """
+    Collects encode requests from many threads for up to `max_wait_ms`
+    (or until `max_batch` are waiting) and runs them as one batch.
+    Each caller blocks only for its own vector.
+    """
+
+    def __init__(self, encode_fn, max_batch: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_queue_depth = 0
+        self.batch_size_hist = {}           # upper bound (power of two) → count
+
+    def submit(self, text: str) -> Future:
+        if self._thread is None:
+            self._start()
+        future = Future()
+        self._queue.put((text, future))
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='embed-batcher', daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = self.encode_fn(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), vec in zip(batch, vectors):
+                    future.set_result(vec)
+            self._record(len(batch))
+
+    def _record(self, size: int) -> None:
+        bucket = 1
+        while bucket < size:
+            bucket *= 2
+        with self._stats_lock:
+            self.batches += 1
+            self.items += size
+            self.batch_size_hist[bucket] = self.batch_size_hist.get(bucket, 0) + 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "batch_size_histogram": {f"le_{k}": v for k, v in sorted(self.batch_size_hist.items())},
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000
+            }
+
+
+def _encode_many(texts: list) -> np.ndarray:
+    return np.asarray(get_model().encode(texts, batch_size=len(texts)), dtype=np.float32)
+
+
+batcher = MicroBatcher(_encode_many)
+
+# With JOBFIT_EMBED_SOCKET set, workers send texts to the shared sidecar
+# (models/embed_service.py) and only load the model themselves while it
+# is unreachable.
+sidecar = EmbedClient(EMBED_SOCKET, MODEL_NAME) if EMBED_SOCKET else None
+
+
+def _remote(texts: list):
+    if sidecar is None:
+        return None
+    parts = []
+    for start in range(0, len(texts), MAX_TEXTS):
+        part = sidecar.encode(texts[start:start + MAX_TEXTS])
+        if part is None:
+            return None
+        parts.append(part)
+    return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+
+def ensure_ready() -> str:
+    """Make sure something can encode: 'sidecar' or 'in-process'."""
+    if sidecar is not None and sidecar.available():
+        return 'sidecar'
+    get_model()
+    return 'in-process'
+
+
+def embedding_dim() -> int:
+    if _model is None and sidecar is not None and sidecar.available():
+        return sidecar.info['dim']
+    return get_model().get_sentence_embedding_dimension()
 
 # ---------------------------------------------------------
-# 2.  Public helpers
+# 3.  Public helpers
 # ---------------------------------------------------------
+def encode_text(text: str) -> np.ndarray:
+    """Encode one text (sidecar, else the micro-batcher) → float32 vector."""
+    with metrics.span('embed'):
+        remote = _remote([text])
+        if remote is not None:
+            return remote[0]
+        return batcher.encode(text)
+
+
 def generate_embedding(text: str) -> bytes:
     """
     Generate 384-dim vector for `text` and return it as
     a Python bytes blob ready for SQLite/BLOB storage.
     """
-    embedding = model.encode(text, convert_to_tensor=True).cpu().numpy()
-    return embedding.tobytes()          # float32 → bytes
+    return encode_text(text).tobytes()          # float32 → bytes
+
+
+def encode_batch(texts: list, batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    """
+    Encode many texts in batched forward passes and return an
+    (n, 384) float32 matrix; row i belongs to texts[i].
+    """
+    if not texts:
+        return np.zeros((0, embedding_dim()), dtype=np.float32)
+    with metrics.span('embed_batch'):
+        remote = _remote(list(texts))
+        if remote is not None:
+            return remote
+        vectors = get_model().encode(list(texts), batch_size=batch_size)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+metrics.gauge('jobfit_embedding_model_load_seconds', 'Embedding model load time (unset until loaded).',
+              lambda: model_load_seconds)
+metrics.gauge('jobfit_embed_batches_total', 'Forward passes run by the micro-batcher.',
+              lambda: batcher.batches, 'counter')
+metrics.gauge('jobfit_embed_batched_texts_total', 'Texts encoded through the micro-batcher.',
+              lambda: batcher.items, 'counter')
+metrics.gauge('jobfit_embed_sidecar_requests_total', 'Encode requests by outcome with a sidecar configured.',
+              lambda: None if sidecar is None else [({"result": "served"}, sidecar.requests),
+                                                    ({"result": "fallback"}, sidecar.fallbacks)],
+              'counter')
 
 
 def get_embedding_from_bytes(blob: bytes) -> np.ndarray:
@@ -28,4 +249,199 @@ def get_embedding_from_bytes(blob: bytes) -> np.ndarray:
     Convert a bytes blob (from generate_embedding) back to
     a NumPy float32 array.
     """
-    return np.frombuffer(blob, dtype=np.float32)
\ No newline at end of file
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+# ---------------------------------------------------------
+# 4.  Chunked long-document embeddings
+# ---------------------------------------------------------
+# all-MiniLM-L6-v2 truncates at 256 word pieces, so the single resume
+# vector only sees the first page or so. In chunk mode each resume also
+# gets a matrix of overlapping-window vectors (normalised, float16) in
+# resumes.chunk_embeddings.
+
+_tokenizer_only = None
+
+
+def _tokenizer():
+    # sidecar clients tokenise locally without loading the model weights
+    global _tokenizer_only
+    if _model is None and sidecar is not None and sidecar.available():
+        if _tokenizer_only is None:
+            try:
+                from transformers import AutoTokenizer
+                _tokenizer_only = AutoTokenizer.from_pretrained(f'sentence-transformers/{MODEL_NAME}')
+            except Exception as e:
+                print(f"Tokenizer unavailable ({e}); chunking on whitespace")
+                _tokenizer_only = False
+        return _tokenizer_only or None
+    return getattr(get_model(), 'tokenizer', None)
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP) -> list:
+    """
+    Split `text` into windows of at most `max_tokens` model tokens that
+    overlap by `overlap`, returned as slices of the original text.
+    Whitespace words stand in for tokens if the model has no fast tokenizer.
+    """
+    tokenizer = _tokenizer()
+    if getattr(tokenizer, 'is_fast', False):
+        spans = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True,
+                          verbose=False)['offset_mapping']
+    else:
+        spans = [m.span() for m in re.finditer(r'\S+', text)]
+    if not spans:
+        return []
+    if len(spans) <= max_tokens:
+        return [text]
+
+    step = max(1, max_tokens - overlap)
+    chunks = []
+    for start in range(0, len(spans), step):
+        window = spans[start:start + max_tokens]
+        chunks.append(text[window[0][0]:window[-1][1]])
+        if start + max_tokens >= len(spans) or len(chunks) == MAX_CHUNKS:
+            break
+    return chunks
+
+
+def encode_with_chunks(texts: list, batch_size: int = EMBED_BATCH_SIZE):
+    """
+    Whole-text vectors plus per-text chunk matrices, from one batched
+    encode over every text and chunk. Returns ((n, dim) array, [matrix, ...]).
+    A text that fits in one window is encoded once and is its own chunk.
+    """
+    pieces, layout = [], []
+    for text in texts:
+        chunks = chunk_text(text)
+        start = len(pieces)
+        pieces.append(text)
+        if chunks != [text]:
+            pieces.extend(chunks)
+        layout.append((start, len(pieces)))
+
+    encoded = encode_batch(pieces, batch_size)
+    vectors = encoded[[start for start, _ in layout]] if layout \
+        else np.zeros((0, encoded.shape[1]), dtype=np.float32)
+    chunk_matrices = [encoded[start:stop] if stop - start == 1 else encoded[start + 1:stop]
+                      for start, stop in layout]
+    return vectors, chunk_matrices
+
+
+def chunks_to_bytes(matrix: np.ndarray) -> bytes:
+    """Row-normalised float16 chunk matrix as a BLOB."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms == 0, 1, norms)).astype(np.float16).tobytes()
+
+
+def get_chunks_from_bytes(blob: bytes, dim: int) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float16).reshape(-1, dim).astype(np.float32)
+
+
+def aggregate_similarities(sims: np.ndarray, mode: str = None, top_k: int = CHUNK_TOP_K):
+    """
+    Collapse chunk similarities along the last axis: the best chunk
+    ('max') or the mean of the best `top_k` ('topk_mean').
+    """
+    mode = mode or CHUNK_MODE
+    if mode == 'max':
+        return sims.max(axis=-1)
+    k = min(top_k, sims.shape[-1])
+    return np.partition(sims, sims.shape[-1] - k, axis=-1)[..., -k:].mean(axis=-1)
+
+
+def chunk_score(chunks: np.ndarray, query: np.ndarray, mode: str = None) -> float:
+    """Cosine-style score of a chunk matrix against one (JD) vector."""
+    norm = np.linalg.norm(query)
+    return float(aggregate_similarities(chunks @ (query / (norm or 1)), mode))
+
+
+# ---------------------------------------------------------
+# 5.  ONNX Runtime backend
+# ---------------------------------------------------------
+class OnnxEncoder:
+    """
+    all-MiniLM-L6-v2 on onnxruntime's CPU provider, reproducing the
+    SentenceTransformer pipeline (tokenise → transformer → mean pooling →
+    L2 normalise) without importing torch. Offers the subset of the
+    SentenceTransformer API used here: encode(), tokenizer,
+    max_seq_length and get_sentence_embedding_dimension().
+    """
+
+    def __init__(self, model_path: str, tokenizer_dir: str, threads: int = EMBED_THREADS):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_dir)
+        self.max_seq_length = ONNX_MAX_SEQ
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    @classmethod
+    def load(cls, quantized: bool = False, model_dir: str = ONNX_DIR) -> 'OnnxEncoder':
+        """Load the exported graph, exporting it first if it is missing."""
+        path = os.path.join(model_dir, 'model_int8.onnx' if quantized else 'model.onnx')
+        if not os.path.exists(path):
+            export_onnx(model_dir, quantize=quantized)
+        return cls(path, model_dir)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts, batch_size: int = EMBED_BATCH_SIZE, **_) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        out = np.zeros((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        order = np.argsort([-len(t) for t in texts], kind='stable')   # less padding per batch
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            enc = self.tokenizer([texts[i] for i in rows], padding=True, truncation=True,
+                                 max_length=self.max_seq_length, return_tensors='np')
+            feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self._inputs}
+            hidden = self.session.run(None, feeds)[0]                  # (batch, seq, dim)
+            mask = enc['attention_mask'][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            out[rows] = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return out[0] if single else out
+
+
+def export_onnx(model_dir: str = ONNX_DIR, quantize: bool = True) -> None:
+    """
+    One-off export of the PyTorch model to `model_dir`/model.onnx (plus
+    model_int8.onnx with dynamic int8 weights) and its tokenizer.
+    Needs sentence_transformers, torch and onnxruntime.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, 'model.onnx')
+    if not os.path.exists(path):
+        st = SentenceTransformer(MODEL_NAME, device='cpu')
+        transformer = st[0].auto_model.eval()
+        st.tokenizer.save_pretrained(model_dir)
+        sample = st.tokenizer(['export sample text'], return_tensors='pt')
+        names = [n for n in ('input_ids', 'attention_mask', 'token_type_ids') if n in sample]
+
+        class _LastHiddenState(torch.nn.Module):
+            def forward(self, *args):
+                return transformer(**dict(zip(names, args))).last_hidden_state
+
+        axes = {0: 'batch', 1: 'sequence'}
+        with torch.no_grad():
+            torch.onnx.export(_LastHiddenState(), tuple(sample[n] for n in names), path,
+                              input_names=names, output_names=['last_hidden_state'],
+                              dynamic_axes={n: axes for n in names + ['last_hidden_state']},
+                              opset_version=17)
+        print("Exported ONNX model:", path)
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        int8_path = os.path.join(model_dir, 'model_int8.onnx')
+        quantize_dynamic(path, int8_path, weight_type=QuantType.QInt8)
+        print("Quantised ONNX model:", int8_path)
@@ -0,0 +1,122 @@
+# backend/models/jd_cache.py
+import json
+import os
+import threading
+from collections import OrderedDict
+import database
+from models.embeddings import encode_text, MODEL_NAME, get_embedding_from_bytes
+from models.nlp_processor import extract_skills
+from utils import metrics
+
+JD_CACHE_MAX_ITEMS = int(os.environ.get('JOBFIT_JD_CACHE_ITEMS', 512))
+JD_CACHE_MAX_BYTES = int(os.environ.get('JOBFIT_JD_CACHE_BYTES', 64 * 1024 * 1024))
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so trivially different pastes share a key."""
+    return ' '.join(text.split()).lower()
+
+
+class JDCache:
+    """
+    Embedding + skill cache for free-text job descriptions, keyed by the
+    hash of the normalised text.
+
+      tier 1 – in-process LRU, at most `max_items` entries
+      tier 2 – `jd_cache` SQLite table, trimmed to `max_bytes` (least
+               recently used rows go first)
+    """
+
+    def __init__(self, max_items: int = JD_CACHE_MAX_ITEMS, max_bytes: int = JD_CACHE_MAX_BYTES):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def lookup(self, text: str):
+        """
+        Return (embedding, skills) for `text`, computing them only on a miss.
+        The normalised text is only the key: the original is what gets encoded.
+        """
+        key = database.content_hash(normalize_text(text))
+
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        conn = database.get_db_connection()
+        try:
+            row = conn.execute(
+                'SELECT embedding, skills FROM jd_cache WHERE text_hash = ? AND model_name = ?',
+                (key, MODEL_NAME)
+            ).fetchone()
+            if row is not None:
+                entry = (get_embedding_from_bytes(row['embedding']), json.loads(row['skills']))
+                database.run_write(conn, lambda c: c.execute(
+                    "UPDATE jd_cache SET last_used = julianday('now'), hits = hits + 1 "
+                    'WHERE text_hash = ?', (key,)))
+                hit = 'db'
+            else:
+                entry = (encode_text(text), extract_skills(text, None))
+                database.run_write(conn, lambda c: self._store(c, key, entry))
+                hit = None
+        finally:
+            conn.close()
+
+        with self._lock:
+            if hit:
+                self.db_hits += 1
+            else:
+                self.misses += 1
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+        return entry
+
+    def _store(self, conn, key: str, entry) -> None:
+        embedding, skills = entry
+        blob, skills_json = embedding.tobytes(), json.dumps(skills)
+        conn.execute('''
+            INSERT OR REPLACE INTO jd_cache (text_hash, model_name, embedding, skills, size_bytes)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (key, MODEL_NAME, blob, skills_json, len(blob) + len(skills_json)))
+        # keep the newest rows whose running size fits the byte budget
+        conn.execute('''
+            DELETE FROM jd_cache WHERE text_hash IN (
+                SELECT text_hash FROM (
+                    SELECT text_hash,
+                           SUM(size_bytes) OVER (ORDER BY last_used DESC, text_hash) AS running
+                    FROM jd_cache
+                ) WHERE running > ?
+            )
+        ''', (self.max_bytes,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._lru),
+                "memory_max_entries": self.max_items,
+                "db_max_bytes": self.max_bytes
+            }
+
+
+jd_cache = JDCache()
+
+metrics.gauge('jobfit_jd_cache_lookups_total', 'Job-description cache lookups by result.',
+              lambda: [({"result": "memory_hit"}, jd_cache.memory_hits),
+                       ({"result": "db_hit"}, jd_cache.db_hits),
+                       ({"result": "miss"}, jd_cache.misses)], 'counter')
+metrics.gauge('jobfit_jd_cache_hit_ratio', 'Share of job-description lookups served from cache.',
+              lambda: jd_cache.stats()["hit_rate"])
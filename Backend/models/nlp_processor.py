@@ -1,7 +1,18 @@
+import bisect
 import json
+import os
 import re
-import spacy  # Temporarily disabled
+import time
+from models.skill_matcher import SkillMatcher
+from utils import metrics
 nlp=None
+nlp_load_seconds = None
+
+# 'rules'  – regex/keyword extraction only, spaCy is never imported
+# 'spacy'  – one parse per document (tok2vec + ner only); ORG/DATE
+#            entities add experience lines the regexes miss
+NLP_MODE = os.environ.get('JOBFIT_NLP_MODE', 'rules')
+SPACY_COMPONENTS = ['tok2vec', 'ner']
 
 # Skill dictionary (can be expanded)
 SKILL_PATTERNS = {
@@ -13,41 +24,41 @@ SKILL_PATTERNS = {
     'Soft Skills': ['Team Leadership', 'Communication', 'Agile', 'Scrum', 'Project Management']
 }
 
+# built once; rebuilt only by load_skill_taxonomy()
+_skill_matcher = SkillMatcher.from_patterns(SKILL_PATTERNS)
+
 def get_nlp_model():
-    def get_nlp_model():
-     """Load spaCy model (cached)"""
-    global nlp
+    """Load spaCy model (cached) with only SPACY_COMPONENTS enabled"""
+    global nlp, nlp_load_seconds
     if nlp is None:
+        started = time.perf_counter()
+        import spacy
         try:
-            nlp = spacy.load('en_core_web_sm')
+            nlp = spacy.load('en_core_web_sm', enable=SPACY_COMPONENTS)
         except OSError:
             # model not present → download once
             print("Downloading spaCy model …")
             spacy.cli.download('en_core_web_sm')
-            nlp = spacy.load('en_core_web_sm')
+            nlp = spacy.load('en_core_web_sm', enable=SPACY_COMPONENTS)
+        nlp_load_seconds = time.perf_counter() - started
     return nlp
+
+
+metrics.gauge('jobfit_spacy_model_load_seconds', 'spaCy model load time (unset until loaded).',
+              lambda: nlp_load_seconds)
+
+def load_skill_taxonomy(patterns: dict, aliases: dict = None):
+    """Swap in a new {category: [skills]} taxonomy (+ optional alias → skill map)"""
+    global SKILL_PATTERNS, _skill_matcher
+    SKILL_PATTERNS = patterns
+    _skill_matcher = SkillMatcher.from_patterns(patterns, aliases)
+
 def extract_skills(text: str, nlp) -> list:
-    """Extract skills from text using rule-based matching"""
-    skills_found = []
-    text_lower = text.lower()
-    
-    # Convert skill patterns to lowercase for matching
-    for category, skill_list in SKILL_PATTERNS.items():
-        for skill in skill_list:
-            if skill.lower() in text_lower:
-                # Check for word boundaries to avoid partial matches
-                if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower):
-                    skills_found.append(skill)
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_skills = [x for x in skills_found if not (x in seen or seen.add(x))]
-    
-    return unique_skills
+    """Extract skills from text using the precompiled taxonomy matcher"""
+    return _skill_matcher.find(text)
 
-def extract_education(text: str, nlp) -> list:
-    """Extract education information"""
-    doc = nlp(text)
+def extract_education(text: str, nlp=None, doc=None) -> list:
+    """Extract education information (keyword rules; no parse needed)"""
     education = []
     
     # Look for education patterns
@@ -61,9 +72,11 @@ def extract_education(text: str, nlp) -> list:
     
     return education[:3]  # Limit to top 3 entries
 
-def extract_experience(text: str, nlp) -> list:
-    """Extract work experience"""
-    doc = nlp(text)
+def extract_experience(text: str, nlp=None, doc=None) -> list:
+    """
+    Extract work experience. With a spaCy `doc` of `text`, lines that
+    mention both an organisation and a date also count.
+    """
     experience = []
     
     # Look for year patterns and company names
@@ -74,8 +87,45 @@ def extract_experience(text: str, nlp) -> list:
     ]
     
     lines = text.split('\n')
-    for line in lines:
-        if any(re.search(pattern, line, re.IGNORECASE) for pattern in experience_patterns):
+    entity_lines = _org_date_lines(lines, doc) if doc is not None else set()
+    for i, line in enumerate(lines):
+        if i in entity_lines or any(re.search(pattern, line, re.IGNORECASE) for pattern in experience_patterns):
             experience.append(line.strip())
     
-    return experience[:5]  # Limit to top 5 entries
\ No newline at end of file
+    return experience[:5]  # Limit to top 5 entries
+
+def _org_date_lines(lines: list, doc) -> set:
+    """Indexes of lines holding both an ORG and a DATE entity"""
+    starts, offset = [], 0
+    for line in lines:
+        starts.append(offset)
+        offset += len(line) + 1
+    labels = {}
+    for ent in doc.ents:
+        if ent.label_ in ('ORG', 'DATE'):
+            index = bisect.bisect_right(starts, ent.start_char) - 1
+            labels.setdefault(index, set()).add(ent.label_)
+    return {i for i, found in labels.items() if len(found) == 2}
+
+# ---------------------------------------------------------
+# One-call helpers used by the upload / ingest pipelines
+# ---------------------------------------------------------
+def extract_profile(text: str) -> dict:
+    """Skills, education and experience for one resume (≤ 1 spaCy parse)"""
+    doc = get_nlp_model()(text) if NLP_MODE == 'spacy' else None
+    return _profile(text, doc)
+
+def extract_profiles(texts: list, batch_size: int = 16) -> list:
+    """Batch form of extract_profile; spaCy mode streams through nlp.pipe"""
+    if NLP_MODE == 'spacy':
+        docs = get_nlp_model().pipe(texts, batch_size=batch_size)
+    else:
+        docs = (None for _ in texts)
+    return [_profile(text, doc) for text, doc in zip(texts, docs)]
+
+def _profile(text: str, doc) -> dict:
+    return {
+        "skills": extract_skills(text, None),
+        "education": extract_education(text, doc=doc),
+        "experience": extract_experience(text, doc=doc)
+    }
\ No newline at end of file
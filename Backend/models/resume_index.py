@@ -0,0 +1,232 @@
+# backend/models/resume_index.py
+"""
+Nearest-neighbour search over resume embeddings, for ranking resumes
+against a job role or description.
+
+Below ANN_MIN_ROWS live resumes every query is an exact, blocked scan of
+the memory-mapped embedding store. Above it an IVF index is used:
+spherical k-means centroids over the store rows, an inverted list of rows
+per centroid, and each query scores only the rows of its ANN_NPROBE
+closest centroids.
+
+The index follows the store rather than owning data: rows appended since
+the last query are assigned to their nearest centroid on the next one,
+tombstoned rows are skipped through the store's live mask, and the
+centroids are retrained once the store has doubled since training.
+Training (and saving) runs on a background thread: queries keep using
+the old centroids, and rows added since they were trained are scored
+exactly until the new index is swapped in. Centroids and assignments are saved to ivf.npz inside the store
+directory, so a rebuilt store (new directory) starts a fresh index.
+"""
+import os
+import threading
+import traceback
+import numpy as np
+from models.embedding_store import embedding_store, normalise
+
+ANN_MIN_ROWS = int(os.environ.get('JOBFIT_ANN_MIN_ROWS', 50000))
+ANN_NLIST    = int(os.environ.get('JOBFIT_ANN_NLIST', 0))          # 0 = sqrt(rows)
+ANN_NPROBE   = int(os.environ.get('JOBFIT_ANN_NPROBE', 8))
+ANN_TRAIN_SAMPLE = int(os.environ.get('JOBFIT_ANN_TRAIN_SAMPLE', 50000))
+ANN_SAVE_EVERY   = 1000               # newly assigned rows between saves
+KMEANS_ITERATIONS = 10
+
+
+def _dequantize(matrix, scales, rows) -> np.ndarray:
+    block = np.asarray(matrix[rows], dtype=np.float32)
+    return block * scales[rows][:, None] if scales is not None else block
+
+
+def _score_rows(matrix, scales, rows: np.ndarray, q: np.ndarray, block_rows: int = 8192):
+    return np.concatenate([_dequantize(matrix, scales, rows[s:s + block_rows]) @ q
+                           for s in range(0, len(rows), block_rows)] or [np.empty(0, np.float32)])
+
+
+def _assign(matrix, scales, centroids, start: int, stop: int, block_rows: int = 8192):
+    out = np.empty(stop - start, dtype=np.int32)
+    for s in range(start, stop, block_rows):
+        e = min(s + block_rows, stop)
+        out[s - start:e - start] = np.argmax(
+            _dequantize(matrix, scales, slice(s, e)) @ centroids.T, axis=1)
+    return out
+
+
+def _inverted_lists(assign: np.ndarray, nlist: int) -> list:
+    order = np.argsort(assign, kind='stable')
+    bounds = np.searchsorted(assign[order], np.arange(nlist + 1))
+    return [order[bounds[c]:bounds[c + 1]] for c in range(nlist)]
+
+
+def train_centroids(sample: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: unit centroids maximising dot product."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = np.bincount(labels, minlength=nlist) == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]   # reseed
+        centroids = normalise(sums)
+    return centroids.astype(np.float32)
+
+
+class ResumeIndex:
+    def __init__(self, store=embedding_store, min_rows: int = ANN_MIN_ROWS,
+                 nprobe: int = ANN_NPROBE):
+        self.store = store
+        self.min_rows = min_rows
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        # (store key, centroids, assign, lists, trained_rows) or None
+        self._ivf = None
+        self._unsaved = 0
+        self._worker = None             # background train / save thread
+
+    # ---------- IVF maintenance ----------
+    def _path(self) -> str:
+        return os.path.join(self.store.directory, 'ivf.npz')
+
+    def _store_key(self):
+        # rebuild() swaps in a new directory under the same name
+        return self.store.directory, os.stat(self.store.directory).st_ino
+
+    def _refresh(self, matrix, scales, rows: int):
+        """
+        Bring the IVF index up to date with `rows` store rows. Returns None
+        until a first index exists; while a retrain runs, rows past the old
+        assignment stay unassigned (the caller scores them exactly).
+        """
+        key = self._store_key()
+        ivf = self._ivf
+        if ivf is not None and ivf[0] != key:
+            ivf = None
+        if ivf is None and os.path.exists(self._path()):
+            with np.load(self._path()) as saved:
+                ivf = (key, saved['centroids'], saved['assign'], None,
+                       int(saved['trained_rows']))
+            if len(ivf[2]) > rows:                       # store was replaced underneath
+                ivf = None
+        if ivf is None or rows > 2 * ivf[4]:
+            self._background(self._train, key, matrix, scales, rows)
+        self._ivf = ivf
+        if ivf is None:
+            return None
+        key, centroids, assign, lists, trained_rows = ivf
+        if len(assign) < rows and not self._busy():
+            self._unsaved += rows - len(assign)
+            assign = np.concatenate([assign, _assign(matrix, scales, centroids, len(assign), rows)])
+            lists = None
+        if lists is None:
+            lists = _inverted_lists(assign, len(centroids))
+        self._ivf = (key, centroids, assign, lists, trained_rows)
+        if self._unsaved >= ANN_SAVE_EVERY and self._background(self._save, self._ivf):
+            self._unsaved = 0
+        return self._ivf
+
+    def _busy(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def _background(self, fn, *args) -> bool:
+        """Run fn(*args) on the worker thread unless it is busy. Call under _lock."""
+        if self._busy():
+            return False
+        self._worker = threading.Thread(target=fn, args=args, name='ivf-index', daemon=True)
+        self._worker.start()
+        return True
+
+    def _train(self, key, matrix, scales, rows: int) -> None:
+        """Worker: train centroids on the first `rows` rows, save, then swap in."""
+        try:
+            nlist = ANN_NLIST or int(np.sqrt(rows))
+            nlist = max(1, min(nlist, rows))
+            rng = np.random.default_rng(0)
+            sample_rows = np.sort(rng.choice(rows, min(rows, max(ANN_TRAIN_SAMPLE, nlist)), replace=False))
+            centroids = train_centroids(normalise(_dequantize(matrix, scales, sample_rows)), nlist)
+            assign = _assign(matrix, scales, centroids, 0, rows)
+            ivf = (key, centroids, assign, _inverted_lists(assign, nlist), rows)
+            if self._store_key() != key:
+                return                                   # store rebuilt meanwhile: train again
+            self._save(ivf)
+            with self._lock:
+                self._ivf = ivf
+                self._unsaved = 0
+        except Exception:
+            traceback.print_exc()
+
+    def _save(self, ivf) -> None:
+        _, centroids, assign, _, trained_rows = ivf
+        tmp = os.path.join(self.store.directory, 'ivf.tmp.npz')
+        np.savez(tmp, centroids=centroids, assign=assign, trained_rows=trained_rows)
+        os.replace(tmp, self._path())
+
+    # ---------- search ----------
+    def search(self, query, k: int = 10, resume_ids=None):
+        """
+        Best `k` resumes for `query` as ([(resume_id, cosine), ...], method).
+        `resume_ids` restricts the search (e.g. to a skill filter's hits).
+        `method` is 'exact' or 'ivf'.
+        """
+        q = normalise(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        ids, matrix, scales, live = self.store.snapshot()
+        if matrix is None:
+            return [], 'exact'
+
+        allowed = live
+        if resume_ids is not None:
+            allowed = np.zeros_like(live)
+            rows = self.store.rows_of(resume_ids)           # live map: may hold rows added since
+            allowed[rows[rows < len(live)]] = True
+            allowed &= live
+        candidates = int(allowed.sum())
+        if candidates == 0:
+            return [], 'exact'
+
+        if candidates < self.min_rows:
+            if resume_ids is not None:                   # score only the filtered rows
+                rows = np.flatnonzero(allowed)
+                return self._top(ids, rows, _score_rows(matrix, scales, rows, q), k), 'exact'
+            scores = self.store.scores(q)[1][:len(ids)]     # rows appended since are ignored
+            scores[~allowed] = -np.inf
+            return self._top(ids, np.arange(len(scores)), scores, k), 'exact'
+
+        with self._lock:
+            ivf = self._refresh(matrix, scales, len(ids))
+        if ivf is None:                                  # first index still training
+            rows = np.flatnonzero(allowed)
+            return self._top(ids, rows, _score_rows(matrix, scales, rows, q), k), 'exact'
+        _, centroids, assign, lists, _ = ivf
+        probe = np.argsort(-(centroids @ q))[:self.nprobe]
+        unassigned = np.arange(len(assign), len(ids))    # added since a retrain started
+        rows = np.sort(np.concatenate([lists[c] for c in probe] + [unassigned]))
+        rows = rows[allowed[rows]]
+        hits = self._top(ids, rows, _score_rows(matrix, scales, rows, q), k)
+        if len(hits) < min(k, candidates):               # probed lists too thin for a filter
+            rows = np.flatnonzero(allowed)
+            return self._top(ids, rows, _score_rows(matrix, scales, rows, q), k), 'exact'
+        return hits, 'ivf'
+
+    @staticmethod
+    def _top(ids, rows, scores, k: int) -> list:
+        finite = np.isfinite(scores)
+        rows, scores = rows[finite], scores[finite]
+        k = min(k, len(rows))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[rows[i]], float(scores[i])) for i in top]
+
+    def stats(self) -> dict:
+        ivf = self._ivf
+        return {
+            "min_rows": self.min_rows,
+            "nprobe": self.nprobe,
+            "nlist": len(ivf[1]) if ivf else None,
+            "assigned_rows": len(ivf[2]) if ivf else 0,
+            "trained_rows": ivf[4] if ivf else 0,
+            "training": self._busy(),
+        }
+
+
+resume_index = ResumeIndex()
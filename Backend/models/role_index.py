@@ -0,0 +1,116 @@
+# backend/models/role_index.py
+import json
+import threading
+import numpy as np
+import database
+from models.embeddings import get_embedding_from_bytes, aggregate_similarities, encode_batch, MODEL_NAME
+
+# ---------------------------------------------------------
+# In-memory matrix of every job-role embedding
+# ---------------------------------------------------------
+# Rows are L2-normalised, so one matrix-vector product gives the
+# cosine similarity of a resume against the whole catalogue.
+# The matrix is rebuilt whenever the `job_roles` change counter
+# (maintained by triggers, see database.init_db) moves. Roles whose
+# stored vector is from another model are encoded for the matrix only,
+# and kept by (role_id, description hash, model) so the reloads every
+# re-embedding batch triggers encode only what has not been seen yet.
+
+
+class RoleIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        # (role_ids, role_names, industries, required_skills, matrix) –
+        # swapped as one tuple so readers never see a half-built catalogue
+        self._snapshot = ([], [], [], [], np.zeros((0, 0), dtype=np.float32))
+        # (role_id, jd hash, model) → vector encoded here for a not yet migrated role
+        self._encoded = {}
+
+    def refresh(self, conn) -> None:
+        """Reload the matrix if `job_roles` changed since the last load."""
+        if database.get_table_version(conn, 'job_roles') == self.version:
+            return
+        with self._lock:
+            if database.get_table_version(conn, 'job_roles') == self.version:
+                return
+            self._load(conn)
+
+    def _load(self, conn) -> None:
+        # encode any role that is missing or stale, in one batch
+        database.warm_role_embeddings(conn)
+
+        rows = conn.execute(
+            'SELECT role_id, role_name, industry, required_skills, jd_embedding, jd_model, '
+            'job_description FROM job_roles ORDER BY role_name'
+        ).fetchall()
+        vectors = [get_embedding_from_bytes(r['jd_embedding']) if r['jd_model'] == MODEL_NAME else None
+                   for r in rows]
+        keys = {i: (r['role_id'], database.content_hash(r['job_description']), MODEL_NAME)
+                for i, r in enumerate(rows) if vectors[i] is None}
+        todo = [i for i, key in keys.items() if key not in self._encoded]
+        if todo:
+            for i, vec in zip(todo, encode_batch([rows[i]['job_description'] for i in todo])):
+                self._encoded[keys[i]] = vec
+        for i, key in keys.items():
+            vectors[i] = self._encoded[key]
+        # migrated or edited roles no longer need theirs
+        self._encoded = {key: self._encoded[key] for key in keys.values()}
+
+        matrix = np.vstack(vectors).astype(np.float32) if vectors \
+            else np.zeros((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True) if vectors else None
+        if norms is not None:
+            norms[norms == 0] = 1.0
+            matrix /= norms
+
+        self._snapshot = (
+            [r['role_id'] for r in rows],
+            [r['role_name'] for r in rows],
+            [r['industry'] for r in rows],
+            [json.loads(r['required_skills'] or '[]') for r in rows],
+            matrix
+        )
+        self.version = database.get_table_version(conn, 'job_roles')
+
+    def rank(self, resume_embedding: np.ndarray, candidate_skills, top_k: int = 5,
+             chunks: np.ndarray = None) -> list:
+        """
+        Score `resume_embedding` against every role and return the
+        `top_k` best as dicts with score, matched and missing skills.
+        With a (normalised) `chunks` matrix every role is scored by the
+        chunk aggregate instead, still in one matrix product.
+        """
+        role_ids, role_names, industries, required_skills, matrix = self._snapshot
+        n = len(role_ids)
+        if n == 0:
+            return []
+
+        query = resume_embedding.astype(np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = matrix @ query                         # cosine for all roles
+        if chunks is not None:
+            scores = aggregate_similarities(matrix @ chunks.T)   # (roles, chunks) → roles
+
+        k = min(top_k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        candidate_skills = set(candidate_skills)
+        ranked = []
+        for i in top:
+            required = required_skills[i]
+            ranked.append({
+                "role_id": role_ids[i],
+                "role_name": role_names[i],
+                "industry": industries[i],
+                "job_match_score": round(float(scores[i]) * 100, 1),
+                "matched_skills": [s for s in required if s in candidate_skills],
+                "missing_skills": [s for s in required if s not in candidate_skills]
+            })
+        return ranked
+
+
+role_index = RoleIndex()
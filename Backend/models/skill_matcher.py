@@ -0,0 +1,77 @@
+# backend/models/skill_matcher.py
+import re
+
+# text → runs of word chars, runs of whitespace, single punctuation chars
+_TOKEN_RE = re.compile(r'\w+|\s+|[^\w\s]')
+
+
+def _is_word(ch: str) -> bool:
+    # same definition as the regex `\w` for str patterns
+    return ch.isalnum() or ch == '_'
+
+
+def _boundary(text: str, pos: int) -> bool:
+    """True where the regex `\\b` would match at `pos`."""
+    before = pos > 0 and _is_word(text[pos - 1])
+    after  = pos < len(text) and _is_word(text[pos])
+    return before != after
+
+
+class SkillMatcher:
+    """
+    Finds every taxonomy skill in a text in one pass.
+
+    Skills (and aliases) are lower-cased, split into the same tokens as
+    the text and stored in a token trie, so a lookup costs one regex
+    tokenisation plus a walk bounded by the longest skill – independent
+    of taxonomy size. Matches obey the same `\\b...\\b` rule as the old
+    per-skill regex; results come back in taxonomy order without
+    duplicates.
+    """
+
+    def __init__(self, skills: list, aliases: dict = None):
+        self.skills = list(skills)
+        self._trie = {}
+        for index, skill in enumerate(self.skills):
+            self._add(skill, index)
+        for alias, canonical in (aliases or {}).items():
+            if canonical in self.skills:
+                self._add(alias, self.skills.index(canonical))
+
+    @classmethod
+    def from_patterns(cls, patterns: dict, aliases: dict = None):
+        """Build from a {category: [skill, ...]} mapping like SKILL_PATTERNS."""
+        return cls([skill for skill_list in patterns.values() for skill in skill_list], aliases)
+
+    def _add(self, phrase: str, index: int) -> None:
+        tokens = _TOKEN_RE.findall(phrase.strip().lower())
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(None, []).append(index)          # None key = terminal
+
+    def find(self, text: str) -> list:
+        text_lower = text.lower()
+        spans = [(m.group(), m.start(), m.end()) for m in _TOKEN_RE.finditer(text_lower)]
+        root, found = self._trie, set()
+
+        for i, (token, start, _) in enumerate(spans):
+            node = root.get(token)
+            if node is None:
+                continue
+            if not _boundary(text_lower, start):
+                continue
+            j = i
+            while node is not None:
+                if None in node and _boundary(text_lower, spans[j][2]):
+                    found.update(node[None])
+                j += 1
+                if j == len(spans):
+                    break
+                node = node.get(spans[j][0])
+
+        seen = set()
+        return [self.skills[i] for i in sorted(found)
+                if not (self.skills[i] in seen or seen.add(self.skills[i]))]
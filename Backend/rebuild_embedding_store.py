@@ -0,0 +1,36 @@
+# backend/rebuild_embedding_store.py
+"""
+Rebuild the memory-mapped resume-embedding store from the database.
+
+    python rebuild_embedding_store.py [--dtype float32|float16|int8]
+    python rebuild_embedding_store.py --sync      # only add/drop the difference
+
+A full rebuild compacts deleted rows and is needed to change the dtype.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import database
+from models.embedding_store import embedding_store, DTYPES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dtype', choices=DTYPES, help="default: keep the store's current dtype")
+    parser.add_argument('--sync', action='store_true')
+    args = parser.parse_args(argv)
+
+    database.init_db()
+    if args.sync:
+        print(json.dumps(embedding_store.sync()))
+    else:
+        embedding_store.rebuild(dtype=args.dtype)
+    print(json.dumps(embedding_store.stats()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# backend/reembed.py
+"""
+Re-encode stored vectors with the current embedding model (JOBFIT_EMBED_MODEL).
+
+    python reembed.py [--batch 64]      # run to completion, resumable
+    python reembed.py --status
+
+The server starts the same job in the background after warm-up; this
+runs it in the foreground, e.g. before switching traffic to a new model.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import database
+from models.embedding_store import embedding_store
+from utils import reembed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', type=int, default=reembed.REEMBED_BATCH)
+    parser.add_argument('--status', action='store_true')
+    args = parser.parse_args(argv)
+
+    database.init_db()
+    if args.status:
+        print(json.dumps(reembed.status()))
+        return 0
+
+    reembed.REEMBED_PAUSE_S = 0                  # nothing to yield to
+    print(json.dumps(embedding_store.sync()))    # drops vectors from other models
+    result = reembed.run(args.batch, progress=lambda table, done: print(
+        json.dumps({"table": table, "rows_done": done}), file=sys.stderr, flush=True))
+    if result is None:
+        print("Another process is running the re-embedding job", file=sys.stderr)
+        return 1
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+# backend/routes/admin.py
+from flask import Blueprint, request, jsonify
+import os
+import uuid
+from utils import role_import, uploads
+from utils.security import require_admin
+
+bp = Blueprint('admin', __name__)
+
+IMPORT_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'data', 'imports')
+
+
+@bp.route('/admin/job-roles/import', methods=['POST'])
+@require_admin
+def import_job_roles():
+    """
+    Multipart upload of a .csv/.jsonl role feed (field `file`; optional
+    `format`, `restart`). The file is imported in the background; poll
+    the returned status_url. Uploading the same file again resumes an
+    interrupted import.
+    """
+    request.max_content_length = role_import.IMPORT_MAX_BYTES
+    file = request.files.get('file')
+    if file is None or not file.filename:
+        return jsonify({"error": "No file provided"}), 400
+    fmt = request.form.get('format') or role_import.detect_format(file.filename)
+    if fmt not in role_import.FORMATS:
+        return jsonify({"error": "Only .csv or .jsonl files allowed"}), 400
+    restart = request.form.get('restart', '').lower() in ('1', 'true', 'yes')
+
+    os.makedirs(IMPORT_FOLDER, exist_ok=True)
+    partial = os.path.join(IMPORT_FOLDER, f'{uuid.uuid4().hex}.part')
+    import_id = uploads.save_and_hash(file, partial)
+    path = os.path.join(IMPORT_FOLDER, f'{import_id}.{fmt}')
+    os.replace(partial, path)            # same bytes as any copy a running import has open
+    try:
+        role_import.submit(path, fmt, file.filename, import_id, restart)
+    except role_import.ImportRunning:
+        return jsonify({"error": "This file is already being imported", "import_id": import_id}), 409
+    return jsonify({
+        "message": "Import queued",
+        "import_id": import_id,
+        "status_url": f"/api/admin/job-roles/import/{import_id}"
+    }), 202
+
+
+@bp.route('/admin/job-roles/import/<import_id>', methods=['GET'])
+@require_admin
+def import_status(import_id):
+    state = role_import.get_import(import_id)
+    if state is None:
+        return jsonify({"error": "Import not found"}), 404
+    return jsonify(state), 200
@@ -1,11 +1,20 @@
 # backend/routes/analysis.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 import database
-from models.embeddings import get_embedding_from_bytes, model as embed_model
-from sklearn.metrics.pairwise import cosine_similarity
+from models import embeddings
+from models.embeddings import get_embedding_from_bytes, get_chunks_from_bytes, chunk_score, MODEL_NAME, batcher
 import numpy as np
-from models.nlp_processor import extract_skills   # reuse rule-based extractor
+from models.role_index import role_index
+from models.jd_cache import jd_cache
+from models.embedding_store import embedding_store
+from models.resume_index import resume_index
+from models.analysis_cache import analysis_cache, model_version
+from utils import metrics, reembed
+from utils.security import require_auth
+import base64
+import binascii
 import json
+import sqlite3
 
 # ------------------------------------------------------------------
 #  Rich learning-path repository (offline, localhost-safe)
@@ -150,14 +159,80 @@ def generate_recommendations(missing_skills: list, match_score: float) -> dict:
     }
 
 
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two 1-D vectors (0.0 if either is all zeros)"""
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(np.dot(a, b)) / denom if denom else 0.0
+
+
+# what scoring needs from one of the caller's `resumes` (model, resume_id, user_id);
+# the text only for rows from another model
+RESUME_SCORING_SQL = '''
+    SELECT resume_embedding, chunk_embeddings, embedding_model, skills,
+           CASE WHEN embedding_model = ? THEN NULL ELSE parsed_text END AS parsed_text
+    FROM resumes WHERE resume_id = ? AND user_id = ?
+'''
+
+
+def resume_chunks(resume, dim: int):
+    """The resume's chunk matrix when chunk scoring is on and it has one."""
+    if embeddings.CHUNK_MODE == 'off' or resume['chunk_embeddings'] is None:
+        return None
+    return get_chunks_from_bytes(resume['chunk_embeddings'], dim)
+
+
+def resume_vectors(resume):
+    """
+    (vector, chunk matrix or None) of a `resumes` row in the current
+    model's space: the stored blobs, or – for a row the re-embedding job
+    has not reached yet – encoded from parsed_text on the fly.
+    """
+    if resume['embedding_model'] == MODEL_NAME:
+        vector = get_embedding_from_bytes(resume['resume_embedding'])
+        return vector, resume_chunks(resume, len(vector))
+    with metrics.span('resume_embedding'):
+        if embeddings.CHUNK_MODE == 'off':
+            return embeddings.encode_text(resume['parsed_text']), None
+        vectors, chunk_matrices = embeddings.encode_with_chunks([resume['parsed_text']])
+        blob = embeddings.chunks_to_bytes(chunk_matrices[0])      # normalised like stored ones
+        return vectors[0], get_chunks_from_bytes(blob, vectors.shape[1])
+
+
+def role_vector(conn, role_id: str, job_role) -> np.ndarray:
+    """
+    A `job_roles` row's JD vector in the current model's space. Missing or
+    edited ones are encoded and stored; one from another model is encoded
+    on the fly until the re-embedding job replaces it.
+    """
+    if job_role['jd_embedding'] is not None and job_role['jd_model'] != MODEL_NAME:
+        with metrics.span('jd_embedding'):
+            return embeddings.encode_text(job_role['job_description'])
+    if (job_role['jd_embedding'] is None
+            or job_role['jd_hash'] != database.content_hash(job_role['job_description'])):
+        # normally handled by the startup warm-up; covers roles edited since
+        with metrics.span('jd_embedding'):
+            database.warm_role_embeddings(conn)
+        return get_embedding_from_bytes(conn.execute(
+            'SELECT jd_embedding FROM job_roles WHERE role_id = ?', (role_id,)
+        ).fetchone()['jd_embedding'])
+    return get_embedding_from_bytes(job_role['jd_embedding'])
+
+
+def match_score(resume, job_embedding: np.ndarray) -> float:
+    """0-100 match of a `resumes` row against a JD vector."""
+    resume_embedding, chunks = resume_vectors(resume)
+    if chunks is not None:
+        return chunk_score(chunks, job_embedding) * 100
+    return cosine_similarity(resume_embedding, job_embedding) * 100
+
+
 bp = Blueprint('analysis', __name__)
 
 
 @bp.route('/job-roles', methods=['GET'])
 def get_job_roles():
-    conn = database.get_db_connection()
+    conn = database.get_db()
     roles = conn.execute('SELECT role_id, role_name, industry FROM job_roles').fetchall()
-    conn.close()
     return jsonify({
         "roles": [{"role_id": r['role_id'], "role_name": r['role_name'], "industry": r['industry']}
                   for r in roles]
@@ -165,97 +240,231 @@ def get_job_roles():
 
 
 @bp.route('/analyze-role', methods=['POST'])
+@require_auth
 def analyze_role():
-    data = request.get_json()
-    user_id   = data.get('user_id')
+    """
+    Expects: { resume_id, role_id, force? } (the user comes from the token)
+    Repeats with the same resume, role text, skills and model return the stored
+    analysis ("cached": true) without scoring or writing; `force`
+    (body or query string) recomputes and stores a new one.
+    """
+    data = request.get_json() or {}
+    user_id   = g.user_id
     resume_id = data.get('resume_id')
     role_id   = data.get('role_id')
 
-    if not all([user_id, resume_id, role_id]):
+    if not all([resume_id, role_id]):
         return jsonify({"error": "Missing required fields"}), 400
 
-    conn = database.get_db_connection()
+    conn = database.get_db()
 
     # ---- fetch resume & role ----
-    resume = conn.execute(
-        'SELECT resume_embedding, skills FROM resumes WHERE resume_id = ?', (resume_id,)
-    ).fetchone()
+    with metrics.span('db_fetch'):
+        resume = conn.execute(RESUME_SCORING_SQL, (MODEL_NAME, resume_id, g.user_id)).fetchone()
 
-    job_role = conn.execute(
-        'SELECT role_name, job_description, required_skills, jd_embedding '
-        'FROM job_roles WHERE role_id = ?', (role_id,)
-    ).fetchone()
+        job_role = conn.execute(
+            'SELECT role_name, job_description, required_skills, jd_embedding, jd_hash, jd_model '
+            'FROM job_roles WHERE role_id = ?', (role_id,)
+        ).fetchone()
 
     if not resume or not job_role:
-        conn.close()
         return jsonify({"error": "Resume or job role not found"}), 404
 
+    candidate_skills = set(json.loads(resume['skills']))
+    required_skills  = set(json.loads(job_role['required_skills']))
+
+    # ---- same resume, role (text and skills) and model as a stored analysis? ----
+    # (missing_skills and recommendations depend on required_skills too)
+    jd_hash = database.content_hash(job_role['job_description'] + '\0' + job_role['required_skills'])
+    cache_key = (user_id, resume_id, role_id, jd_hash, model_version())
+    force = data.get('force', request.args.get('force'))
+    if not (force is True or str(force).lower() in ('1', 'true', 'yes')):
+        with metrics.span('cache_lookup'):
+            stored = analysis_cache.get(conn, cache_key)
+        if stored is not None:
+            return jsonify({
+                **stored,
+                "role_name": job_role['role_name'],
+                "matched_skills": list(candidate_skills & required_skills),
+                "cached": True
+            }), 200
+
     # ---- embeddings ----
-    resume_embedding = get_embedding_from_bytes(resume['resume_embedding'])
-
-    if job_role['jd_embedding'] is None:
-        from models.embeddings import generate_embedding
-        jd_blob = generate_embedding(job_role['job_description'])
-        conn.execute('UPDATE job_roles SET jd_embedding = ? WHERE role_id = ?', (jd_blob, role_id))
-        conn.commit()
-        job_embedding = get_embedding_from_bytes(jd_blob)
-    else:
-        job_embedding = get_embedding_from_bytes(job_role['jd_embedding'])
+    job_embedding = role_vector(conn, role_id, job_role)
 
     # ---- similarity score  (NumPy → Python float) ----
-    score = float(cosine_similarity(
-        resume_embedding.reshape(1, -1),
-        job_embedding.reshape(1, -1)
-    )[0][0]) * 100
+    with metrics.span('score'):
+        score = match_score(resume, job_embedding)
 
     # ---- skill gap ----
-    candidate_skills = set(json.loads(resume['skills']))
-    required_skills  = set(json.loads(job_role['required_skills']))
     missing_skills   = list(required_skills - candidate_skills)
 
     # ---- rich roadmap ----
-    recommendations = generate_recommendations(missing_skills, score)
+    with metrics.span('recommendations'):
+        recommendations = generate_recommendations(missing_skills, score)
 
     # ---- persist ----
     analysis_id = database.generate_id()
-    conn.execute('''
-        INSERT INTO analysis_history (analysis_id, user_id, resume_id, role_id,
-                                    job_match_score, missing_skills, recommendations)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        analysis_id, user_id, resume_id, role_id,
-        round(score, 1), json.dumps(missing_skills), json.dumps(recommendations)
-    ))
-    conn.commit()
-    conn.close()
+    try:
+        with metrics.span('db_insert'):
+            database.run_write(conn, lambda c: c.execute('''
+                INSERT INTO analysis_history (analysis_id, user_id, resume_id, role_id,
+                                            job_match_score, missing_skills, recommendations,
+                                            jd_hash, model_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                analysis_id, user_id, resume_id, role_id,
+                round(score, 1), json.dumps(missing_skills), json.dumps(recommendations),
+                jd_hash, cache_key[-1]
+            )))
+    except sqlite3.IntegrityError:                    # foreign key: user or role deleted meanwhile
+        return jsonify({"error": "User or job role not found"}), 404
+    stored = {
+        "analysis_id": analysis_id,
+        "job_match_score": round(score, 1),
+        "missing_skills": missing_skills,
+        "recommendations": recommendations
+    }
+    analysis_cache.put(cache_key, stored)
 
     # ---- response ----
     return jsonify({
-        "analysis_id": analysis_id,
-        "job_match_score": round(score, 1),
+        **stored,
         "role_name": job_role['role_name'],
         "matched_skills": list(candidate_skills & required_skills),
-        "missing_skills": missing_skills,
-        "recommendations": recommendations
+        "cached": False
     }), 200
 
 
+@bp.route('/rank-roles', methods=['POST'])
+@require_auth
+def rank_roles():
+    """
+    Expects: { resume_id, top_k? }
+    Scores the resume against every job role in one matrix product and
+    returns the best `top_k` (default 5). Nothing is written to history.
+    """
+    data = request.get_json() or {}
+    resume_id = data.get('resume_id')
+
+    if not resume_id:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        top_k = int(data.get('top_k', 5))
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_k must be an integer"}), 400
+    if top_k < 1:
+        return jsonify({"error": "top_k must be positive"}), 400
+
+    conn = database.get_db()
+    resume = conn.execute(RESUME_SCORING_SQL, (MODEL_NAME, resume_id, g.user_id)).fetchone()
+
+    if not resume:
+        return jsonify({"error": "Resume not found"}), 404
+
+    role_index.refresh(conn)
+
+    resume_embedding, chunks = resume_vectors(resume)
+    ranked = role_index.rank(resume_embedding, json.loads(resume['skills']), top_k, chunks=chunks)
+
+    return jsonify({"resume_id": resume_id, "roles": ranked}), 200
+
+
+def _resumes_with_skills(conn, skills: list) -> list:
+    """resume_ids whose extracted skills include every one of `skills`."""
+    wanted = sorted({s.lower() for s in skills})
+    return [r[0] for r in conn.execute(f'''
+        SELECT resume_id FROM resumes r
+        WHERE (SELECT COUNT(DISTINCT lower(value)) FROM json_each(r.skills)
+               WHERE lower(value) IN ({",".join("?" * len(wanted))})) = ?
+    ''', (*wanted, len(wanted)))]
+
+
+@bp.route('/rank-resumes', methods=['POST'])
+@require_auth
+def rank_resumes():
+    """
+    Expects: { role_id | job_description, top_k?, skills? }
+    Reverse of /rank-roles: the `top_k` (default 10) resumes closest to a
+    job role or free-text description. `skills` keeps only resumes that
+    list all of them. Owner and file name are only returned for the
+    caller's own resumes. Nothing is written to history.
+    """
+    data = request.get_json() or {}
+    role_id  = data.get('role_id')
+    job_text = (data.get('job_description') or '').strip()
+    skills   = data.get('skills') or []
+
+    if not role_id and not job_text:
+        return jsonify({"error": "role_id or job_description required"}), 400
+    if not isinstance(skills, list) or not all(isinstance(s, str) for s in skills):
+        return jsonify({"error": "skills must be a list of strings"}), 400
+
+    try:
+        top_k = int(data.get('top_k', 10))
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_k must be an integer"}), 400
+    if top_k < 1:
+        return jsonify({"error": "top_k must be positive"}), 400
+
+    conn = database.get_db()
+    if role_id:
+        job_role = conn.execute(
+            'SELECT role_name, job_description, required_skills, jd_embedding, jd_hash, jd_model '
+            'FROM job_roles WHERE role_id = ?', (role_id,)
+        ).fetchone()
+        if not job_role:
+            return jsonify({"error": "Job role not found"}), 404
+        query = role_vector(conn, role_id, job_role)
+        required_skills = json.loads(job_role['required_skills'])
+    else:
+        query, required_skills = jd_cache.lookup(job_text)
+
+    allowed = _resumes_with_skills(conn, skills) if skills else None
+    hits, method = resume_index.search(query, top_k, allowed)
+
+    details = {}
+    if hits:
+        ids = [resume_id for resume_id, _ in hits]
+        details = {r['resume_id']: r for r in conn.execute(
+            'SELECT resume_id, user_id, file_name, skills FROM resumes '
+            f'WHERE resume_id IN ({",".join("?" * len(ids))})', ids)}
+
+    resumes = []
+    for resume_id, score in hits:
+        row = details.get(resume_id)
+        if row is None:                                  # deleted since the search
+            continue
+        have = set(json.loads(row['skills']))
+        own = row['user_id'] == g.user_id
+        resumes.append({
+            "resume_id": resume_id,
+            "user_id": row['user_id'] if own else None,
+            "file_name": row['file_name'] if own else None,
+            "job_match_score": round(score * 100, 1),
+            "matched_skills": [s for s in required_skills if s in have],
+            "missing_skills": [s for s in required_skills if s not in have]
+        })
+
+    return jsonify({"role_id": role_id, "method": method, "resumes": resumes}), 200
+
+
 @bp.route('/analysis/latest', methods=['GET'])
 def get_latest_analysis():
     user_id = request.args.get('user_id')
     if not user_id:
         return jsonify({"error": "User ID required"}), 400
 
-    conn = database.get_db_connection()
+    conn = database.get_db()
     latest = conn.execute('''
         SELECT ah.*, jr.role_name
         FROM analysis_history ah
         JOIN job_roles jr ON ah.role_id = jr.role_id
         WHERE ah.user_id = ?
-        ORDER BY ah.timestamp DESC
+        ORDER BY ah.timestamp DESC, ah.rowid DESC
         LIMIT 1
     ''', (user_id,)).fetchone()
-    conn.close()
 
     if not latest:
         return jsonify({"error": "No analysis found"}), 404
@@ -270,52 +479,158 @@ def get_latest_analysis():
     }), 200
 
 
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+
+def _encode_cursor(timestamp, rowid: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp, rowid]).encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        timestamp, rowid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(timestamp, str):             # only ever a SQLite timestamp
+            return None
+        return timestamp, int(rowid)
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+@bp.route('/analysis/history', methods=['GET'])
+@require_auth
+def get_analysis_history():
+    """
+    ?limit=20&cursor=…&role_id=…(repeatable)
+    Newest-first page of the caller's analyses plus `next_cursor` (null
+    on the last page). Pages are keyset-based on (timestamp, rowid), so
+    each one costs the same however deep it is.
+    """
+    user_id = g.user_id
+    try:
+        limit = int(request.args.get('limit', HISTORY_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+
+    where, params = ['ah.user_id = ?'], [user_id]
+    role_ids = request.args.getlist('role_id')
+    if role_ids:
+        where.append(f'ah.role_id IN ({",".join("?" * len(role_ids))})')
+        params += role_ids
+    cursor = request.args.get('cursor')
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+        where.append('(ah.timestamp, ah.rowid) < (?, ?)')
+        params += position
+
+    conn = database.get_db()
+    rows = conn.execute(f'''
+        SELECT ah.rowid, ah.analysis_id, ah.role_id, ah.job_match_score, ah.timestamp, jr.role_name
+        FROM analysis_history ah
+        JOIN job_roles jr ON ah.role_id = jr.role_id
+        WHERE {" AND ".join(where)}
+        ORDER BY ah.timestamp DESC, ah.rowid DESC
+        LIMIT ?
+    ''', (*params, limit + 1)).fetchall()
+
+    page = rows[:limit]
+    return jsonify({
+        "analyses": [{
+            "analysis_id": r['analysis_id'],
+            "role_id": r['role_id'],
+            "role_name": r['role_name'],
+            "job_match_score": r['job_match_score'],
+            "timestamp": r['timestamp']
+        } for r in page],
+        "next_cursor": _encode_cursor(page[-1]['timestamp'], page[-1]['rowid'])
+                       if len(rows) > limit else None
+    }), 200
+
+
+@bp.route('/analysis/trend', methods=['GET'])
+@require_auth
+def get_analysis_trend():
+    """
+    ?role_id=…(optional, repeatable)
+    Per-role score summary for the caller from the analysis_trends rollup:
+    number of analyses, best, latest and moving-average score.
+    """
+    user_id = g.user_id
+
+    where, params = ['t.user_id = ?'], [user_id]
+    role_ids = request.args.getlist('role_id')
+    if role_ids:
+        where.append(f't.role_id IN ({",".join("?" * len(role_ids))})')
+        params += role_ids
+
+    conn = database.get_db()
+    rows = conn.execute(f'''
+        SELECT t.*, jr.role_name
+        FROM analysis_trends t
+        JOIN job_roles jr ON t.role_id = jr.role_id
+        WHERE {" AND ".join(where)}
+        ORDER BY t.latest_at DESC
+    ''', params).fetchall()
+
+    return jsonify({
+        "user_id": user_id,
+        "roles": [{
+            "role_id": r['role_id'],
+            "role_name": r['role_name'],
+            "analyses": r['analyses'],
+            "best_score": r['best_score'],
+            "latest_score": r['latest_score'],
+            "moving_avg": round(r['moving_avg'], 1),
+            "latest_at": r['latest_at']
+        } for r in rows]
+    }), 200
+
+
 # ------------------------------------------------------------------
 #  NEW: analyse free-text job description (no DB row needed)
 # ------------------------------------------------------------------
-from models.embeddings import generate_embedding, model as embed_model
-from sklearn.metrics.pairwise import cosine_similarity
+from models.embeddings import generate_embedding
 import numpy as np
 
 @bp.route('/analyze-text', methods=['POST'])
+@require_auth
 def analyze_text():
     """
-    Expects: { user_id, resume_id, job_description: "free text..." }
+    Expects: { resume_id, job_description: "free text..." }
     Returns: same JSON shape as /analyze-role but without DB storage
     """
-    data = request.get_json()
-    user_id   = data.get('user_id')
+    data = request.get_json() or {}
     resume_id = data.get('resume_id')
-    job_text  = data.get('job_description', '').strip()
+    job_text  = (data.get('job_description') or '').strip()
 
-    if not all([user_id, resume_id, job_text]):
+    if not all([resume_id, job_text]):
         return jsonify({"error": "Missing fields"}), 400
 
-    conn = database.get_db_connection()
-    resume = conn.execute(
-        'SELECT resume_embedding, skills FROM resumes WHERE resume_id = ?', (resume_id,)
-    ).fetchone()
-    conn.close()
+    conn = database.get_db()
+    with metrics.span('db_fetch'):
+        resume = conn.execute(RESUME_SCORING_SQL, (MODEL_NAME, resume_id, g.user_id)).fetchone()
 
     if not resume:
         return jsonify({"error": "Resume not found"}), 404
 
     # ---- same math as before ----
-    resume_embedding = get_embedding_from_bytes(resume['resume_embedding'])
-    job_embedding    = embed_model.encode(job_text, convert_to_tensor=True).cpu().numpy()
+    with metrics.span('jd_lookup'):
+        job_embedding, job_skills = jd_cache.lookup(job_text)   # skips the model on repeats
 
-    score = float(cosine_similarity(
-        resume_embedding.reshape(1, -1),
-        job_embedding.reshape(1, -1)
-    )[0][0]) * 100
+    with metrics.span('score'):
+        score = match_score(resume, job_embedding)
 
     # ---- skill gap vs free text ----
     candidate_skills = set(json.loads(resume['skills']))
-    required_skills  = set(extract_skills(job_text, None))   # rule-based, no spaCy needed
+    required_skills  = set(job_skills)
     missing_skills   = list(required_skills - candidate_skills)
 
     # ---- recommendations ----
-    recommendations = generate_recommendations(missing_skills, score)
+    with metrics.span('recommendations'):
+        recommendations = generate_recommendations(missing_skills, score)
 
     return jsonify({
         "analysis_id": None,
@@ -324,4 +639,25 @@ def analyze_text():
         "matched_skills": list(candidate_skills & required_skills),
         "missing_skills": missing_skills,
         "recommendations": recommendations
-    }), 200
\ No newline at end of file
+    }), 200
+
+
+@bp.route('/jd-cache/stats', methods=['GET'])
+def get_jd_cache_stats():
+    return jsonify(jd_cache.stats()), 200
+
+
+@bp.route('/analysis-cache/stats', methods=['GET'])
+def get_analysis_cache_stats():
+    return jsonify(analysis_cache.stats()), 200
+
+
+@bp.route('/embeddings/stats', methods=['GET'])
+def get_embedding_stats():
+    sidecar = embeddings.sidecar.stats() if embeddings.sidecar is not None else None
+    return jsonify({**batcher.stats(), "sidecar": sidecar, "reembed": reembed.status()}), 200
+
+
+@bp.route('/embedding-store/stats', methods=['GET'])
+def get_embedding_store_stats():
+    return jsonify({**embedding_store.stats(), "index": resume_index.stats()}), 200
@@ -1,17 +1,16 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify
 import sqlite3
-import bcrypt
 import database
+from utils import security
+from utils.security import hash_password, verify_password, HashQueueFull
 
-# Inline security functions
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+bp = Blueprint('auth', __name__)
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
-bp = Blueprint('auth', __name__)
+@bp.errorhandler(HashQueueFull)
+def _hash_queue_full(_):
+    return jsonify({"error": "Server busy, retry shortly"}), 503
+
 
 @bp.route('/register', methods=['POST'])
 def register():
@@ -23,22 +22,19 @@ def register():
     if not all([name, email, password]):
         return jsonify({"error": "All fields required"}), 400
     
-    conn = database.get_db_connection()
+    conn = database.get_db()
     try:
         user_id = database.generate_id()
         password_hash = hash_password(password)
         
-        conn.execute('''
+        database.run_write(conn, lambda c: c.execute('''
             INSERT INTO users (user_id, name, email, password_hash)
             VALUES (?, ?, ?, ?)
-        ''', (user_id, name, email, password_hash))
-        conn.commit()
+        ''', (user_id, name, email, password_hash)))
         
         return jsonify({"message": "User registered", "user_id": user_id}), 201
     except sqlite3.IntegrityError:
         return jsonify({"error": "Email already exists"}), 409
-    finally:
-        conn.close()
 
 @bp.route('/login', methods=['POST'])
 def login():
@@ -46,22 +42,34 @@ def login():
     email = data.get('email')
     password = data.get('password')
     
-    conn = database.get_db_connection()
+    if not all([email, password]):
+        return jsonify({"error": "Email and password required"}), 400
+
+    conn = database.get_db()
     user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
-    conn.close()
-    
-    if not user or not verify_password(password, user['password_hash']):
+
+    if not user:
+        security.burn_verify(password)
         return jsonify({"error": "Invalid credentials"}), 401
-    
-    # Return user data (in real app, use JWT or session)
+    if not verify_password(password, user['password_hash']):
+        return jsonify({"error": "Invalid credentials"}), 401
+
+    # work factor changed since this hash was made → upgrade it now
+    if security.needs_rehash(user['password_hash']):
+        new_hash = hash_password(password)
+        database.run_write(conn, lambda c: c.execute(
+            'UPDATE users SET password_hash = ? WHERE user_id = ?', (new_hash, user['user_id'])))
+
     return jsonify({
         "message": "Login successful",
         "user_id": user['user_id'],
         "name": user['name'],
-        "email": user['email']
+        "email": user['email'],
+        "token": security.issue_token(user['user_id']),
+        "expires_in": security.TOKEN_TTL_S
     }), 200
 
 @bp.route('/logout', methods=['POST'])
 def logout():
-    # In a real app, invalidate session/token
+    # tokens are stateless: the client drops its copy and it expires
     return jsonify({"message": "Logged out"}), 200
\ No newline at end of file
@@ -0,0 +1,17 @@
+# backend/routes/health.py
+from flask import Blueprint, jsonify
+from utils import warmup
+
+bp = Blueprint('health', __name__)
+
+
+@bp.route('/health/live', methods=['GET'])
+def live():
+    """Process is up and serving requests."""
+    return jsonify({"status": "live"}), 200
+
+
+@bp.route('/health/ready', methods=['GET'])
+def ready():
+    """Models are loaded; model-backed endpoints will not stall."""
+    return jsonify(warmup.state), 200 if warmup.is_ready() else 503
@@ -1,79 +1,193 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 import json
-import pdfplumber
+import sqlite3
 import database
-from models.nlp_processor import extract_skills, extract_education, extract_experience, get_nlp_model
-from models.embeddings import generate_embedding
+from models.nlp_processor import extract_profile
+from models import embeddings
+from models.embeddings import generate_embedding, get_embedding_from_bytes
+from models.embedding_store import store_resumes
+from utils.pdf_parser import extract_text_from_pdf
+from utils.resume_ingest import ingest_resumes
+from utils import job_queue, metrics, uploads
+from utils.security import require_auth
 import os
-
-# Inline PDF parser
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF file"""
-    text = ""
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"Error extracting PDF: {e}")
-        return ""
-    return text.strip()
+import time
 
 bp = Blueprint('resume', __name__)
 
+
+def _user_exists(conn, user_id: str) -> bool:
+    # resumes.user_id is a real foreign key now that the pool enables them
+    return conn.execute('SELECT 1 FROM users WHERE user_id = ?', (user_id,)).fetchone() is not None
+
+
 @bp.route('/upload-resume', methods=['POST'])
+@require_auth
 def upload_resume():
     if 'file' not in request.files:
         return jsonify({"error": "No file provided"}), 400
     
     file = request.files['file']
-    user_id = request.form.get('user_id')
-    
-    if not user_id:
-        return jsonify({"error": "User ID required"}), 400
+    user_id = g.user_id
     
     if not file.filename.endswith('.pdf'):
         return jsonify({"error": "Only PDF files allowed"}), 400
+
+    conn = database.get_db()
+    if not _user_exists(conn, user_id):
+        return jsonify({"error": "User not found"}), 404
     
-    # Save file
+    # Save file (hashed while streaming to disk)
     filename = f"{user_id}_{file.filename}"
     filepath = os.path.join('uploads', filename)
-    file.save(filepath)
-    
+    with metrics.span('save'):
+        content_hash = uploads.save_and_hash(file, filepath)
+
+    # Identical bytes seen before → reuse the stored parse and embedding
+    with metrics.span('dedupe_lookup'):
+        processed = uploads.find_processed(conn, content_hash, user_id)
+    if processed:
+        return jsonify(uploads.reuse_processed(conn, processed, user_id, filename, filepath)), 201
+
+    # Async mode: hand the pipeline to the worker pool, poll /api/jobs/<id>
+    if request.values.get('async', '').lower() in ('1', 'true', 'yes'):
+        try:
+            job_id = job_queue.submit(user_id, filename, process_resume,
+                                      user_id, filename, filepath, content_hash)
+        except job_queue.QueueFull:
+            os.remove(filepath)
+            return jsonify({"error": "Processing queue is full, retry later"}), 503
+        return jsonify({
+            "message": "Resume queued for processing",
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/api/jobs/{job_id}"
+        }), 202
+
+    try:
+        result = process_resume(user_id, filename, filepath, content_hash)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result), 201
+
+
+def process_resume(user_id: str, filename: str, filepath: str, content_hash: str = None,
+                   timings: dict = None) -> dict:
+    """
+    PDF → text → NLP → embedding → `resumes` row. Stage durations (ms)
+    are written into `timings` and recorded as metrics spans. Raises ValueError if the PDF has no text
+    or the user does not exist.
+    """
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+
+    def lap(stage):
+        nonlocal started
+        now = time.perf_counter()
+        timings[stage] = round((now - started) * 1000, 2)
+        metrics.record(stage, now - started)
+        started = now
+
     # Extract text
     text = extract_text_from_pdf(filepath)
+    lap('extract_text')
     if not text:
         os.remove(filepath)
-        return jsonify({"error": "Could not extract text from PDF"}), 400
-    
+        raise ValueError("Could not extract text from PDF")
+
     # Process with NLP
-    nlp = get_nlp_model()
-    skills = extract_skills(text, nlp)
-    education = extract_education(text, nlp)
-    experience = extract_experience(text, nlp)
-    
+    profile = extract_profile(text)
+    skills, education, experience = profile['skills'], profile['education'], profile['experience']
+    lap('nlp')
+
     # Generate embedding
-    embedding_blob = generate_embedding(text)
-    
-    # Store in database
+    chunk_blob = None
+    if embeddings.CHUNK_MODE != 'off':
+        vectors, chunk_matrices = embeddings.encode_with_chunks([text])
+        embedding_blob = vectors[0].tobytes()
+        chunk_blob = embeddings.chunks_to_bytes(chunk_matrices[0])
+    else:
+        embedding_blob = generate_embedding(text)
+    lap('embedding')
+
+    # Store in database (also runs on job-queue threads, outside a request)
     conn = database.get_db_connection()
     resume_id = database.generate_id()
-    
-    conn.execute('''
-        INSERT INTO resumes (resume_id, user_id, file_name, file_path, parsed_text, 
-                           skills, education, experience, resume_embedding)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        resume_id, user_id, filename, filepath, text,
-        json.dumps(skills), json.dumps(education), json.dumps(experience),
-        embedding_blob
-    ))
-    conn.commit()
-    conn.close()
-    
-    return jsonify({
+
+    try:
+        database.run_write(conn, lambda c: c.execute('''
+            INSERT INTO resumes (resume_id, user_id, file_name, file_path, parsed_text, 
+                               skills, education, experience, resume_embedding, content_hash,
+                               chunk_embeddings, embedding_model)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            resume_id, user_id, filename, filepath, text,
+            json.dumps(skills), json.dumps(education), json.dumps(experience),
+            embedding_blob, content_hash, chunk_blob, embeddings.MODEL_NAME
+        )))
+    except sqlite3.IntegrityError:                    # foreign key: no such user
+        os.remove(filepath)
+        raise ValueError("Unknown user")
+    finally:
+        conn.close()
+    store_resumes([resume_id], get_embedding_from_bytes(embedding_blob)[None, :])
+    lap('db_insert')
+
+    return {
         "message": "Resume uploaded and processed",
         "resume_id": resume_id,
         "skills": skills,
-        "skill_count": len(skills)
-    }), 201
\ No newline at end of file
+        "skill_count": len(skills),
+        "cache_hit": False
+    }
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_processing_job(job_id):
+    job = job_queue.get_job(job_id, g.user_id)       # another user's job reads as unknown
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
+
+
+@bp.route('/upload-resumes', methods=['POST'])
+@require_auth
+def upload_resumes():
+    """
+    Multi-file variant of /upload-resume (form field `files`, repeated).
+    Every file gets its own success or error entry in `results`.
+    For cohorts larger than the request size limit use ingest_resumes.py.
+    """
+    files = request.files.getlist('files')
+    user_id = g.user_id
+
+    if not files:
+        return jsonify({"error": "No files provided"}), 400
+    if not _user_exists(database.get_db(), user_id):
+        return jsonify({"error": "User not found"}), 404
+
+    results = [None] * len(files)
+    saved = []                           # (index, file_name, file_path)
+    for i, file in enumerate(files):
+        if not file.filename.endswith('.pdf'):
+            results[i] = {"file_name": file.filename, "status": "error",
+                          "error": "Only PDF files allowed"}
+            continue
+        filename = f"{user_id}_{file.filename}"
+        # files in one request may share a name: give each its own path
+        filepath = os.path.join('uploads', f"{user_id}_{database.generate_id()}_{file.filename}")
+        file.save(filepath)
+        saved.append((i, filename, filepath))
+
+    ingested = ingest_resumes(user_id, [(name, path) for _, name, path in saved])
+    for (i, _, filepath), result in zip(saved, ingested):
+        if result["status"] == "error":
+            os.remove(filepath)
+        results[i] = result
+
+    processed = sum(1 for r in results if r["status"] == "ok")
+    return jsonify({
+        "message": f"{processed} of {len(results)} resumes processed",
+        "results": results
+    }), 201 if processed else 400
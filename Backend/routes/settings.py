@@ -1,6 +1,8 @@
 # backend/routes/settings.py
 from flask import Blueprint, request, jsonify
 import database
+from models.embedding_store import forget_resumes
+from models.analysis_cache import analysis_cache
 import os
 import shutil
 
@@ -20,17 +22,17 @@ def clear_data():
     if not user_id:
         return jsonify({"error": "User ID required"}), 400
 
-    conn = database.get_db_connection()
+    conn = database.get_db()
 
-    # 1.  collect file paths before we delete rows
+    # 1.  collect file paths and ids before we delete rows
     resumes = conn.execute(
-        'SELECT file_path FROM resumes WHERE user_id = ?', (user_id,)
+        'SELECT resume_id, file_path FROM resumes WHERE user_id = ?', (user_id,)
     ).fetchall()
 
     # 2.  delete user (ON DELETE CASCADE removes resumes & analyses automatically)
-    conn.execute('DELETE FROM users WHERE user_id = ?', (user_id,))
-    conn.commit()
-    conn.close()
+    database.run_write(conn, lambda c: c.execute('DELETE FROM users WHERE user_id = ?', (user_id,)))
+    forget_resumes([r['resume_id'] for r in resumes])
+    analysis_cache.forget_user(user_id)
 
     # 3.  remove physical PDFs
     for r in resumes:
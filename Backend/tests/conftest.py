@@ -0,0 +1,44 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('JOBFIT_SECRET_KEY', 'test-secret')
+os.environ.setdefault('JOBFIT_BCRYPT_ROUNDS', '4')
+
+from flask import Flask
+
+import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, initialised database (and connection pool) in tmp_path."""
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'test.db'))
+    monkeypatch.setattr(database, '_pool', database.queue.LifoQueue(maxsize=database.DB_POOL_SIZE))
+    database.init_db()
+    return tmp_path
+
+
+@pytest.fixture
+def client(db):
+    """Test client for the auth, resume and analysis routes."""
+    from routes import analysis, auth, resume
+    app = Flask(__name__)
+    database.init_app(app)
+    app.register_blueprint(auth.bp, url_prefix='/api')
+    app.register_blueprint(resume.bp, url_prefix='/api')
+    app.register_blueprint(analysis.bp, url_prefix='/api')
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """login(email) registers and logs in a user: {'user_id', 'token', 'headers'}."""
+    def login(email: str) -> dict:
+        client.post('/api/register', json={'name': email, 'email': email, 'password': 'pw'})
+        user = client.post('/api/login', json={'email': email, 'password': 'pw'}).get_json()
+        return {**user, 'headers': {'Authorization': f"Bearer {user['token']}"}}
+    return login
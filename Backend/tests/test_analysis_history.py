@@ -0,0 +1,129 @@
+# backend/tests/test_analysis_history.py
+import base64
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database
+
+# (role index, score, timestamp); two rows share a timestamp to exercise the rowid tie-break
+RUNS = [(0, 40.0, '2026-01-01 09:00:00'), (1, 55.0, '2026-01-02 09:00:00'),
+        (0, 60.0, '2026-01-03 09:00:00'), (0, 50.0, '2026-01-03 09:00:00'),
+        (1, 70.0, '2026-01-04 09:00:00'), (0, 65.0, '2026-01-05 09:00:00'),
+        (1, 45.0, '2026-01-06 09:00:00')]
+
+
+@pytest.fixture
+def history(client, login):
+    """A user with RUNS in analysis_history; returns (user, role ids, newest-first analysis ids)."""
+    user = login('alice@x')
+    conn = database.get_db_connection()
+    roles = [r['role_id'] for r in conn.execute('SELECT role_id FROM job_roles ORDER BY role_name LIMIT 2')]
+    ids = [f'analysis-{i}' for i in range(len(RUNS))]
+
+    def write(c):
+        c.execute("INSERT INTO resumes (resume_id, user_id, file_name, file_path) "
+                  "VALUES ('cv', ?, 'cv.pdf', 'uploads/cv.pdf')", (user['user_id'],))
+        c.executemany('INSERT INTO analysis_history (analysis_id, user_id, resume_id, role_id, '
+                      'job_match_score, timestamp) VALUES (?, ?, ?, ?, ?, ?)',
+                      [(aid, user['user_id'], 'cv', roles[role], score, ts)
+                       for aid, (role, score, ts) in zip(ids, RUNS)])
+    database.run_write(conn, write)
+    conn.close()
+    newest_first = [ids[i] for i in sorted(range(len(RUNS)), key=lambda i: (RUNS[i][2], i), reverse=True)]
+    return user, roles, newest_first
+
+
+def _pages(client, user, query: str = '') -> list:
+    pages, cursor = [], None
+    while True:
+        url = f'/api/analysis/history?limit=2{query}' + (f'&cursor={cursor}' if cursor else '')
+        r = client.get(url, headers=user['headers'])
+        assert r.status_code == 200
+        body = r.get_json()
+        pages.append([a['analysis_id'] for a in body['analyses']])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def _expected_trend(scores: list) -> dict:
+    alpha, avg = 2 / (database.TREND_WINDOW + 1), scores[0]
+    for score in scores[1:]:
+        avg += alpha * (score - avg)
+    return {'analyses': len(scores), 'best_score': max(scores),
+            'latest_score': scores[-1], 'moving_avg': round(avg, 1)}
+
+
+# ---------------------------------------------------------
+# History pages
+# ---------------------------------------------------------
+def test_keyset_pages_cover_history_once_newest_first(client, history):
+    user, _, newest_first = history
+    pages = _pages(client, user)
+    assert [len(p) for p in pages] == [2, 2, 2, 1]
+    assert [aid for page in pages for aid in page] == newest_first
+
+
+def test_role_filter(client, history):
+    user, roles, newest_first = history
+    only_second = [aid for aid in newest_first if RUNS[int(aid.split('-')[1])][0] == 1]
+    assert sum(_pages(client, user, f'&role_id={roles[1]}'), []) == only_second
+    assert sum(_pages(client, user, f'&role_id={roles[0]}&role_id={roles[1]}'), []) == newest_first
+
+
+@pytest.mark.parametrize('position', [[[1], 1], [None, 1], [{'a': 1}, 1], ['2026-01-01', 'x']])
+def test_malformed_cursor_is_400(client, history, position):
+    user, _, _ = history
+    cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+    r = client.get(f'/api/analysis/history?cursor={cursor}', headers=user['headers'])
+    assert r.status_code == 400
+
+
+def test_history_and_trend_are_the_callers_own(client, login, history):
+    user, _, _ = history
+    bob = login('bob@x')
+    for path in ('/api/analysis/history', '/api/analysis/trend'):
+        assert client.get(path).status_code == 401
+        assert client.get(f"{path}?user_id={user['user_id']}", headers=bob['headers']).status_code == 403
+    assert client.get('/api/analysis/history', headers=bob['headers']).get_json()['analyses'] == []
+    assert client.get('/api/analysis/trend', headers=bob['headers']).get_json()['roles'] == []
+
+
+# ---------------------------------------------------------
+# Trend rollup
+# ---------------------------------------------------------
+def test_trigger_keeps_the_trend_rollup_current(client, history):
+    user, roles, _ = history
+    r = client.get('/api/analysis/trend', headers=user['headers'])
+    trend = {t['role_id']: t for t in r.get_json()['roles']}
+    for index, role_id in enumerate(roles):
+        scores = [score for role, score, _ in RUNS if role == index]
+        assert {k: trend[role_id][k] for k in ('analyses', 'best_score', 'latest_score', 'moving_avg')} \
+            == _expected_trend(scores)
+
+
+def test_rebuild_matches_the_trigger(client, history):
+    conn = database.get_db_connection()
+    by_trigger = [tuple(r) for r in conn.execute('SELECT * FROM analysis_trends ORDER BY role_id')]
+    assert database.run_write(conn, database.rebuild_analysis_trends) == 2
+    rebuilt = [tuple(r) for r in conn.execute('SELECT * FROM analysis_trends ORDER BY role_id')]
+    conn.close()
+    assert [r[:6] for r in rebuilt] == [r[:6] for r in by_trigger]
+    assert [r[6] for r in rebuilt] == pytest.approx([r[6] for r in by_trigger])
+
+
+def test_init_db_backfills_history_from_before_the_rollup(client, history):
+    conn = database.get_db_connection()
+    expected = [tuple(r) for r in conn.execute('SELECT * FROM analysis_trends ORDER BY role_id')]
+    database.run_write(conn, lambda c: c.execute('DELETE FROM analysis_trends'))
+    conn.close()
+    database.init_db()
+    conn = database.get_db_connection()
+    backfilled = [tuple(r) for r in conn.execute('SELECT * FROM analysis_trends ORDER BY role_id')]
+    conn.close()
+    assert [r[:6] for r in backfilled] == [r[:6] for r in expected]
@@ -0,0 +1,51 @@
+# backend/tests/test_onnx_parity.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('onnxruntime')
+pytest.importorskip('sentence_transformers')
+
+from models.embeddings import MODEL_NAME, OnnxEncoder, export_onnx
+
+MIN_COSINE = 0.99
+
+TEXTS = [
+    "Senior Python developer with 6 years building Flask and Django REST APIs.",
+    "Data analyst: SQL, Excel, Tableau dashboards, A/B testing and statistics.",
+    "Designed Kubernetes CI/CD pipelines with Jenkins, Terraform and AWS.",
+    "Short.",
+    # longer than the 256-token window, so truncation must match too
+    " ".join(["Led cross-functional teams delivering machine learning products."] * 60),
+]
+
+
+@pytest.fixture(scope='module')
+def reference():
+    from sentence_transformers import SentenceTransformer
+    try:
+        model = SentenceTransformer(MODEL_NAME, device='cpu')
+    except OSError as e:                       # no cached weights and no network
+        pytest.skip(f"{MODEL_NAME} unavailable: {e}")
+    return model.encode(TEXTS, normalize_embeddings=True)
+
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory, reference):
+    path = str(tmp_path_factory.mktemp('onnx'))
+    export_onnx(path, quantize=True)
+    return path
+
+
+@pytest.mark.parametrize('file_name', ['model.onnx', 'model_int8.onnx'])
+def test_onnx_matches_pytorch(model_dir, reference, file_name):
+    encoder = OnnxEncoder(os.path.join(model_dir, file_name), model_dir)
+    vectors = encoder.encode(TEXTS, batch_size=2)
+
+    assert vectors.shape == reference.shape
+    cosines = np.sum(vectors * reference, axis=1)       # both L2-normalised
+    assert cosines.min() >= MIN_COSINE, dict(zip(TEXTS, cosines.round(4)))
@@ -0,0 +1,134 @@
+# backend/tests/test_reembed.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database
+from models import embeddings
+from models import role_index as role_index_module
+from utils import reembed
+
+OLD_MODEL = 'old-model'
+
+
+def _vector(text: str) -> np.ndarray:
+    """Deterministic stand-in for the current model."""
+    rng = np.random.default_rng(int(database.content_hash(text)[:8], 16))
+    return rng.normal(size=8).astype(np.float32)
+
+
+@pytest.fixture
+def encoded(db, monkeypatch):
+    """Texts handed to the (fake) current-model encoder, per call."""
+    calls = []
+
+    def encode_batch(texts, batch_size=None):
+        calls.append(list(texts))
+        return np.stack([_vector(t) for t in texts])
+    monkeypatch.setattr(embeddings, 'encode_batch', encode_batch)
+    monkeypatch.setattr(role_index_module, 'encode_batch', encode_batch)
+    monkeypatch.setattr(reembed, 'REEMBED_PAUSE_S', 0)
+    return calls
+
+
+@pytest.fixture
+def old_roles(db):
+    """Every seeded role tagged with a vector from OLD_MODEL; returns role_ids in rowid order."""
+    conn = database.get_db_connection()
+    database.run_write(conn, lambda c: c.execute(
+        'UPDATE job_roles SET jd_embedding = ?, jd_model = ?',
+        (np.ones(8, dtype=np.float32).tobytes(), OLD_MODEL)))
+    ids = [r['role_id'] for r in conn.execute('SELECT role_id FROM job_roles ORDER BY rowid')]
+    conn.close()
+    return ids
+
+
+def _roles() -> dict:
+    conn = database.get_db_connection()
+    rows = conn.execute('SELECT role_id, job_description, jd_embedding, jd_model FROM job_roles').fetchall()
+    conn.close()
+    return {r['role_id']: dict(r) for r in rows}
+
+
+def test_interrupted_run_resumes_from_its_checkpoint(encoded, old_roles, monkeypatch):
+    encode_batch = embeddings.encode_batch
+
+    def fail_second_batch(texts, batch_size=None):
+        if len(encoded) == 1:
+            encoded.append(None)
+            raise KeyboardInterrupt
+        return encode_batch(texts, batch_size)
+    monkeypatch.setattr(embeddings, 'encode_batch', fail_second_batch)
+    with pytest.raises(KeyboardInterrupt):
+        reembed.run_table('job_roles', batch_size=5)
+
+    conn = database.get_db_connection()
+    state = reembed._checkpoint(conn, 'job_roles')
+    conn.close()
+    assert (state['status'], state['rows_done']) == ('running', 5)
+    assert reembed.pending()['job_roles'] == len(old_roles) - 5
+
+    monkeypatch.setattr(embeddings, 'encode_batch', encode_batch)
+    encoded.clear()
+    assert reembed.run_table('job_roles', batch_size=5) == len(old_roles) - 5
+    assert sum(len(texts) for texts in encoded) == len(old_roles) - 5      # batch one not redone
+
+    conn = database.get_db_connection()
+    state = reembed._checkpoint(conn, 'job_roles')
+    conn.close()
+    assert (state['status'], state['rows_done']) == ('done', len(old_roles))
+    roles = _roles()
+    assert all(r['jd_model'] == embeddings.MODEL_NAME for r in roles.values())
+    role = roles[old_roles[-1]]
+    assert np.array_equal(embeddings.get_embedding_from_bytes(role['jd_embedding']),
+                          _vector(role['job_description']))
+
+
+def test_rows_updated_by_another_writer_are_not_overwritten(encoded, old_roles, monkeypatch):
+    encode_batch = embeddings.encode_batch
+    theirs = np.full(8, 7, dtype=np.float32)
+
+    def encode_while_another_writer_updates(texts, batch_size=None):
+        # e.g. a role edited and re-encoded between our SELECT and our UPDATE
+        conn = database.get_db_connection()
+        database.run_write(conn, lambda c: c.execute(
+            'UPDATE job_roles SET jd_embedding = ?, jd_model = ? WHERE role_id = ?',
+            (theirs.tobytes(), embeddings.MODEL_NAME, old_roles[0])))
+        conn.close()
+        return encode_batch(texts, batch_size)
+    monkeypatch.setattr(embeddings, 'encode_batch', encode_while_another_writer_updates)
+
+    reembed.run_table('job_roles', batch_size=5)
+    roles = _roles()
+    assert np.array_equal(embeddings.get_embedding_from_bytes(roles[old_roles[0]]['jd_embedding']), theirs)
+    assert reembed.pending()['job_roles'] == 0
+
+
+def test_roles_score_with_the_current_model_during_the_migration(encoded, old_roles):
+    index = role_index_module.RoleIndex()
+    conn = database.get_db_connection()
+    index.refresh(conn)
+    assert sum(len(texts) for texts in encoded) == len(old_roles)     # not the OLD_MODEL vectors
+
+    role_ids, _, _, _, matrix = index._snapshot
+    roles = _roles()
+    for role_id, row in zip(role_ids, matrix):
+        expected = _vector(roles[role_id]['job_description'])
+        assert np.allclose(row, expected / np.linalg.norm(expected), atol=1e-6)
+
+    # a re-embedding batch bumps the version: the reload encodes nothing again
+    encoded.clear()
+    database.run_write(conn, lambda c: c.executemany(
+        'UPDATE job_roles SET jd_embedding = ?, jd_hash = ?, jd_model = ? WHERE role_id = ?',
+        [(_vector(roles[r]['job_description']).tobytes(), database.content_hash(roles[r]['job_description']),
+          embeddings.MODEL_NAME, r) for r in old_roles[:5]]))
+    index.refresh(conn)
+    conn.close()
+    assert encoded == []
+    assert len(index._encoded) == len(old_roles) - 5              # migrated roles dropped
+    assert index._snapshot[0] == role_ids
+    assert np.allclose(index._snapshot[4], matrix, atol=1e-6)
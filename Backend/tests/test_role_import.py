@@ -0,0 +1,126 @@
+# backend/tests/test_role_import.py
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database
+from models import embeddings
+from utils import role_import
+
+ROLES = [
+    {'role_name': f'Imported Role {i}',
+     'job_description': f'Build service {i}.\nOwn its "deploys" and on-call, with Python and SQL.',
+     'required_skills': 'Python;SQL', 'industry': 'Tech'}
+    for i in range(10)
+]
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    """Texts handed to the (fake) encoder, in order."""
+    texts = []
+
+    def encode_batch(batch, batch_size=None):
+        texts.extend(batch)
+        return np.ones((len(batch), 4), dtype=np.float32)
+    monkeypatch.setattr(embeddings, 'encode_batch', encode_batch)
+    return texts
+
+
+def _write(path, fmt: str, roles) -> str:
+    if fmt == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(roles[0]))
+            writer.writeheader()
+            writer.writerows(roles)             # descriptions span two lines, quoted
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(r) + '\n' for r in roles)
+    return str(path)
+
+
+def _imported(prefix: str = 'Imported Role') -> dict:
+    conn = database.get_db_connection()
+    rows = conn.execute('SELECT * FROM job_roles WHERE role_name LIKE ?', (prefix + '%',)).fetchall()
+    conn.close()
+    return {r['role_name']: dict(r) for r in rows}
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_interrupted_import_resumes_after_last_chunk(db, encoded, monkeypatch, fmt):
+    path = _write(db / f'roles.{fmt}', fmt, ROLES)
+    write_chunk, calls = role_import._write_chunk, []
+
+    def interrupt_second_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        write_chunk(*args)
+    monkeypatch.setattr(role_import, '_write_chunk', interrupt_second_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        role_import.import_roles(path, chunk_rows=3)
+
+    state = role_import.get_import(role_import.file_sha256(path))
+    assert state['status'] == 'interrupted'
+    assert state['imported'] == 3 and 0 < state['byte_offset'] < os.path.getsize(path)
+    assert sorted(_imported()) == [f'Imported Role {i}' for i in range(3)]
+
+    monkeypatch.setattr(role_import, '_write_chunk', write_chunk)
+    encoded.clear()
+    state = role_import.import_roles(path, chunk_rows=3)
+
+    assert state['status'] == 'done'
+    assert (state['rows_read'], state['imported'], state['failed']) == (10, 10, 0)
+    assert len(encoded) == 7                          # only the rows after the checkpoint
+    roles = _imported()
+    assert len(roles) == 10
+    assert roles['Imported Role 9']['job_description'] == ROLES[9]['job_description']
+    assert json.loads(roles['Imported Role 9']['required_skills']) == ['Python', 'SQL']
+
+
+def test_reimport_upserts_by_name_and_encodes_only_edited_descriptions(db, encoded):
+    role_import.import_roles(_write(db / 'v1.csv', 'csv', ROLES[:3]))
+    before = _imported()
+
+    edited = [dict(r) for r in ROLES[:3]]
+    edited[0]['job_description'] = 'Rewritten description.'
+    edited[1]['required_skills'] = 'Go'                # skills-only edit keeps the vector
+    encoded.clear()
+    state = role_import.import_roles(_write(db / 'v2.csv', 'csv', edited))
+
+    assert (state['imported'], state['unchanged']) == (2, 1)
+    assert encoded == ['Rewritten description.']
+    after = _imported()
+    assert {name: r['role_id'] for name, r in after.items()} == \
+           {name: r['role_id'] for name, r in before.items()}
+    assert json.loads(after['Imported Role 1']['required_skills']) == ['Go']
+
+
+def test_bad_rows_are_counted_not_fatal(db, encoded):
+    path = db / 'roles.jsonl'
+    path.write_text('{"role_name": "Imported Role A", "job_description": "Fine."}\n'
+                    'not json\n'
+                    '{"role_name": "Imported Role B"}\n', encoding='utf-8')
+    state = role_import.import_roles(str(path))
+
+    assert (state['status'], state['imported'], state['failed']) == ('done', 1, 2)
+    assert [e['row'] for e in state['errors']] == [2, 3]
+
+
+def test_failure_is_recorded_on_the_import(db, monkeypatch):
+    def broken(batch, batch_size=None):
+        raise RuntimeError('encoder unavailable')
+    monkeypatch.setattr(embeddings, 'encode_batch', broken)
+    path = _write(db / 'roles.csv', 'csv', ROLES[:2])
+
+    with pytest.raises(RuntimeError):
+        role_import.import_roles(path)
+    state = role_import.get_import(role_import.file_sha256(path))
+    assert state['status'] == 'failed'
+    assert state['error'] == 'RuntimeError: encoder unavailable'
@@ -0,0 +1,98 @@
+# backend/tests/test_security.py
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database
+from utils import security
+
+
+def _bearer(token: str) -> dict:
+    return {'Authorization': f'Bearer {token}'}
+
+
+# ---------------------------------------------------------
+# Tokens
+# ---------------------------------------------------------
+def test_token_round_trip():
+    assert security.verify_token(security.issue_token('user-1')) == 'user-1'
+
+
+def test_expired_token_is_rejected():
+    assert security.verify_token(security.issue_token('user-1', ttl=-1)) is None
+
+
+def test_token_signed_with_another_key_is_rejected(monkeypatch):
+    token = security.issue_token('user-1')
+    monkeypatch.setattr(security, 'SECRET_KEY', b'another-key')
+    assert security.verify_token(token) is None
+
+
+@pytest.mark.parametrize('token', ['', 'no-signature', 'é.x', 'x.é', '.', 'a.b.c'])
+def test_malformed_tokens_are_rejected(token):
+    assert security.verify_token(token) is None
+
+
+def test_tampered_payload_is_rejected():
+    payload, _, signature = security.issue_token('user-1').partition('.')
+    forged = security._b64(b'user-2:9999999999')
+    assert security.verify_token(f'{forged}.{signature}') is None
+
+
+# ---------------------------------------------------------
+# Protected endpoints
+# ---------------------------------------------------------
+@pytest.mark.parametrize('headers', [{}, {'Authorization': 'Basic abc'}, _bearer('é.x'), _bearer('x.é')])
+def test_missing_or_invalid_token_is_401(client, headers):
+    r = client.post('/api/analyze-role', json={'user_id': 'u', 'resume_id': 'r', 'role_id': 'x'},
+                    headers=headers)
+    assert r.status_code == 401
+
+
+def test_token_for_another_user_is_403(client, login):
+    alice, bob = login('alice@x'), login('bob@x')
+    r = client.post('/api/analyze-role', headers=bob['headers'],
+                    json={'user_id': alice['user_id'], 'resume_id': 'r', 'role_id': 'x'})
+    assert r.status_code == 403
+
+
+@pytest.mark.parametrize('path', ['/api/analyze-role', '/api/upload-resume', '/api/upload-resumes'])
+def test_user_id_anywhere_in_the_request_must_match_the_token(client, login, path):
+    alice, bob = login('alice@x'), login('bob@x')
+    # query string names the caller, the body names the victim
+    as_json = client.post(f"{path}?user_id={bob['user_id']}", headers=bob['headers'],
+                          json={'user_id': alice['user_id'], 'resume_id': 'r', 'role_id': 'x'})
+    as_form = client.post(f"{path}?user_id={bob['user_id']}", headers=bob['headers'],
+                          data={'user_id': alice['user_id']})
+    assert (as_json.status_code, as_form.status_code) == (403, 403)
+
+
+def test_another_users_resume_is_404(client, login):
+    alice, bob = login('alice@x'), login('bob@x')
+    conn = database.get_db_connection()
+    database.run_write(conn, lambda c: c.execute(
+        "INSERT INTO resumes (resume_id, user_id, file_name, file_path, skills) "
+        "VALUES ('alice-resume', ?, 'cv.pdf', 'uploads/cv.pdf', '[\"Python\"]')", (alice['user_id'],)))
+    role_id = conn.execute('SELECT role_id FROM job_roles LIMIT 1').fetchone()[0]
+    conn.close()
+
+    for path, extra in (('/api/analyze-role', {'role_id': role_id}),
+                        ('/api/analyze-text', {'job_description': 'Python developer'}),
+                        ('/api/rank-roles', {})):
+        r = client.post(path, headers=bob['headers'],
+                        json={'user_id': bob['user_id'], 'resume_id': 'alice-resume', **extra})
+        assert r.status_code == 404, path
+
+
+def test_full_hash_queue_is_503(client, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()                                   # every slot taken
+    monkeypatch.setattr(security, '_executor', ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(security, '_slots', slots)
+    r = client.post('/api/register', json={'name': 'c', 'email': 'c@x', 'password': 'pw'})
+    assert r.status_code == 503
@@ -0,0 +1,41 @@
+# backend/tests/test_startup.py
+import json
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..')
+
+# cold `import app` must stay well below the seconds torch/spaCy take to load
+IMPORT_BUDGET_S = float(os.environ.get('JOBFIT_IMPORT_BUDGET_S', 3.0))
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app
+elapsed = time.perf_counter() - started
+client = app.app.test_client()
+print(json.dumps({
+    "seconds": elapsed,
+    "live": client.get('/api/health/live').status_code,
+    "job_roles": client.get('/api/job-roles').status_code,
+}))
+"""
+
+
+def test_fast_startup_import_budget(tmp_path):
+    env = dict(os.environ,
+               JOBFIT_FAST_STARTUP='1',
+               JOBFIT_DB_PATH=str(tmp_path / 'startup.db'))
+    out = subprocess.run(
+        [sys.executable, '-c', _PROBE, os.path.abspath(BACKEND)],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert out.returncode == 0, out.stderr
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+
+    assert result["live"] == 200
+    assert result["job_roles"] == 200
+    assert result["seconds"] < IMPORT_BUDGET_S, \
+        f"cold import took {result['seconds']:.2f}s (budget {IMPORT_BUDGET_S}s)"
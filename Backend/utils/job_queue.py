@@ -0,0 +1,105 @@
+# backend/utils/job_queue.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import database
+
+JOB_WORKERS     = int(os.environ.get('JOBFIT_JOB_WORKERS', 2))
+JOB_MAX_PENDING = int(os.environ.get('JOBFIT_JOB_MAX_PENDING', 32))
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='resume-job')
+_slots = threading.BoundedSemaphore(JOB_MAX_PENDING)      # queued + running
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _set_status(job_id: str, status: str, **fields) -> None:
+    columns = ', '.join(f'{k} = ?' for k in fields)
+    conn = database.get_db_connection()
+    database.run_write(conn, lambda c: c.execute(
+        f'UPDATE processing_jobs SET status = ?{", " + columns if columns else ""} WHERE job_id = ?',
+        (status, *fields.values(), job_id)
+    ))
+    conn.close()
+
+
+def _run(job_id: str, fn, args: tuple) -> None:
+    try:
+        _set_status(job_id, 'running', started_at=time.time())
+        timings = {}
+        try:
+            result = fn(*args, timings=timings)
+        except Exception as e:
+            _set_status(job_id, 'failed', error=f"{type(e).__name__}: {e}",
+                        stage_timings=json.dumps(timings), finished_at=time.time())
+        else:
+            _set_status(job_id, 'done', resume_id=result.get('resume_id'),
+                        result=json.dumps(result), stage_timings=json.dumps(timings),
+                        finished_at=time.time())
+    finally:
+        _slots.release()
+
+
+def submit(user_id: str, file_name: str, fn, *args) -> str:
+    """
+    Record a `queued` processing job and run `fn(*args, timings=dict)`
+    on the worker pool. Raises QueueFull when JOB_MAX_PENDING jobs are
+    already queued or running.
+    """
+    if not _slots.acquire(blocking=False):
+        raise QueueFull()
+
+    job_id = database.generate_id()
+    try:
+        conn = database.get_db_connection()
+        database.run_write(conn, lambda c: c.execute('''
+            INSERT INTO processing_jobs (job_id, user_id, file_name, status, created_at)
+            VALUES (?, ?, ?, 'queued', ?)
+        ''', (job_id, user_id, file_name, time.time())))
+        conn.close()
+        _executor.submit(_run, job_id, fn, args)
+    except Exception:
+        _slots.release()
+        raise
+    return job_id
+
+
+def fail_interrupted() -> int:
+    """
+    Mark jobs left queued/running by an earlier process as failed: the
+    pool that would have finished them died with it. Call once at startup,
+    before any job is submitted. Returns the number of jobs marked.
+    """
+    conn = database.get_db_connection()
+    cursor = database.run_write(conn, lambda c: c.execute('''
+        UPDATE processing_jobs SET status = 'failed', error = ?, finished_at = ?
+        WHERE status IN ('queued', 'running')
+    ''', ("Interrupted by a server restart; upload the file again", time.time())))
+    conn.close()
+    return cursor.rowcount
+
+
+def get_job(job_id: str, user_id: str):
+    """Return `user_id`'s job as a JSON-ready dict, or None if unknown or not theirs."""
+    conn = database.get_db_connection()
+    job = conn.execute('SELECT * FROM processing_jobs WHERE job_id = ? AND user_id = ?',
+                       (job_id, user_id)).fetchone()
+    conn.close()
+    if not job:
+        return None
+    return {
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "file_name": job['file_name'],
+        "resume_id": job['resume_id'],
+        "result": json.loads(job['result']) if job['result'] else None,
+        "error": job['error'],
+        "stage_timings": json.loads(job['stage_timings']) if job['stage_timings'] else {},
+        "created_at": job['created_at'],
+        "started_at": job['started_at'],
+        "finished_at": job['finished_at']
+    }
@@ -0,0 +1,159 @@
+# backend/utils/metrics.py
+"""
+Request instrumentation: per-stage spans, Server-Timing headers and a
+Prometheus text endpoint at /metrics.
+
+    with metrics.span('nlp'):
+        profile = extract_profile(text)
+
+Inside a request every span is also listed in that response's
+Server-Timing header (durations of repeated stage names are summed).
+Outside a request (job-queue threads, CLIs) spans still feed the
+histograms, labelled endpoint="background".
+"""
+import bisect
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# seconds; roughly x2.5 steps from 1 ms to 30 s
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple, buckets: tuple = BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}                        # label values → [bucket counts, sum, count]
+
+    def observe(self, seconds: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(b), s, c) for labels, (b, s, c) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            base = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels))
+            sep = ',' if base else ''
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{base}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_SECONDS = Histogram('jobfit_request_duration_seconds', 'HTTP request latency.',
+                            ('endpoint', 'method', 'status'))
+STAGE_SECONDS = Histogram('jobfit_stage_duration_seconds', 'Time spent per pipeline stage.',
+                          ('endpoint', 'stage'))
+
+# name → (type, help, fn); fn returns a number, None, or [(labels dict, number), ...]
+_gauges = {}
+
+
+def gauge(name: str, help_text: str, fn, kind: str = 'gauge') -> None:
+    """Register a value read at scrape time."""
+    _gauges[name] = (kind, help_text, fn)
+
+
+# ---------------------------------------------------------
+# Spans
+# ---------------------------------------------------------
+def _endpoint() -> str:
+    from flask import request
+    # the URL rule, not the path, so ids do not explode the label space
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def record(stage: str, seconds: float) -> None:
+    """Record an already-measured stage duration."""
+    flask = sys.modules.get('flask')             # the CLIs never import Flask: no request then
+    if flask is not None and flask.has_request_context():
+        spans = flask.g.setdefault('_spans', {})
+        spans[stage] = spans.get(stage, 0.0) + seconds
+        endpoint = _endpoint()
+    else:
+        endpoint = 'background'
+    STAGE_SECONDS.observe(seconds, endpoint, stage)
+
+
+@contextmanager
+def span(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+# ---------------------------------------------------------
+# Flask wiring (imported lazily, like database.get_db)
+# ---------------------------------------------------------
+def _before() -> None:
+    from flask import g
+    g._request_started = time.perf_counter()
+
+
+def _after(response):
+    from flask import g, request
+    started = g.pop('_request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    if request.path != '/metrics':
+        REQUEST_SECONDS.observe(elapsed, _endpoint(), request.method, response.status_code)
+    spans = g.pop('_spans', {})
+    timing = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in spans.items()]
+    timing.append(f"total;dur={elapsed * 1000:.2f}")
+    response.headers['Server-Timing'] = ', '.join(timing)
+    return response
+
+
+def render() -> str:
+    lines = REQUEST_SECONDS.render() + STAGE_SECONDS.render()
+    for name, (kind, help_text, fn) in sorted(_gauges.items()):
+        try:
+            value = fn()
+        except Exception:                        # a broken collector must not break scraping
+            continue
+        if value is None:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        if isinstance(value, list):
+            for labels, v in value:
+                base = ','.join(f'{k}="{_escape(x)}"' for k, x in labels.items())
+                lines.append(f'{name}{{{base}}} {v}')
+        else:
+            lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _metrics_view():
+    return render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+def init_app(app) -> None:
+    app.before_request(_before)
+    app.after_request(_after)
+    app.add_url_rule('/metrics', 'metrics', _metrics_view, methods=['GET'])
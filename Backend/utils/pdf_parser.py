@@ -1,15 +1,244 @@
-import pdfplumber
+# backend/utils/pdf_parser.py
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF file"""
-    text = ""
+# 'pdfplumber' (default), 'pypdfium2' or 'pdfminer'. A backend that is not
+# installed, or fails on a file, falls back to pdfplumber.
+PDF_BACKEND       = os.environ.get('JOBFIT_PDF_BACKEND', 'pdfplumber')
+PDF_MAX_PAGES     = int(os.environ.get('JOBFIT_PDF_MAX_PAGES', 50))
+PDF_TIME_BUDGET_S = float(os.environ.get('JOBFIT_PDF_TIME_BUDGET_S', 20))
+# PDFs with more pages than this are split by page range across processes
+PDF_PARALLEL_PAGES = int(os.environ.get('JOBFIT_PDF_PARALLEL_PAGES', 20))
+PDF_WORKERS        = int(os.environ.get('JOBFIT_PDF_WORKERS', min(4, os.cpu_count() or 1)))
+# Run each whole extraction on the shared process pool so parsing never
+# holds the server's GIL (the ASGI entry point turns this on)
+PDF_OFFLOAD = os.environ.get('JOBFIT_PDF_OFFLOAD', '').lower() in ('1', 'true', 'yes')
+# how long past its time budget the caller waits for an offloaded file (queueing included)
+PDF_OFFLOAD_GRACE_S = float(os.environ.get('JOBFIT_PDF_OFFLOAD_GRACE_S', 10))
+
+FALLBACK_BACKEND = 'pdfplumber'
+
+
+# ---------------------------------------------------------
+# Per-backend page streaming: yield one page's text at a time and
+# release that page before moving on
+# ---------------------------------------------------------
+def _pages_pdfplumber(file_path: str, start: int, stop: int):
+    import pdfplumber                      # deferred: heavy import
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            try:
+                yield page.extract_text() or ""
+            finally:
+                page.close()               # drop cached layout objects
+
+
+def _pages_pypdfium2(file_path: str, start: int, stop: int):
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(file_path)
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"Error extracting PDF: {e}")
+        for index in range(start, min(stop, len(pdf))):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                yield (textpage.get_text_range() or "").replace('\r\n', '\n')
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _pages_pdfminer(file_path: str, start: int, stop: int):
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+    for layout in extract_pages(file_path, page_numbers=range(start, stop)):
+        yield ''.join(el.get_text() for el in layout if isinstance(el, LTTextContainer))
+
+
+_BACKENDS = {
+    'pdfplumber': _pages_pdfplumber,
+    'pypdfium2': _pages_pypdfium2,
+    'pdfminer': _pages_pdfminer,
+}
+
+
+def _page_count(file_path: str, backend: str) -> int:
+    if backend == 'pypdfium2':
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import resolve1
+    with open(file_path, 'rb') as f:
+        document = PDFDocument(PDFParser(f))
+        return resolve1(document.catalog['Pages'])['Count']
+
+
+def _resolve_backend(name: str) -> str:
+    if name not in _BACKENDS:
+        print(f"Unknown PDF backend {name!r}, using {FALLBACK_BACKEND}")
+        return FALLBACK_BACKEND
+    try:
+        __import__(name)                   # backend names are module names
+    except ImportError:
+        return FALLBACK_BACKEND
+    return name
+
+
+# ---------------------------------------------------------
+# Shared worker pool (page-range splits): PDF_WORKERS long-lived
+# processes started by a forkserver, so they never inherit the server's
+# threads or loaded models. Workers re-import the entry script; see
+# is_pool_worker().
+# ---------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def is_pool_worker() -> bool:
+    """True in a worker process, also while it re-imports the entry script."""
+    return multiprocessing.current_process().name != 'MainProcess'
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """The shared pool, created on first use (spawn where forkserver is unavailable)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                context.set_forkserver_preload([__name__])       # workers start with the parser loaded
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=context)
+        return _pool
+
+
+def _reset_pool(broken) -> None:
+    """Drop a pool whose worker died; the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def pool_map(fn, items) -> list:
+    """list(map(fn, items)) on the shared pool; a crashed worker resets it and raises."""
+    pool = process_pool()
+    try:
+        return list(pool.map(fn, items))
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        raise
+
+
+def _noop() -> None:
+    pass
+
+
+def start_offload_pool() -> ProcessPoolExecutor:
+    """
+    Ensure the shared pool exists and start its workers now, so the first
+    offloaded upload does not pay for them. Returns that pool.
+    """
+    pool = process_pool()
+    for future in [pool.submit(_noop) for _ in range(PDF_WORKERS)]:
+        future.result()
+    return pool
+
+
+def _extract_offloaded(file_path: str, max_pages: int, time_budget: float, backend: str) -> str:
+    pool = process_pool()
+    budget = PDF_TIME_BUDGET_S if time_budget is None else time_budget
+    try:
+        # the worker extracts serially: the pool already spreads files over processes
+        future = pool.submit(extract_text_from_pdf, file_path, max_pages, time_budget, backend, False)
+        return future.result(timeout=budget + PDF_OFFLOAD_GRACE_S)
+    except FutureTimeout:
+        future.cancel()                    # no-op once running: the page loop stops at its deadline
+        print(f"PDF extraction timed out: {file_path}")
+        return ""
+    except (RuntimeError, CancelledError) as e:   # BrokenProcessPool (a worker crashed on some file),
+        print(f"PDF offload failed ({e}): {file_path}")   # or the pool was reset under this call
+        _reset_pool(pool)
         return ""
-    
-    return text.strip()
\ No newline at end of file
+
+
+# ---------------------------------------------------------
+# Public API
+# ---------------------------------------------------------
+def iter_page_texts(file_path: str, start: int = 0, stop: int = None,
+                    backend: str = None, deadline: float = None):
+    """
+    Stream the text of pages [start, stop) one by one. Stops early (without
+    error) once the wall-clock `deadline` (time.time()) has passed.
+    """
+    stop = PDF_MAX_PAGES if stop is None else stop
+    pages = _BACKENDS[_resolve_backend(backend or PDF_BACKEND)](file_path, start, stop)
+    try:
+        for text in pages:
+            yield text
+            if deadline is not None and time.time() > deadline:
+                print(f"PDF time budget exhausted: {file_path}")
+                return
+    finally:
+        pages.close()
+
+
+def _extract_range(args) -> list:
+    file_path, start, stop, backend, deadline = args
+    return list(iter_page_texts(file_path, start, stop, backend, deadline))
+
+
+def extract_text_from_pdf(file_path: str, max_pages: int = None, time_budget: float = None,
+                          backend: str = None, parallel: bool = True) -> str:
+    """
+    Extract text from PDF file.
+
+    At most `max_pages` pages are read within `time_budget` seconds; long
+    documents are split into page ranges across worker processes when
+    `parallel` is set (with PDF_OFFLOAD the whole file is handed to the
+    shared pool instead). Returns "" if the file cannot be read.
+    """
+    if PDF_OFFLOAD and parallel:
+        return _extract_offloaded(file_path, max_pages, time_budget, backend)
+
+    max_pages   = PDF_MAX_PAGES if max_pages is None else max_pages
+    time_budget = PDF_TIME_BUDGET_S if time_budget is None else time_budget
+    deadline    = time.time() + time_budget
+    backend     = _resolve_backend(backend or PDF_BACKEND)
+
+    try:
+        pages = _extract(file_path, max_pages, deadline, backend, parallel)
+    except Exception as e:
+        if backend == FALLBACK_BACKEND:
+            print(f"Error extracting PDF: {e}")
+            return ""
+        print(f"{backend} failed ({e}), retrying with {FALLBACK_BACKEND}")
+        try:
+            pages = _extract(file_path, max_pages, deadline, FALLBACK_BACKEND, parallel)
+        except Exception as e:
+            print(f"Error extracting PDF: {e}")
+            return ""
+
+    return "\n".join(pages).strip()
+
+
+def _extract(file_path: str, max_pages: int, deadline: float, backend: str, parallel: bool) -> list:
+    if parallel and PDF_WORKERS > 1:
+        count = min(_page_count(file_path, backend), max_pages)
+        if count > PDF_PARALLEL_PAGES:
+            step = -(-count // PDF_WORKERS)                  # ceil division
+            ranges = [(file_path, s, min(s + step, count), backend, deadline)
+                      for s in range(0, count, step)]
+            return [text for chunk in pool_map(_extract_range, ranges) for text in chunk]
+    return list(iter_page_texts(file_path, 0, max_pages, backend, deadline))
@@ -0,0 +1,185 @@
+# backend/utils/reembed.py
+"""
+Background re-embedding after an embedding-model change.
+
+Walks job_roles, then resumes, in rowid order and re-encodes every row
+whose vector is missing or tagged with another model, REEMBED_BATCH rows
+per encode call. A batch's UPDATE and its `reembed_progress` checkpoint
+commit together, so a restarted job continues after the last batch.
+Rows it has not reached yet are encoded on the fly when scored (see
+routes.analysis); the embedding store gets each resume as it lands.
+
+One process runs the job at a time (an flock beside the database);
+REEMBED_PAUSE_S between batches leaves the CPU to requests.
+"""
+import os
+import threading
+import time
+import traceback
+import database
+from models import embeddings
+from models.embedding_store import store_resumes
+from utils import metrics
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+REEMBED_ENABLED = os.environ.get('JOBFIT_REEMBED', '1') != '0'
+REEMBED_BATCH   = int(os.environ.get('JOBFIT_REEMBED_BATCH', 64))
+REEMBED_PAUSE_S = float(os.environ.get('JOBFIT_REEMBED_PAUSE_S', 0.05))
+LOCK_PATH = os.path.join(os.path.dirname(database.DB_PATH), 'reembed.lock')
+
+# rows still to do, per table (? = current model)
+STALE = {
+    'job_roles': 'jd_embedding IS NULL OR jd_model IS NOT ?',
+    'resumes':   'embedding_model IS NOT ?',
+}
+
+# (vector, chunk blob, jd hash, id, model); skips rows another writer already updated
+UPDATE = {
+    'job_roles': 'UPDATE job_roles SET jd_embedding = ?1, jd_hash = ?3, jd_model = ?5 '
+                 'WHERE role_id = ?4 AND (jd_model IS NOT ?5 OR jd_embedding IS NULL)',
+    'resumes':   'UPDATE resumes SET resume_embedding = ?1, chunk_embeddings = ?2, embedding_model = ?5 '
+                 'WHERE resume_id = ?4 AND embedding_model IS NOT ?5',
+}
+
+rows_reembedded = {table: 0 for table in STALE}     # by this process
+_thread = None
+
+
+def _checkpoint(conn, table: str):
+    row = conn.execute('SELECT * FROM reembed_progress WHERE model = ? AND table_name = ?',
+                       (embeddings.MODEL_NAME, table)).fetchone()
+    return dict(row) if row else {"last_rowid": 0, "rows_done": 0, "status": "pending"}
+
+
+def _save(c, table: str, last_rowid: int, rows_done: int, status: str) -> None:
+    c.execute('''
+        INSERT OR REPLACE INTO reembed_progress (model, table_name, last_rowid, rows_done, status, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (embeddings.MODEL_NAME, table, last_rowid, rows_done, status, time.time()))
+
+
+def _batch(conn, table: str, after: int, size: int) -> list:
+    columns = 'role_id AS id, job_description AS text' if table == 'job_roles' \
+        else 'resume_id AS id, parsed_text AS text'
+    return conn.execute(
+        f'SELECT rowid, {columns} FROM {table} WHERE rowid > ? AND ({STALE[table]}) '
+        'ORDER BY rowid LIMIT ?', (after, embeddings.MODEL_NAME, size)).fetchall()
+
+
+def _encode_resumes(rows):
+    texts = [r['text'] or '' for r in rows]
+    if embeddings.CHUNK_MODE != 'off':
+        vectors, chunk_matrices = embeddings.encode_with_chunks(texts)
+        return vectors, [embeddings.chunks_to_bytes(m) for m in chunk_matrices]
+    return embeddings.encode_batch(texts), [None] * len(rows)
+
+
+def run_table(table: str, batch_size: int = REEMBED_BATCH, progress=None) -> int:
+    """Re-embed one table from its checkpoint to the end. Returns rows updated."""
+    conn = database.get_db_connection()
+    try:
+        state = _checkpoint(conn, table)
+        after = state['last_rowid'] if state['status'] == 'running' else 0
+        done = state['rows_done'] if state['status'] == 'running' else 0
+        updated = 0
+        while True:
+            rows = _batch(conn, table, after, batch_size)
+            if not rows:
+                break
+            last = rows[-1]['rowid']
+            if table == 'job_roles':
+                vectors = embeddings.encode_batch([r['text'] for r in rows])
+                params = [(vec.tobytes(), None, database.content_hash(r['text']), r['id'])
+                          for r, vec in zip(rows, vectors)]
+            else:
+                vectors, chunk_blobs = _encode_resumes(rows)
+                params = [(vec.tobytes(), blob, None, r['id'])
+                          for r, vec, blob in zip(rows, vectors, chunk_blobs)]
+
+            def write(c):
+                c.executemany(UPDATE[table], [(*p, embeddings.MODEL_NAME) for p in params])
+                _save(c, table, last, done + len(rows), 'running')
+            database.run_write(conn, write)
+            if table == 'resumes':
+                store_resumes([r['id'] for r in rows], vectors)
+            after, done, updated = last, done + len(rows), updated + len(rows)
+            rows_reembedded[table] += len(rows)
+            if progress:
+                progress(table, done)
+            if REEMBED_PAUSE_S:
+                time.sleep(REEMBED_PAUSE_S)
+        database.run_write(conn, lambda c: _save(c, table, after, done, 'done'))
+        return updated
+    finally:
+        conn.close()
+
+
+def pending(conn=None) -> dict:
+    """Rows per table not yet encoded by the current model."""
+    own = conn is None
+    conn = conn or database.get_db_connection()
+    try:
+        return {table: conn.execute(f'SELECT COUNT(*) FROM {table} WHERE {where}',
+                                    (embeddings.MODEL_NAME,)).fetchone()[0]
+                for table, where in STALE.items()}
+    finally:
+        if own:
+            conn.close()
+
+
+def run(batch_size: int = REEMBED_BATCH, progress=None):
+    """
+    Re-embed every stale row (roles first: they are few and every score
+    needs one). Returns {table: rows updated}, or None when another
+    process holds the job lock.
+    """
+    os.makedirs(os.path.dirname(LOCK_PATH), exist_ok=True)
+    with open(LOCK_PATH, 'a') as lock:
+        if fcntl:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return None
+        return {table: run_table(table, batch_size, progress) for table in STALE}
+
+
+def _run_logged() -> None:
+    try:
+        result = run()
+        if result is not None:
+            print("Re-embedding done:", result)
+    except Exception:
+        traceback.print_exc()
+
+
+def start_if_needed() -> bool:
+    """Start the job on a daemon thread when any row is stale. True if started."""
+    global _thread
+    if not REEMBED_ENABLED or (_thread is not None and _thread.is_alive()):
+        return False
+    if not any(pending().values()):
+        return False
+    _thread = threading.Thread(target=_run_logged, name='reembed', daemon=True)
+    _thread.start()
+    return True
+
+
+def status() -> dict:
+    conn = database.get_db_connection()
+    try:
+        return {
+            "model": embeddings.MODEL_NAME,
+            "running": _thread is not None and _thread.is_alive(),
+            "pending": pending(conn),
+            "checkpoints": {table: _checkpoint(conn, table) for table in STALE},
+        }
+    finally:
+        conn.close()
+
+
+metrics.gauge('jobfit_reembed_rows_total', 'Rows re-encoded for a new embedding model by this process.',
+              lambda: [({"table": t}, n) for t, n in rows_reembedded.items()], 'counter')
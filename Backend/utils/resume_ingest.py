@@ -0,0 +1,128 @@
+# backend/utils/resume_ingest.py
+import json
+import os
+import database
+from utils import uploads
+from utils.pdf_parser import extract_text_from_pdf, pool_map
+from models import nlp_processor
+from models.nlp_processor import extract_profile, extract_profiles
+
+INGEST_WORKERS = int(os.environ.get('JOBFIT_INGEST_WORKERS', os.cpu_count() or 1))
+
+
+def _parse_resume(file_path: str) -> dict:
+    """
+    Worker: PDF → text → skills / education / experience.
+    Runs in a child process, so it must not touch the embedding model.
+    In spaCy mode only the text is extracted here; the parent streams
+    all texts through nlp.pipe instead of loading spaCy per worker.
+    """
+    try:
+        text = extract_text_from_pdf(file_path, parallel=False)   # already one file per process
+        if not text:
+            return {"error": "Could not extract text from PDF"}
+        if nlp_processor.NLP_MODE == 'spacy':
+            return {"text": text}
+        return {"text": text, **extract_profile(text)}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def ingest_resumes(user_id: str, files: list, workers: int = INGEST_WORKERS) -> list:
+    """
+    Process many already-saved resumes in one go.
+
+    `files` is a list of (file_name, file_path). Files whose bytes were
+    processed before (or appear earlier in the batch) reuse that result;
+    the rest are parsed in a process pool, encoded in batched forward
+    passes and inserted in a single transaction. Returns one result dict
+    per input file, in input order, with either a resume_id or an error.
+    """
+    from models import embeddings                   # parent process only
+    from models.embedding_store import store_resumes
+
+    if not files:
+        return []
+
+    results = [None] * len(files)
+    hashes = [uploads.file_sha256(path) for _, path in files]
+    first_seen = {}                                  # hash → index parsed
+    todo, duplicates = [], []
+
+    conn = database.get_db_connection()
+    for i, ((file_name, file_path), content_hash) in enumerate(zip(files, hashes)):
+        if content_hash in first_seen:
+            duplicates.append(i)
+            continue
+        processed = uploads.find_processed(conn, content_hash, user_id)
+        if processed:
+            results[i] = {"file_name": file_name, "status": "ok",
+                          **uploads.reuse_processed(conn, processed, user_id, file_name, file_path)}
+        else:
+            todo.append(i)
+        first_seen[content_hash] = i
+    conn.close()
+
+    paths = [files[i][1] for i in todo]
+    if workers > 1 and len(paths) > 1:
+        parsed = dict(zip(todo, pool_map(_parse_resume, paths)))   # shared PDF worker pool
+    else:
+        parsed = {i: _parse_resume(path) for i, path in zip(todo, paths)}
+
+    ok = [i for i in todo if "error" not in parsed[i]]
+    if nlp_processor.NLP_MODE == 'spacy':
+        profiles = extract_profiles([parsed[i]["text"] for i in ok])
+        for i, profile in zip(ok, profiles):
+            parsed[i].update(profile)
+    texts = [parsed[i]["text"] for i in ok]
+    if embeddings.CHUNK_MODE != 'off':
+        vectors, chunk_matrices = embeddings.encode_with_chunks(texts)
+        chunk_blobs = [embeddings.chunks_to_bytes(m) for m in chunk_matrices]
+    else:
+        vectors, chunk_blobs = embeddings.encode_batch(texts), [None] * len(ok)
+
+    rows = []
+    for i, vec, chunk_blob in zip(ok, vectors, chunk_blobs):
+        file_name, file_path = files[i]
+        p = parsed[i]
+        resume_id = database.generate_id()
+        rows.append((
+            resume_id, user_id, file_name, file_path, p["text"],
+            json.dumps(p["skills"]), json.dumps(p["education"]), json.dumps(p["experience"]),
+            vec.tobytes(), hashes[i], chunk_blob, embeddings.MODEL_NAME
+        ))
+        results[i] = {
+            "file_name": file_name,
+            "status": "ok",
+            "resume_id": resume_id,
+            "skills": p["skills"],
+            "skill_count": len(p["skills"]),
+            "cache_hit": False
+        }
+
+    for i in todo:
+        if "error" in parsed[i]:
+            results[i] = {"file_name": files[i][0], "status": "error", "error": parsed[i]["error"]}
+
+    if rows:
+        conn = database.get_db_connection()
+        database.run_write(conn, lambda c: c.executemany('''
+            INSERT INTO resumes (resume_id, user_id, file_name, file_path, parsed_text,
+                               skills, education, experience, resume_embedding, content_hash,
+                               chunk_embeddings, embedding_model)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows))                                  # one transaction
+        conn.close()
+        store_resumes([r[0] for r in rows], vectors)
+
+    # repeats inside this batch share the first copy's outcome
+    for i in duplicates:
+        original = results[first_seen[hashes[i]]]
+        if original["status"] == "ok":
+            if os.path.abspath(files[i][1]) != os.path.abspath(files[first_seen[hashes[i]]][1]):
+                os.remove(files[i][1])
+            results[i] = {**original, "file_name": files[i][0], "cache_hit": True}
+        else:
+            results[i] = {**original, "file_name": files[i][0]}
+
+    return results
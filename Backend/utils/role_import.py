@@ -0,0 +1,303 @@
+# backend/utils/role_import.py
+"""
+Streaming job-role import from CSV or JSONL.
+
+Records are read one at a time and handled in chunks of
+IMPORT_CHUNK_ROWS: a missing required_skills column is filled in by the
+skill matcher, new or edited descriptions are encoded in one batch, and
+the chunk is upserted by role_name with executemany. The same
+transaction advances the file's `role_imports` row (byte offset plus
+counters), so importing the same file again after an interruption
+resumes after the last committed chunk.
+"""
+import csv
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import database
+from models.nlp_processor import extract_skills
+from utils.uploads import file_sha256
+
+IMPORT_CHUNK_ROWS = int(os.environ.get('JOBFIT_IMPORT_CHUNK_ROWS', 256))
+IMPORT_MAX_BYTES  = int(os.environ.get('JOBFIT_IMPORT_MAX_BYTES', 256 * 1024 * 1024))
+MAX_ERRORS_KEPT   = 20
+FORMATS = ('csv', 'jsonl')
+
+# accepted column / key names, first match wins
+FIELD_ALIASES = {
+    'role_name':       ('role_name', 'title', 'job_title', 'name'),
+    'job_description': ('job_description', 'description', 'jd'),
+    'required_skills': ('required_skills', 'skills'),
+    'industry':        ('industry', 'sector'),
+}
+
+
+class ImportRunning(Exception):
+    """This file is already being imported."""
+
+
+def detect_format(file_name: str):
+    ext = os.path.splitext(file_name)[1].lower().lstrip('.')
+    return {'csv': 'csv', 'jsonl': 'jsonl', 'ndjson': 'jsonl'}.get(ext)
+
+
+# ---------------------------------------------------------
+# Reading: (record, offset of the next record) pairs
+# ---------------------------------------------------------
+def _lines(f):
+    for raw in iter(f.readline, b''):
+        line = raw.decode('utf-8')
+        yield line.lstrip('\ufeff') if f.tell() == len(raw) else line
+
+
+def iter_records(path: str, fmt: str, offset: int = 0):
+    """
+    Yield (record, next_offset) from `offset` on. CSV records are dicts
+    keyed by the header row; JSONL records are the raw lines. The file is
+    read line by line (csv pulls only the lines a record spans), so
+    f.tell() after each record is a valid place to resume.
+    """
+    with open(path, 'rb') as f:
+        lines = _lines(f)
+        if fmt == 'csv':
+            reader = csv.reader(lines)
+            header = [h.strip().lower() for h in next(reader, [])]
+            if offset > f.tell():
+                f.seek(offset)
+            for values in reader:
+                if values:
+                    yield dict(zip(header, values)), f.tell()
+        else:
+            f.seek(offset)
+            for line in lines:
+                if line.strip():
+                    yield line, f.tell()
+
+
+def _field(record: dict, name: str):
+    for key in FIELD_ALIASES[name]:
+        value = record.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _skill_list(value) -> list:
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            value = json.loads(value)
+        else:
+            sep = next((s for s in ';|' if s in value), ',')
+            value = value.split(sep)
+    if not isinstance(value, list):
+        raise ValueError("required_skills must be a list or a delimited string")
+    seen = set()
+    return [s for s in (str(v).strip() for v in value)
+            if s and not (s.lower() in seen or seen.add(s.lower()))]
+
+
+def normalise(record, fmt: str) -> dict:
+    """One record → job_roles fields. Raises ValueError for unusable rows."""
+    if fmt == 'jsonl':
+        record = json.loads(record)
+        if not isinstance(record, dict):
+            raise ValueError("expected a JSON object")
+    record = {str(k).strip().lower(): v for k, v in record.items()}
+
+    role_name, description = _field(record, 'role_name'), _field(record, 'job_description')
+    if not isinstance(role_name, str) or not role_name.strip():
+        raise ValueError("missing role_name")
+    if not isinstance(description, str) or not description.strip():
+        raise ValueError("missing job_description")
+    description = description.strip()
+
+    skills = _field(record, 'required_skills')
+    skills = _skill_list(skills) if skills is not None else []
+    industry = _field(record, 'industry')
+    return {
+        'role_name': role_name.strip(),
+        'job_description': description,
+        'required_skills': skills or extract_skills(description, None),
+        'industry': str(industry).strip() if industry is not None else None,
+    }
+
+
+# ---------------------------------------------------------
+# Writing
+# ---------------------------------------------------------
+def _write_chunk(conn, state: dict, chunk: dict, offset: int, status: str) -> None:
+    """Encode what changed in `chunk` (role_name → fields), upsert it and checkpoint."""
+    from models import embeddings
+
+    names = list(chunk)
+    existing = {r['role_name']: r for r in conn.execute(
+        f'SELECT role_name, required_skills, industry, jd_hash, jd_model FROM job_roles '
+        f'WHERE role_name IN ({",".join("?" * len(names))})', names)} if names else {}
+
+    rows, to_encode = [], []
+    for name, role in chunk.items():
+        digest = database.content_hash(role['job_description'])
+        skills = json.dumps(role['required_skills'])
+        old = existing.get(name)
+        same_vector = old is not None and old['jd_hash'] == digest and old['jd_model'] == embeddings.MODEL_NAME
+        if same_vector and old['required_skills'] == skills and old['industry'] == role['industry']:
+            state['unchanged'] += 1
+            continue
+        if not same_vector:
+            to_encode.append(len(rows))
+        rows.append([database.generate_id(), name, role['job_description'], skills,
+                     role['industry'], None, digest, embeddings.MODEL_NAME])
+
+    if to_encode:
+        vectors = embeddings.encode_batch([rows[i][2] for i in to_encode])
+        for i, vec in zip(to_encode, vectors):
+            rows[i][5] = vec.tobytes()
+    state['imported'] += len(rows)
+    state.update(byte_offset=offset, status=status, updated_at=time.time())
+    if status == 'done':
+        state['finished_at'] = state['updated_at']
+
+    def write(c):
+        if rows:
+            c.executemany('''
+                INSERT INTO job_roles (role_id, role_name, job_description, required_skills,
+                                       industry, jd_embedding, jd_hash, jd_model)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(role_name) DO UPDATE SET
+                    job_description = excluded.job_description,
+                    required_skills = excluded.required_skills,
+                    industry        = excluded.industry,
+                    jd_embedding    = COALESCE(excluded.jd_embedding, job_roles.jd_embedding),
+                    jd_hash         = excluded.jd_hash,
+                    jd_model        = excluded.jd_model
+            ''', rows)
+        _save_state(c, state)
+
+    database.run_write(conn, write)
+
+
+def _save_state(conn, state: dict) -> None:
+    conn.execute('''
+        UPDATE role_imports SET status = ?, byte_offset = ?, rows_read = ?, imported = ?,
+               unchanged = ?, failed = ?, errors = ?, updated_at = ?, finished_at = ?
+        WHERE import_id = ?
+    ''', (state['status'], state['byte_offset'], state['rows_read'], state['imported'],
+          state['unchanged'], state['failed'], json.dumps(state['errors']),
+          state['updated_at'], state['finished_at'], state['import_id']))
+
+
+def _row_to_state(row) -> dict:
+    state = dict(row)
+    state['errors'] = json.loads(state['errors'] or '[]')
+    return state
+
+
+def _begin(conn, import_id: str, source: str, fmt: str, size: int, restart: bool) -> dict:
+    row = conn.execute('SELECT * FROM role_imports WHERE import_id = ?', (import_id,)).fetchone()
+    now = time.time()
+    if row is None or restart:
+        database.run_write(conn, lambda c: c.execute('''
+            INSERT OR REPLACE INTO role_imports (import_id, source, format, status, size_bytes,
+                                                 errors, started_at, updated_at)
+            VALUES (?, ?, ?, 'running', ?, '[]', ?, ?)
+        ''', (import_id, source, fmt, size, now, now)))
+    elif row['status'] != 'done':
+        database.run_write(conn, lambda c: c.execute(
+            "UPDATE role_imports SET status = 'running', error = NULL, updated_at = ? WHERE import_id = ?",
+            (now, import_id)))
+    return _row_to_state(conn.execute(
+        'SELECT * FROM role_imports WHERE import_id = ?', (import_id,)).fetchone())
+
+
+def import_roles(path: str, fmt: str = None, source: str = None, import_id: str = None,
+                 chunk_rows: int = IMPORT_CHUNK_ROWS, restart: bool = False, progress=None) -> dict:
+    """
+    Import (or resume importing) one CSV/JSONL file into job_roles.
+
+    The import is identified by the file's SHA-256, so the same content
+    under any name resumes from its checkpoint; restart=True starts over.
+    `progress(state)` is called after every committed chunk. Returns the
+    final role_imports state.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format for {path!r} (expected .csv or .jsonl)")
+    import_id = import_id or file_sha256(path)
+
+    conn = database.get_db_connection()
+    try:
+        state = _begin(conn, import_id, source or os.path.basename(path), fmt,
+                       os.path.getsize(path), restart)
+        if state['status'] == 'done':
+            return state
+        chunk, offset = {}, state['byte_offset']
+        try:
+            for record, offset in iter_records(path, fmt, state['byte_offset']):
+                state['rows_read'] += 1
+                try:
+                    role = normalise(record, fmt)
+                except ValueError as e:
+                    state['failed'] += 1
+                    if len(state['errors']) < MAX_ERRORS_KEPT:
+                        state['errors'].append({"row": state['rows_read'], "error": str(e)})
+                    continue
+                chunk[role['role_name']] = role       # later duplicates win
+                if len(chunk) >= chunk_rows:
+                    _write_chunk(conn, state, chunk, offset, 'running')
+                    chunk = {}
+                    if progress:
+                        progress(state)
+            _write_chunk(conn, state, chunk, offset, 'done')
+        except BaseException as e:
+            status = 'interrupted' if isinstance(e, KeyboardInterrupt) else 'failed'
+            error = None if status == 'interrupted' else f"{type(e).__name__}: {e}"
+            database.run_write(conn, lambda c: c.execute(
+                'UPDATE role_imports SET status = ?, error = ?, updated_at = ? WHERE import_id = ?',
+                (status, error, time.time(), import_id)))
+            raise
+        if progress:
+            progress(state)
+        return state
+    finally:
+        conn.close()
+
+
+def get_import(import_id: str):
+    """The role_imports row as a JSON-ready dict, or None."""
+    conn = database.get_db_connection()
+    row = conn.execute('SELECT * FROM role_imports WHERE import_id = ?', (import_id,)).fetchone()
+    conn.close()
+    return _row_to_state(row) if row else None
+
+
+# ---------------------------------------------------------
+# Background imports (admin endpoint): one at a time
+# ---------------------------------------------------------
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='role-import')
+_active = set()
+_active_lock = threading.Lock()
+
+
+def _run(path: str, fmt: str, source: str, import_id: str, restart: bool) -> None:
+    try:
+        state = import_roles(path, fmt, source, import_id, restart=restart)
+        if state['status'] == 'done':
+            os.remove(path)              # kept otherwise, so a retry can resume
+    except Exception:                    # recorded on the role_imports row as well
+        traceback.print_exc()
+    finally:
+        with _active_lock:
+            _active.discard(import_id)
+
+
+def submit(path: str, fmt: str, source: str, import_id: str, restart: bool = False) -> None:
+    """Queue an import of the saved file `path`. Raises ImportRunning if it is already queued."""
+    with _active_lock:
+        if import_id in _active:
+            raise ImportRunning()
+        _active.add(import_id)
+    _executor.submit(_run, path, fmt, source, import_id, restart)
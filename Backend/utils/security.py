@@ -1,8 +1,185 @@
+# backend/utils/security.py
+"""
+Password hashing and session tokens.
+
+bcrypt runs on a small, bounded thread pool (bcrypt releases the GIL):
+a login burst occupies at most HASH_WORKERS cores, and callers beyond
+HASH_QUEUE_MAX waiting hashes get HashQueueFull (→ 503) instead of
+piling up. HASH_WORKERS=0 hashes inline.
+
+Tokens are "<payload>.<signature>" in base64url: payload is
+"user_id:expiry", the signature is HMAC-SHA256 with SECRET_KEY, so
+verifying one needs no database lookup.
+"""
+import base64
+import functools
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
+from flask import g, jsonify, request
+
+BCRYPT_ROUNDS  = int(os.environ.get('JOBFIT_BCRYPT_ROUNDS', 12))
+HASH_WORKERS   = int(os.environ.get('JOBFIT_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+HASH_QUEUE_MAX = int(os.environ.get('JOBFIT_HASH_QUEUE_MAX', 64))
+TOKEN_TTL_S    = int(os.environ.get('JOBFIT_TOKEN_TTL_S', 12 * 3600))
+ADMIN_TOKEN    = os.environ.get('JOBFIT_ADMIN_TOKEN', '')
+SECRET_KEY_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'secret_key')
+
+
+class HashQueueFull(Exception):
+    """Too many password hashes are already queued."""
+
+
+# ---------------------------------------------------------
+# Signing key: JOBFIT_SECRET_KEY, else one generated on first start
+# and kept in data/secret_key so every worker and restart shares it
+# ---------------------------------------------------------
+def _load_secret() -> bytes:
+    configured = os.environ.get('JOBFIT_SECRET_KEY')
+    if configured:
+        return configured.encode('utf-8')
+    os.makedirs(os.path.dirname(SECRET_KEY_FILE), exist_ok=True)
+    try:
+        fd = os.open(SECRET_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(SECRET_KEY_FILE, 'rb') as f:
+            return f.read().strip()
+    with os.fdopen(fd, 'wb') as f:
+        key = secrets.token_hex(32).encode('ascii')
+        f.write(key)
+    return key
+
+
+SECRET_KEY = _load_secret()
+
+# ---------------------------------------------------------
+# Bounded hashing executor
+# ---------------------------------------------------------
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='bcrypt') \
+    if HASH_WORKERS > 0 else None
+_slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE_MAX) if HASH_WORKERS > 0 else None
+
+
+def _offload(fn, *args):
+    if _executor is None:
+        return fn(*args)
+    if not _slots.acquire(blocking=False):
+        raise HashQueueFull()
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future.result()
+
+
+def _hash(password: bytes, rounds: int) -> str:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
 
 def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    return _offload(_hash, password.encode('utf-8'), BCRYPT_ROUNDS)
+
 
 def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
\ No newline at end of file
+    return _offload(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True if `hashed` was made with a different work factor ("$2b$<rounds>$...")."""
+    try:
+        return int(hashed.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+_dummy_hash = None
+
+
+def burn_verify(password: str) -> None:
+    """Spend one verification's time when the email is unknown, so timing does not reveal it."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_hex(8))
+    verify_password(password, _dummy_hash)
+
+
+# ---------------------------------------------------------
+# Session tokens
+# ---------------------------------------------------------
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64(hmac.new(SECRET_KEY, payload.encode('ascii'), hashlib.sha256).digest())
+
+
+def issue_token(user_id: str, ttl: int = TOKEN_TTL_S) -> str:
+    payload = _b64(f"{user_id}:{int(time.time()) + ttl}".encode('utf-8'))
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_token(token: str):
+    """user_id for a valid, unexpired token, else None."""
+    if not token or not token.isascii():              # headers may carry any latin-1 text
+        return None
+    payload, _, signature = token.partition('.')
+    if not signature or not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        user_id, _, expiry = _unb64(payload).decode('utf-8').rpartition(':')
+        if int(expiry) < time.time():
+            return None
+    except ValueError:
+        return None
+    return user_id or None
+
+
+def require_auth(view):
+    """
+    Reject requests without a valid `Authorization: Bearer <token>` (401),
+    or where any user_id (query string, form or JSON body) names someone
+    else (403). Sets g.user_id, the only user the view may act for.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        user_id = verify_token(token) if scheme.lower() == 'bearer' else None
+        if user_id is None:
+            return jsonify({"error": "Authentication required"}), 401
+        body = request.get_json(silent=True)
+        claimed = request.args.getlist('user_id') + request.form.getlist('user_id')
+        if isinstance(body, dict):
+            claimed.append(body.get('user_id'))
+        if any(c and c != user_id for c in claimed):
+            return jsonify({"error": "Token does not match user_id"}), 403
+        g.user_id = user_id
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def require_admin(view):
+    """
+    Admin endpoints: `Authorization: Bearer <JOBFIT_ADMIN_TOKEN>`. Without
+    a configured admin token they are disabled (403).
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Admin API disabled"}), 403
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+            return jsonify({"error": "Admin token required"}), 401
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,99 @@
+# backend/utils/uploads.py
+import hashlib
+import json
+import os
+import database
+from models.embeddings import get_embedding_from_bytes, MODEL_NAME
+from models.embedding_store import store_resumes
+
+CHUNK_SIZE = 64 * 1024
+
+
+def save_and_hash(file, filepath: str) -> str:
+    """Write an uploaded FileStorage to `filepath`, hashing it on the way."""
+    digest = hashlib.sha256()
+    with open(filepath, 'wb') as out:
+        for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backfill_content_hashes(batch_size: int = 256) -> int:
+    """
+    Hash the stored file of every resume saved before content_hash
+    existed, so re-uploads of those files are recognised too. Rows whose
+    file is gone stay NULL. Returns the number of rows filled in.
+    """
+    conn = database.get_db_connection()
+    try:
+        rows = conn.execute('SELECT resume_id, file_path FROM resumes '
+                            'WHERE content_hash IS NULL').fetchall()
+        filled = []
+        for r in rows:
+            try:
+                # paths saved on Windows use backslashes
+                filled.append((file_sha256(r['file_path'].replace('\\', os.sep)), r['resume_id']))
+            except OSError:
+                continue
+        for start in range(0, len(filled), batch_size):
+            batch = filled[start:start + batch_size]
+            database.run_write(conn, lambda c: c.executemany(
+                'UPDATE resumes SET content_hash = ? WHERE resume_id = ? AND content_hash IS NULL',
+                batch))
+        return len(filled)
+    finally:
+        conn.close()
+
+
+def find_processed(conn, content_hash: str, user_id: str):
+    """Most recent resume with these exact bytes, preferring the user's own."""
+    return conn.execute('''
+        SELECT * FROM resumes WHERE content_hash = ?
+        ORDER BY (user_id = ?) DESC, created_at DESC
+        LIMIT 1
+    ''', (content_hash, user_id)).fetchone()
+
+
+def reuse_processed(conn, row, user_id: str, filename: str, filepath: str) -> dict:
+    """
+    Answer an upload from an already-processed resume `row`: the user's
+    own row is returned as is (the new copy of the file is dropped),
+    another user's parse and embedding are copied into a new row.
+    """
+    if row['user_id'] == user_id:
+        resume_id = row['resume_id']
+        if os.path.abspath(row['file_path']) != os.path.abspath(filepath):
+            os.remove(filepath)
+    else:
+        resume_id = database.generate_id()
+        database.run_write(conn, lambda c: c.execute('''
+            INSERT INTO resumes (resume_id, user_id, file_name, file_path, parsed_text,
+                               skills, education, experience, resume_embedding, content_hash,
+                               chunk_embeddings, embedding_model)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            resume_id, user_id, filename, filepath, row['parsed_text'],
+            row['skills'], row['education'], row['experience'],
+            row['resume_embedding'], row['content_hash'], row['chunk_embeddings'],
+            row['embedding_model']
+        )))
+        if row['embedding_model'] == MODEL_NAME:      # else added once re-embedded
+            store_resumes([resume_id], get_embedding_from_bytes(row['resume_embedding'])[None, :])
+
+    skills = json.loads(row['skills'])
+    return {
+        "message": "Resume already processed",
+        "resume_id": resume_id,
+        "skills": skills,
+        "skill_count": len(skills),
+        "cache_hit": True
+    }
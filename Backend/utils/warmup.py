@@ -0,0 +1,60 @@
+# backend/utils/warmup.py
+import threading
+import time
+import traceback
+import database
+from models import embeddings
+from models.embedding_store import embedding_store
+from models.nlp_processor import get_nlp_model, NLP_MODE
+from utils import metrics, reembed, uploads
+
+# readiness state read by /api/health/ready
+state = {"status": "starting", "error": None, "started_at": None, "seconds": None}
+_ready = threading.Event()
+
+
+def _warm(background: bool = True) -> None:
+    state["started_at"] = time.time()
+    started = time.perf_counter()
+    try:
+        print("Embedding model:", embeddings.ensure_ready())   # sidecar or local Sentence-BERT
+        if NLP_MODE == 'spacy':
+            get_nlp_model()                          # spaCy (optional)
+        # encode new / edited job descriptions in one batch before serving
+        print("Warmed job-role embeddings:", database.warm_role_embeddings())
+        # pick up resumes written while the store was unavailable
+        print("Embedding store sync:", embedding_store.sync())
+        # uploads from before duplicate detection: hash the files still on disk
+        print("Backfilled resume hashes:", uploads.backfill_content_hashes())
+        # vectors from an earlier embedding model: re-encode in the background
+        if reembed.start_if_needed():
+            print("Re-embedding for", embeddings.MODEL_NAME, reembed.pending())
+    except Exception as e:
+        state.update(status="failed", error=f"{type(e).__name__}: {e}")
+        if not background:
+            raise                                    # blocking startup: refuse to serve without models
+        traceback.print_exc()
+        return
+    state.update(status="ready", seconds=round(time.perf_counter() - started, 3))
+    _ready.set()
+    print("Models loaded successfully!")
+
+
+metrics.gauge('jobfit_warmup_seconds', 'Startup model and cache warm-up time (unset until ready).',
+              lambda: state["seconds"])
+
+
+def start(background: bool) -> None:
+    """
+    Load models now, or on a daemon thread when `background` is set. A
+    failed inline load raises, so the server does not start without them;
+    in the background it only leaves /api/health/ready reporting "failed".
+    """
+    if background:
+        threading.Thread(target=_warm, name='model-warmup', daemon=True).start()
+    else:
+        _warm(background=False)
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
@@ -20,8 +20,9 @@ document.addEventListener('DOMContentLoaded', () => {
 // ===================================================================
 function checkAuth() {
     const userData = localStorage.getItem('user');
-    if (userData) {
-        currentUser = JSON.parse(userData);
+    const saved = userData ? JSON.parse(userData) : null;
+    if (saved && saved.token) {             // logins before tokens existed must sign in again
+        currentUser = saved;
         showApp();
         loadDashboard();
     } else {
@@ -157,6 +158,19 @@ function handleLogout() {
     showLogin();
 }
 
+// Bearer token from /login, required by upload and analyze calls
+function authHeaders(extra = {}) {
+    return { ...extra, 'Authorization': `Bearer ${currentUser.token}` };
+}
+
+// 401 = token missing or expired → back to the login screen
+function sessionExpired(res) {
+    if (res.status !== 401) return false;
+    alert('Your session has expired. Please log in again.');
+    handleLogout();
+    return true;
+}
+
 // ===================================================================
 //  DASHBOARD  (with localStorage cache)
 // ===================================================================
@@ -205,7 +219,12 @@ async function handleUpload(e) {
     statusDiv.textContent = 'Uploading and processing...';
 
     try {
-        const res = await fetch(`${API_URL}/upload-resume`, { method: 'POST', body: formData });
+        const res = await fetch(`${API_URL}/upload-resume`, {
+            method: 'POST',
+            headers: authHeaders(),
+            body: formData
+        });
+        if (sessionExpired(res)) return;
         const data = await res.json();
         if (res.ok) {
             statusDiv.className = 'success';
@@ -256,13 +275,14 @@ async function runAnalysis() {
     try {
         const res = await fetch(`${API_URL}/analyze-role`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: authHeaders({ 'Content-Type': 'application/json' }),
             body: JSON.stringify({
                 user_id: currentUser.user_id,
                 resume_id: currentResumeId,
                 role_id: roleId
             })
         });
+        if (sessionExpired(res)) return;
         const data = await res.json();
         if (res.ok) {
             displayAnalysisResults(data);
@@ -490,13 +510,14 @@ document.getElementById('analyze-text-btn').addEventListener('click', async () =
     try {
         const res = await fetch(`${API_URL}/analyze-text`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: authHeaders({ 'Content-Type': 'application/json' }),
             body: JSON.stringify({
                 user_id: currentUser.user_id,
                 resume_id: currentResumeId,
                 job_description: jobText
             })
         });
+        if (sessionExpired(res)) return;
         const data = await res.json();
         if (res.ok) {
             displayAnalysisResults(data);   // reuse existing renderer